@@ -1,16 +1,25 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import os, psycopg2
+import os, time, psycopg2
+import json, base64
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait
 import psycopg2.extras
 import numpy as np
 from typing import List, Dict, Optional
-from opensearchpy import OpenSearch
+from opensearchpy import OpenSearch, ConnectionTimeout
 
-# 임베딩 및 유사도 계산을 위한 모듈 (상대 경로로 임포트)
+# crawler 모듈 임포트 경로 (실행 위치와 무관하게 이 파일 기준)
 import sys
-sys.path.append('../crawler')
-from embedding_service import EmbeddingService
-from similarity_utils import SimilarityCalculator
+import threading
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'crawler'))
+# embedding_service(torch, sentence_transformers)와 similarity_utils(sklearn, nltk, Levenshtein)는
+# 임포트 비용이 커서 처음 필요할 때 또는 시작 후 백그라운드 워밍업에서 임포트
+from embedding_store import EmbeddingStore
+from tag_vocab import TagVocabIndex
+from suggest_index import SuggestService
+from micro_batching import MicroBatchEncoder
+from reranker import Reranker, parse_weights, FEATURES
 
 app = FastAPI(
     title="YouTube 검색어 유사도 API",
@@ -29,23 +38,116 @@ app.add_middleware(
 
 # 전역 변수로 서비스 초기화
 embedding_service = None
+query_encoder = None
 similarity_calculator = None
+embedding_store = None
+suggest_service = SuggestService()
+tag_vocab_index = TagVocabIndex(check_interval=float(os.getenv("TAG_VOCAB_CHECK_SECONDS", "10")))
+
+# 하이브리드 검색의 검색 경로(leg)를 동시에 실행하는 공용 스레드 풀
+search_executor = ThreadPoolExecutor(max_workers=int(os.getenv("HYBRID_SEARCH_WORKERS", "8")))
+
+# 지연 로드 싱글톤 보호 (워밍업 스레드와 요청 스레드가 동시에 만들지 않도록)
+_embedding_service_lock = threading.Lock()
+_query_encoder_lock = threading.Lock()
+_similarity_calculator_lock = threading.Lock()
+# 백그라운드 워밍업 상태
+warmup_state = {"started_at": None, "finished_at": None, "error": None}
 
 def get_embedding_service():
-    """임베딩 서비스 싱글톤"""
+    """임베딩 서비스 싱글톤 (첫 호출 시 torch/모델 로드)"""
     global embedding_service
     if embedding_service is None:
-        model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-        embedding_service = EmbeddingService(model_name)
+        with _embedding_service_lock:
+            if embedding_service is None:
+                # EMBEDDING_SOCKET이 있으면 워커마다 모델을 올리지 않고 사이드카 모델 공유
+                from embedding_server import create_embedding_service
+                model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+                embedding_service = create_embedding_service(model_name)
     return embedding_service
 
+def get_query_encoder() -> MicroBatchEncoder:
+    """
+    검색어 인코딩용 마이크로 배처 (동시 요청의 검색어를 모아 한 번에 인코딩)
+
+    ENCODE_MAX_WAIT_MS: 첫 요청 후 다른 요청을 기다리는 최대 시간 (클수록 처리량↑ 지연↑, 0이면 대기 없음)
+    ENCODE_MAX_BATCH: 한 번에 인코딩할 최대 검색어 수
+    """
+    global query_encoder
+    if query_encoder is None:
+        with _query_encoder_lock:
+            if query_encoder is None:
+                query_encoder = MicroBatchEncoder(
+                    get_embedding_service().encode,
+                    max_batch=int(os.getenv("ENCODE_MAX_BATCH", "32")),
+                    max_wait_ms=float(os.getenv("ENCODE_MAX_WAIT_MS", "2")),
+                    name="query-encoder",
+                )
+    return query_encoder
+
+def encode_query(q: str) -> np.ndarray:
+    """정규화된 검색어 벡터 (다른 요청과 묶어 인코딩)"""
+    return get_query_encoder().encode(q, normalize=True)[0]
+
 def get_similarity_calculator():
-    """유사도 계산기 싱글톤"""
+    """유사도 계산기 싱글톤 (첫 호출 시 sklearn 등 임포트)"""
     global similarity_calculator
     if similarity_calculator is None:
-        similarity_calculator = SimilarityCalculator()
+        with _similarity_calculator_lock:
+            if similarity_calculator is None:
+                from similarity_utils import SimilarityCalculator
+                from korean_tokenizer import get_tokenizer
+                # 수집 시 title_tokens를 만든 토크나이저와 같은 KOREAN_TOKENIZER 사용
+                similarity_calculator = SimilarityCalculator(tokenizer=get_tokenizer())
     return similarity_calculator
 
+def _warm_up():
+    """모델과 유사도 계산기를 미리 로드 (서버가 요청을 받기 시작한 뒤 백그라운드에서 실행)"""
+    warmup_state["started_at"] = time.time()
+    try:
+        get_similarity_calculator()
+        encode_query("워밍업")
+    except Exception as e:
+        warmup_state["error"] = str(e)
+        print(f"워밍업 실패 (첫 요청 시 다시 로드 시도): {e}")
+    finally:
+        warmup_state["finished_at"] = time.time()
+
+@app.on_event("startup")
+def start_warm_up():
+    """WARMUP=0이면 워밍업 없이 첫 요청 시 로드"""
+    if os.getenv("WARMUP", "1") != "0":
+        threading.Thread(target=_warm_up, name="model-warmup", daemon=True).start()
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """메모리 맵 임베딩 저장소 (EMBEDDING_STORE_DIR 미설정 시 None)"""
+    global embedding_store
+    store_dir = os.getenv("EMBEDDING_STORE_DIR")
+    if not store_dir:
+        return None
+    if embedding_store is None:
+        embedding_store = EmbeddingStore(
+            store_dir, check_interval=float(os.getenv("EMBEDDING_STORE_CHECK_SECONDS", "30"))
+        )
+        embedding_store.load()
+    else:
+        # 새 스냅샷이 내보내졌으면 워커마다 주기적으로 교체
+        embedding_store.maybe_reload()
+    return embedding_store
+
+@app.on_event("startup")
+def load_embedding_store():
+    """시작 시 임베딩 스냅샷을 메모리 맵으로 연결"""
+    try:
+        get_embedding_store()
+    except Exception as e:
+        print(f"임베딩 저장소 로드 실패 (DB 검색으로 대체): {e}")
+
+@app.on_event("startup")
+def start_suggest_index():
+    """자동완성 인덱스를 백그라운드에서 빌드하고 데이터 변경 시 재빌드"""
+    suggest_service.start(get_conn, interval=float(os.getenv("SUGGEST_CHECK_SECONDS", "60")))
+
 def get_conn():
     return psycopg2.connect(
         host=os.getenv("DB_HOST","localhost"),
@@ -55,6 +157,14 @@ def get_conn():
         password=os.getenv("DB_PASSWORD","app1234"),
     )
 
+def get_tag_vocab() -> Optional[TagVocabIndex]:
+    """태그 어휘 메모리 인덱스 (yt.tag_vocab 버전이 바뀌면 다시 로드, 사용 불가 시 None)"""
+    try:
+        return tag_vocab_index.refresh(get_conn)
+    except Exception as e:
+        print(f"태그 어휘 인덱스 사용 불가 (태그 스캔으로 대체): {e}")
+        return None
+
 def get_os_client() -> OpenSearch:
     host = os.getenv("OS_HOST", "https://yt-os:9200")
     user = os.getenv("OS_USER", "admin")
@@ -64,16 +174,63 @@ def get_os_client() -> OpenSearch:
 
 @app.get("/health")
 def health():
+    """
+    상태 확인
+    
+    ok는 DB 연결 여부, ready는 지연 로드 구성요소 준비 여부
+    (모델이 아직 로드 중이어도 /search 등 DB 기반 검색은 바로 사용 가능)
+    """
+    ready = {
+        "embedding_model": embedding_service is not None,
+        "query_encoder": query_encoder is not None,
+        "similarity": similarity_calculator is not None,
+        "suggest": suggest_service.index is not None,
+        "embedding_store": embedding_store is not None,
+    }
+    warmup = {
+        "running": warmup_state["started_at"] is not None and warmup_state["finished_at"] is None,
+        "error": warmup_state["error"],
+    }
+    if warmup_state["finished_at"] is not None:
+        warmup["seconds"] = round(warmup_state["finished_at"] - warmup_state["started_at"], 2)
     try:
         with get_conn() as conn, conn.cursor() as cur:
             cur.execute("SELECT 1")
             _ = cur.fetchone()
-        return {"ok": True}
+        return {"ok": True, "ready": ready, "warmup": warmup}
     except Exception as e:
-        return {"ok": False, "error": str(e)}
+        return {"ok": False, "error": str(e), "ready": ready, "warmup": warmup}
+
+def _encode_search_cursor(score: float, video_id) -> str:
+    """keyset 페이지네이션 커서 (마지막 행의 점수와 id)"""
+    raw = json.dumps({"s": score, "id": str(video_id)}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_search_cursor(cursor: str):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(data["s"]), str(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다")
 
 @app.get("/search")
-def search(q: str = "", limit: int = 10):
+def search(q: str = "", limit: int = 10, mode: str = "recent",
+           cursor: Optional[str] = None, min_similarity: float = 0.3):
+    """
+    영상 제목 검색
+    
+    Args:
+        q: 검색어
+        limit: 반환할 결과 수
+        mode: recent (ILIKE, 최신순 리스트) 또는 trgm (pg_trgm 유사도순, 커서 페이지)
+        cursor: trgm 모드에서 이전 응답의 next_cursor
+        min_similarity: trgm 모드의 % 연산자 임계값 (pg_trgm.similarity_threshold)
+    """
+    if mode == "trgm":
+        return _trigram_search(q, limit, cursor, min_similarity)
+    if mode != "recent":
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 검색 모드: {mode}")
+    
     sql = """
       SELECT v.id, v.title, v.published_at
       FROM yt.videos v
@@ -86,16 +243,60 @@ def search(q: str = "", limit: int = 10):
         rows = cur.fetchall()
     return [{"id": r[0], "title": r[1], "published_at": r[2]} for r in rows]
 
+def _trigram_search(q: str, limit: int, cursor: Optional[str], min_similarity: float) -> Dict:
+    """
+    pg_trgm 유사도 순 검색
+    
+    title % q 조건으로 idx_videos_title_trgm(GIN)이 후보를 고르고,
+    similarity() 점수와 id로 정렬합니다. 다음 페이지는 OFFSET 대신
+    (점수, id) 튜플 비교로 이어서 읽으므로 깊은 페이지도 비용이 일정합니다.
+    """
+    if not q:
+        raise HTTPException(status_code=400, detail="trgm 모드에는 검색어(q)가 필요합니다")
+    
+    params = [q, q]
+    keyset = ""
+    if cursor:
+        last_score, last_id = _decode_search_cursor(cursor)
+        keyset = "AND (similarity(v.title, %s), v.id) < (%s::real, %s::uuid)"
+        params += [q, last_score, last_id]
+    params.append(limit + 1)
+    
+    sql = f"""
+      SELECT v.id, v.title, v.published_at, similarity(v.title, %s) AS score
+      FROM yt.videos v
+      WHERE v.title %% %s
+        {keyset}
+      ORDER BY score DESC, v.id DESC
+      LIMIT %s
+    """
+    with get_conn() as conn, conn.cursor() as cur:
+        # SET LOCAL: 이 트랜잭션에서만 % 연산자 임계값 변경
+        cur.execute("SET LOCAL pg_trgm.similarity_threshold = %s", (min_similarity,))
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [{"id": r[0], "title": r[1], "published_at": r[2], "score": float(r[3])} for r in rows]
+    next_cursor = _encode_search_cursor(float(rows[-1][3]), rows[-1][0]) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
+
 # OpenSearch: 간단 조회 (title match)
 @app.get("/os_search")
 def os_search(q: str = "", size: int = 10):
+    return _os_title_search(q, size)
+
+def _os_title_search(q: str, size: int, request_timeout: Optional[float] = None) -> List[Dict]:
+    """OpenSearch 제목 검색 (request_timeout: 초 단위 요청 제한 시간, None이면 클라이언트 기본값)"""
     os_client = get_os_client()
     body = {
         "size": size,
         "query": {"match": {"title": q}} if q else {"match_all": {}},
         "_source": ["video_id", "title", "published_at", "channel_id"],
     }
-    resp = os_client.search(index=os.getenv("OS_INDEX", "videos"), body=body)
+    params = {"request_timeout": request_timeout} if request_timeout is not None else {}
+    resp = os_client.search(index=os.getenv("OS_INDEX", "videos"), body=body, **params)
     hits = resp.get("hits", {}).get("hits", [])
     return [{
         "id": h.get("_id"),
@@ -103,12 +304,33 @@ def os_search(q: str = "", size: int = 10):
         **(h.get("_source") or {})
     } for h in hits]
 
+EMBEDDING_TYPES = ["title", "title_tags", "title_desc", "full_text"]
+
+def get_knn_index() -> str:
+    """임베딩 벡터가 색인된 OpenSearch 인덱스(또는 alias)"""
+    return os.getenv("OS_KNN_INDEX", os.getenv("OS_INDEX", "videos"))
+
 # Nori 분석기 인덱스 생성 (새 인덱스명 지정; 기본: videos_ko)
+# 임베딩 타입별 knn_vector(HNSW, Lucene 엔진) 필드 포함
 @app.post("/os/setup_nori")
-def os_setup_nori(index: str = "videos_ko"):
+def os_setup_nori(index: str = "videos_ko", embedding_dim: int = 384):
     os_client = get_os_client()
+    knn_fields = {
+        f"embedding_{embedding_type}": {
+            "type": "knn_vector",
+            "dimension": embedding_dim,
+            "method": {
+                "name": "hnsw",
+                "engine": "lucene",
+                "space_type": "cosinesimil",
+                "parameters": {"m": 16, "ef_construction": 128}
+            }
+        }
+        for embedding_type in EMBEDDING_TYPES
+    }
     settings = {
         "settings": {
+            "index": {"knn": True},
             "analysis": {
                 "analyzer": {
                     "korean": {"type": "custom", "tokenizer": "nori_tokenizer"}
@@ -118,11 +340,14 @@ def os_setup_nori(index: str = "videos_ko"):
         "mappings": {
             "properties": {
                 "video_id": {"type": "keyword"},
+                "video_db_id": {"type": "keyword"},
                 "title": {"type": "text", "analyzer": "korean"},
                 "description": {"type": "text", "analyzer": "korean"},
                 "published_at": {"type": "date"},
                 "channel_id": {"type": "keyword"},
-                "tags": {"type": "keyword"}
+                "tags": {"type": "keyword"},
+                "embedding_model": {"type": "keyword"},
+                **knn_fields
             }
         }
     }
@@ -158,46 +383,101 @@ def similar_search(
     method: str = "cosine",
     embedding_type: str = "title",
     limit: int = 10,
-    threshold: float = 0.5
+    threshold: float = 0.5,
+    precision: Optional[str] = None,
+    backend: str = "postgres",
+    published_after: Optional[str] = None,
+    published_before: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    candidate_source: str = "vector",
+    candidates: int = 200,
+    weights: Optional[str] = None
 ):
     """
     유사 검색어 추천 API
     
     Args:
         q: 검색어
-        method: 유사도 계산 방법 (cosine, jaccard, levenshtein, ngram, word_overlap, tfidf)
+        method: 유사도 계산 방법 (cosine, jaccard, levenshtein, ngram, word_overlap, tfidf, rerank)
         embedding_type: 임베딩 타입 (title, title_tags, title_desc, full_text)
         limit: 반환할 최대 개수
         threshold: 유사도 임계값
+        precision: 임베딩 스냅샷 후보 검색 표현 (float32, float16, int8; 상위 후보는 float32로 재정렬)
+        backend: cosine 검색 백엔드 (postgres, opensearch)
+        published_after, published_before: 게시일 범위 필터 (opensearch 백엔드, ISO 8601)
+        channel_id: YouTube 채널 ID 필터 (opensearch 백엔드)
+        candidate_source: rerank 1단계 후보 생성기 (vector, trigram, bm25)
+        candidates: rerank 후보 수
+        weights: rerank 특성 가중치 ("cosine:0.6,ngram:0.2,recency:0.1,engagement:0.1", 기본 RERANK_WEIGHTS)
     
     Returns:
         List[Dict]: 유사한 영상 리스트
     """
     if not q.strip():
         raise HTTPException(status_code=400, detail="검색어를 입력해주세요")
+    if method == "rerank":
+        if candidate_source not in RERANK_CANDIDATE_SOURCES:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 후보 생성기: {candidate_source}")
+        try:
+            rerank_weights = parse_weights(weights or os.getenv("RERANK_WEIGHTS"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
     try:
-        if method == "cosine":
-            return _cosine_similarity_search(q, embedding_type, limit, threshold)
+        if method == "cosine" and backend == "opensearch":
+            return _opensearch_knn_search(
+                q, embedding_type, limit, threshold,
+                published_after, published_before, channel_id
+            )
+        elif method == "cosine":
+            return _cosine_similarity_search(q, embedding_type, limit, threshold, precision)
         elif method in ["jaccard", "levenshtein", "ngram", "word_overlap"]:
             return _text_similarity_search(q, method, limit)
         elif method == "tfidf":
             return _tfidf_similarity_search(q, limit)
+        elif method == "rerank":
+            return _rerank_search(q, embedding_type, limit, candidate_source,
+                                  min(max(candidates, limit), 1000), rerank_weights)
         else:
             raise HTTPException(status_code=400, detail=f"지원하지 않는 방법: {method}")
     
+    except HTTPException:
+        # 잘못된 요청(400) 등은 그대로 전달
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
 
-def _cosine_similarity_search(q: str, embedding_type: str, limit: int, threshold: float) -> List[Dict]:
-    """코사인 유사도 기반 검색"""
+def _remaining_ms(deadline: float) -> int:
+    """마감 시각(time.monotonic 기준)까지 남은 시간(ms), 이미 지났으면 TimeoutError"""
+    remaining = int((deadline - time.monotonic()) * 1000)
+    if remaining <= 0:
+        raise TimeoutError("검색 제한 시간 초과")
+    return remaining
+
+def _set_statement_timeout(cur, deadline: Optional[float]) -> None:
+    """마감 시각이 있으면 현재 트랜잭션의 statement_timeout을 남은 시간으로 제한"""
+    if deadline is not None:
+        cur.execute("SET LOCAL statement_timeout = %s", (_remaining_ms(deadline),))
+
+def _cosine_similarity_search(q: str, embedding_type: str, limit: int, threshold: float,
+                              precision: Optional[str] = None,
+                              deadline: Optional[float] = None) -> List[Dict]:
+    """코사인 유사도 기반 검색 (deadline: time.monotonic 기준 마감 시각, DB 조회 제한 시간으로 사용)"""
     # 쿼리 임베딩 생성
     embedding_service = get_embedding_service()
-    query_embedding = embedding_service.encode(q, normalize=True)[0]
+    query_embedding = encode_query(q)
+    
+    # 메모리 맵 스냅샷이 있으면 DB의 FLOAT[] 디코딩 없이 검색
+    store = get_embedding_store()
+    store_slice = store.get_slice(embedding_type, embedding_service.model_name) if store else None
+    if store_slice is not None:
+        precision = precision or os.getenv("EMBEDDING_STORE_PRECISION", "float32")
+        return _store_similarity_search(store_slice, query_embedding, limit, threshold, precision, deadline)
     
     # 데이터베이스에서 유사한 영상 검색
     with get_conn() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            _set_statement_timeout(cur, deadline)
             cur.execute("""
                 SELECT 
                     v.id,
@@ -226,13 +506,119 @@ def _cosine_similarity_search(q: str, embedding_type: str, limit: int, threshold
             results = cur.fetchall()
             return [dict(row) for row in results]
 
+def _opensearch_knn_search(q: str, embedding_type: str, limit: int, threshold: float,
+                           published_after: Optional[str] = None,
+                           published_before: Optional[str] = None,
+                           channel_id: Optional[str] = None) -> List[Dict]:
+    """OpenSearch k-NN(HNSW) 검색 (게시일/채널 필터는 엔진 내부에서 적용)"""
+    if embedding_type not in EMBEDDING_TYPES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 임베딩 타입: {embedding_type}")
+    embedding_service = get_embedding_service()
+    query_embedding = encode_query(q)
+    
+    filters = [{"term": {"embedding_model": embedding_service.model_name}}]
+    if published_after or published_before:
+        date_range = {}
+        if published_after:
+            date_range["gte"] = published_after
+        if published_before:
+            date_range["lte"] = published_before
+        filters.append({"range": {"published_at": date_range}})
+    if channel_id:
+        filters.append({"term": {"channel_id": channel_id}})
+    
+    body = {
+        "size": limit,
+        "query": {
+            "knn": {
+                f"embedding_{embedding_type}": {
+                    "vector": query_embedding.tolist(),
+                    "k": limit,
+                    "filter": {"bool": {"filter": filters}}
+                }
+            }
+        },
+        "_source": ["video_id", "video_db_id", "title", "description", "published_at", "tags", "channel_id"],
+    }
+    resp = get_os_client().search(index=get_knn_index(), body=body)
+    
+    results = []
+    for hit in resp.get("hits", {}).get("hits", []):
+        # cosinesimil 점수 (1 + cos) / 2 를 코사인 유사도로 되돌림
+        similarity = 2.0 * (hit.get("_score") or 0.0) - 1.0
+        if similarity < threshold:
+            continue
+        source = hit.get("_source") or {}
+        results.append({
+            "id": source.get("video_db_id"),
+            "video_yid": source.get("video_id") or hit.get("_id"),
+            "title": source.get("title"),
+            "description": source.get("description"),
+            "published_at": source.get("published_at"),
+            "tags": source.get("tags"),
+            "channel_id": source.get("channel_id"),
+            "similarity_score": similarity,
+        })
+    
+    # video_db_id 없이 색인된 이전 문서는 video_yid로 yt.videos.id를 한 번에 조회해 채움
+    missing = [row["video_yid"] for row in results if not row["id"]]
+    if missing:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("SELECT video_yid, id FROM yt.videos WHERE video_yid = ANY(%s)", (missing,))
+            db_ids = {yid: str(video_id) for yid, video_id in cur.fetchall()}
+        for row in results:
+            if not row["id"]:
+                row["id"] = db_ids.get(row["video_yid"])
+    return results
+
+def _store_similarity_search(store_slice, query_embedding: np.ndarray,
+                             limit: int, threshold: float, precision: str = "float32",
+                             deadline: Optional[float] = None) -> List[Dict]:
+    """메모리 맵 슬라이스에서 상위 k개를 찾은 뒤 해당 영상 정보만 DB에서 조회"""
+    hits = store_slice.search(query_embedding, top_k=limit, threshold=threshold, precision=precision)
+    if not hits:
+        return []
+    
+    with get_conn() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            _set_statement_timeout(cur, deadline)
+            cur.execute("""
+                SELECT id, video_yid, title, description, published_at, tags
+                FROM yt.videos
+                WHERE id = ANY(%s::uuid[])
+            """, ([video_id for video_id, _ in hits],))
+            videos = {str(row['id']): dict(row) for row in cur.fetchall()}
+    
+    results = []
+    for video_id, score in hits:
+        video = videos.get(video_id)
+        if video is not None:
+            video['similarity_score'] = score
+            results.append(video)
+    return results
+
+def _map_similar_videos(videos: List[Dict], indices: np.ndarray, scores: np.ndarray) -> List[Dict]:
+    """상위 후보 인덱스를 영상 행에 바로 대응 (같은 제목이 여러 개여도 각자의 영상으로 매핑)"""
+    return [
+        {
+            'id': str(videos[i]['id']),
+            'video_yid': videos[i]['video_yid'],
+            'title': videos[i]['title'],
+            'description': videos[i]['description'],
+            'published_at': videos[i]['published_at'],
+            'tags': videos[i]['tags'],
+            'similarity_score': score
+        }
+        for i, score in zip(indices.tolist(), scores.tolist())
+    ]
+
 def _text_similarity_search(q: str, method: str, limit: int) -> List[Dict]:
     """텍스트 기반 유사도 검색"""
     # 모든 영상 제목 조회
     with get_conn() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute("""
-                SELECT id, video_yid, title, description, published_at, tags
+                SELECT id, video_yid, title, description, published_at, tags, title_tokens
                 FROM yt.videos
                 ORDER BY published_at DESC
                 LIMIT 1000
@@ -246,27 +632,13 @@ def _text_similarity_search(q: str, method: str, limit: int) -> List[Dict]:
     similarity_calc = get_similarity_calculator()
     candidates = [video['title'] for video in videos]
     
-    similar_texts = similarity_calc.find_similar_texts(
-        q, candidates, method=method, top_k=limit
+    # 수집 시 저장한 제목 토큰 재사용 (word_overlap)
+    indices, scores = similarity_calc.find_similar_texts(
+        q, candidates, method=method, top_k=limit,
+        candidate_tokens=[video['title_tokens'] for video in videos]
     )
     
-    # 결과 매핑
-    results = []
-    for text, score in similar_texts:
-        for video in videos:
-            if video['title'] == text:
-                results.append({
-                    'id': str(video['id']),
-                    'video_yid': video['video_yid'],
-                    'title': video['title'],
-                    'description': video['description'],
-                    'published_at': video['published_at'],
-                    'tags': video['tags'],
-                    'similarity_score': score
-                })
-                break
-    
-    return results
+    return _map_similar_videos(videos, indices, scores)
 
 def _tfidf_similarity_search(q: str, limit: int) -> List[Dict]:
     """TF-IDF 기반 유사도 검색"""
@@ -274,7 +646,7 @@ def _tfidf_similarity_search(q: str, limit: int) -> List[Dict]:
     with get_conn() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute("""
-                SELECT id, video_yid, title, description, published_at, tags
+                SELECT id, video_yid, title, description, published_at, tags, title_tokens
                 FROM yt.videos
                 ORDER BY published_at DESC
                 LIMIT 1000
@@ -288,28 +660,283 @@ def _tfidf_similarity_search(q: str, limit: int) -> List[Dict]:
     similarity_calc = get_similarity_calculator()
     candidates = [video['title'] for video in videos]
     
-    similar_texts = similarity_calc.find_similar_texts(
-        q, candidates, method="tfidf", top_k=limit
+    indices, scores = similarity_calc.find_similar_texts(
+        q, candidates, method="tfidf", top_k=limit,
+        candidate_tokens=[video['title_tokens'] for video in videos]
     )
     
-    # 결과 매핑
-    results = []
-    for text, score in similar_texts:
-        for video in videos:
-            if video['title'] == text:
-                results.append({
-                    'id': str(video['id']),
-                    'video_yid': video['video_yid'],
-                    'title': video['title'],
-                    'description': video['description'],
-                    'published_at': video['published_at'],
-                    'tags': video['tags'],
-                    'similarity_score': score
-                })
-                break
+    return _map_similar_videos(videos, indices, scores)
+
+# ==============================
+# 2단계 검색 (후보 생성 → 특성 재정렬)
+# ==============================
+
+RERANK_CANDIDATE_SOURCES = ("vector", "trigram", "bm25")
+
+def _rerank_candidates(q: str, embedding_type: str, source: str, size: int) -> Dict[str, List[str]]:
+    """1단계 후보 생성 (vector/trigram은 영상 id, bm25는 video_yid 반환)"""
+    if source == "vector":
+        rows = _cosine_similarity_search(q, embedding_type, size, threshold=-1.0)
+        return {"ids": [str(row["id"]) for row in rows]}
+    if source == "trigram":
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("SET LOCAL pg_trgm.similarity_threshold = %s",
+                        (float(os.getenv("RERANK_TRGM_THRESHOLD", "0.1")),))
+            cur.execute("""
+                SELECT v.id FROM yt.videos v
+                WHERE v.title %% %s
+                ORDER BY similarity(v.title, %s) DESC, v.id DESC
+                LIMIT %s
+            """, (q, q, size))
+            return {"ids": [str(r[0]) for r in cur.fetchall()]}
+    hits = os_search(q=q, size=size)
+    return {"yids": [h.get("video_id") or h.get("id") for h in hits]}
+
+def _rerank_search(q: str, embedding_type: str, limit: int, source: str, size: int,
+                   weights: Dict[str, float]) -> List[Dict]:
+    """
+    후보 블록 재정렬 검색
+    
+    후보 영상 정보, 게시 시각, mv_top_videos_30d 참여도, 임베딩을 한 번에 읽고
+    코사인/제목 n-gram/최신성/참여도 특성을 배열 연산으로 계산해 가중합 순으로 반환합니다.
+    """
+    keys = _rerank_candidates(q, embedding_type, source, size)
+    if not keys.get("ids") and not keys.get("yids"):
+        return []
+    
+    query_vector = None
+    model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    if weights.get("cosine"):
+        try:
+            query_vector = encode_query(q)
+            model_name = get_embedding_service().model_name
+        except Exception as e:
+            print(f"재정렬 코사인 특성 생략 (임베딩 모델 사용 불가): {e}")
     
+    # 메모리 맵 스냅샷이 있으면 후보 벡터를 스냅샷에서 읽고, 없으면 DB에서 함께 조회
+    store = get_embedding_store() if query_vector is not None else None
+    store_slice = store.get_slice(embedding_type, model_name) if store else None
+    vector_join = ""
+    vector_column = "NULL"
+    if query_vector is not None and store_slice is None:
+        vector_join = """LEFT JOIN yt.video_embeddings ve
+                  ON ve.video_id = v.id AND ve.embedding_type = %(embedding_type)s AND ve.model_name = %(model_name)s"""
+        vector_column = "ve.embedding_vector"
+    where = "v.id = ANY(%(ids)s::uuid[])" if "ids" in keys else "v.video_yid = ANY(%(yids)s)"
+    
+    with get_conn() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(f"""
+                SELECT v.id, v.video_yid, v.title, v.description, v.published_at, v.tags,
+                       EXTRACT(EPOCH FROM v.published_at) AS published_epoch,
+                       COALESCE(m.engagement_score, 0) AS engagement_score,
+                       {vector_column} AS embedding_vector
+                FROM yt.videos v
+                LEFT JOIN yt.mv_top_videos_30d m ON m.id = v.id
+                {vector_join}
+                WHERE {where}
+            """, {**keys, "embedding_type": embedding_type, "model_name": model_name})
+            rows = [dict(row) for row in cur.fetchall()]
+    if not rows:
+        return []
+    
+    vectors = None
+    if query_vector is not None:
+        vectors = np.zeros((len(rows), len(query_vector)), dtype=np.float32)
+        if store_slice is not None:
+            # 스냅샷 행 번호를 먼저 모두 구한 뒤 한 번의 fancy-index로 모음 (없는 영상은 0 벡터)
+            row_idx = np.array([
+                -1 if r is None else r
+                for r in (store_slice.row_of(str(row["id"])) for row in rows)
+            ], dtype=np.int64)
+            mask = row_idx >= 0
+            vectors[mask] = store_slice.vectors[row_idx[mask]]
+        else:
+            present = [i for i, row in enumerate(rows) if row["embedding_vector"]]
+            if present:
+                vectors[present] = np.asarray([rows[i]["embedding_vector"] for i in present], dtype=np.float32)
+    
+    reranker = Reranker(weights, half_life_days=float(os.getenv("RERANK_HALF_LIFE_DAYS", "30")))
+    features = reranker.features(
+        q,
+        [row["title"] or "" for row in rows],
+        np.array([np.nan if row["published_epoch"] is None else float(row["published_epoch"]) for row in rows]),
+        np.array([float(row["engagement_score"]) for row in rows]),
+        query_vector,
+        vectors,
+    )
+    order, scores = reranker.rank(features, limit)
+    
+    results = []
+    for i, score in zip(order, scores):
+        row = rows[i]
+        results.append({
+            "id": str(row["id"]),
+            "video_yid": row["video_yid"],
+            "title": row["title"],
+            "description": row["description"],
+            "published_at": row["published_at"],
+            "tags": row["tags"],
+            "similarity_score": float(score),
+            "features": {name: round(float(features[i, j]), 4) for j, name in enumerate(FEATURES)},
+        })
     return results
 
+# ==============================
+# 하이브리드 검색 (BM25 + 벡터, 순위 융합)
+# ==============================
+
+def _lexical_leg(q: str, size: int, deadline: float) -> List[Dict]:
+    """OpenSearch(BM25/Nori) 제목 검색 결과를 video_yid 기준으로 정리 (요청 제한 시간 = 남은 시간)"""
+    hits = _os_title_search(q, size, request_timeout=_remaining_ms(deadline) / 1000.0)
+    return [{
+        "video_yid": h.get("video_id") or h.get("id"),
+        "title": h.get("title"),
+        "published_at": h.get("published_at"),
+        "channel_id": h.get("channel_id"),
+        "score": h.get("score") or 0.0,
+    } for h in hits]
+
+def _vector_leg(q: str, embedding_type: str, size: int, deadline: float) -> List[Dict]:
+    """임베딩 코사인 상위 결과 (임계값 없이 순위만 사용, DB 조회 제한 시간 = 남은 시간)"""
+    rows = _cosine_similarity_search(q, embedding_type, size, threshold=-1.0, deadline=deadline)
+    return [{**row, "score": row.get("similarity_score") or 0.0} for row in rows]
+
+def _fuse_results(legs: Dict[str, List[Dict]], weights: Dict[str, float],
+                  fusion: str, rrf_k: int) -> List[Dict]:
+    """
+    검색 경로별 결과를 video_yid 기준으로 융합
+    
+    - rrf: score = Σ weight / (rrf_k + rank)
+    - weighted: 경로별 점수를 min-max 정규화한 뒤 가중합
+    """
+    fused = {}
+    for leg, rows in legs.items():
+        if not rows:
+            continue
+        weight = weights.get(leg, 1.0)
+        scores = [row["score"] for row in rows]
+        low, high = min(scores), max(scores)
+        for rank, row in enumerate(rows, start=1):
+            key = row.get("video_yid")
+            if not key:
+                continue
+            if fusion == "weighted":
+                normalized = (row["score"] - low) / (high - low) if high > low else 1.0
+                contribution = weight * normalized
+            else:
+                contribution = weight / (rrf_k + rank)
+            item = fused.setdefault(key, {"video_yid": key, "hybrid_score": 0.0})
+            for field, value in row.items():
+                if field != "score" and item.get(field) is None:
+                    item[field] = value
+            item["hybrid_score"] += contribution
+            item[f"{leg}_rank"] = rank
+            item[f"{leg}_score"] = row["score"]
+    return sorted(fused.values(), key=lambda x: x["hybrid_score"], reverse=True)
+
+@app.get("/hybrid_search")
+def hybrid_search(
+    q: str,
+    limit: int = 10,
+    embedding_type: str = "title",
+    fusion: str = "rrf",
+    lexical_weight: float = 1.0,
+    vector_weight: float = 1.0,
+    rrf_k: int = 60,
+    candidates: int = 50,
+    timeout_ms: int = 800
+):
+    """
+    하이브리드 검색 API (OpenSearch 어휘 검색 + 벡터 검색 동시 실행 후 융합)
+    
+    Args:
+        q: 검색어
+        limit: 반환할 최대 개수
+        embedding_type: 벡터 검색에 사용할 임베딩 타입
+        fusion: 융합 방식 (rrf, weighted)
+        lexical_weight: 어휘 검색 가중치
+        vector_weight: 벡터 검색 가중치
+        rrf_k: RRF 상수
+        candidates: 경로별 후보 개수
+        timeout_ms: 경로별 제한 시간. 초과한 경로는 제외하고 나머지 결과로 응답
+            (각 경로의 OpenSearch request_timeout / Postgres statement_timeout도 남은 시간으로 제한해
+            느린 경로가 공유 스레드 풀을 계속 점유하지 않게 함)
+    
+    Returns:
+        Dict: 융합 결과와 경로별 상태 (ok, timeout, error)
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="검색어를 입력해주세요")
+    if fusion not in ("rrf", "weighted"):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 융합 방식: {fusion}")
+    
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    futures = {
+        "lexical": search_executor.submit(_lexical_leg, q, candidates, deadline),
+        "vector": search_executor.submit(_vector_leg, q, embedding_type, candidates, deadline),
+    }
+    wait(list(futures.values()), timeout=timeout_ms / 1000.0)
+    
+    legs = {}
+    status = {}
+    for leg, future in futures.items():
+        if not future.done():
+            # 아직 시작 전이면 취소, 실행 중이면 경로별 제한 시간에 걸려 곧 끝나므로 응답에서만 제외
+            future.cancel()
+            status[leg] = "timeout"
+            continue
+        try:
+            legs[leg] = future.result()
+            status[leg] = "ok"
+        except (TimeoutError, ConnectionTimeout, psycopg2.errors.QueryCanceled):
+            status[leg] = "timeout"
+        except Exception as e:
+            status[leg] = f"error: {e}"
+    
+    if not legs:
+        raise HTTPException(status_code=503, detail={"message": "모든 검색 경로가 실패했습니다", "legs": status})
+    
+    results = _fuse_results(
+        legs, {"lexical": lexical_weight, "vector": vector_weight}, fusion, rrf_k
+    )
+    return {"results": results[:limit], "legs": status, "fusion": fusion}
+
+@app.get("/keyword_videos")
+def keyword_videos(keyword: str, limit: int = 20, source: Optional[str] = None):
+    """
+    키워드에 매핑된 영상 조회 (yt.video_keywords 인덱스 범위 조회)
+    
+    Args:
+        keyword: 행궁 키워드
+        limit: 반환할 결과 수
+        source: 매핑 근거 필터 (title, search; 기본은 모두 합산)
+    """
+    sql = """
+      SELECT v.id, v.video_yid, v.title, v.published_at, m.score, m.sources
+      FROM (
+        SELECT video_id, SUM(score) AS score, array_agg(source ORDER BY source) AS sources
+        FROM yt.video_keywords
+        WHERE keyword = %s AND (%s::text IS NULL OR source = %s)
+        GROUP BY video_id
+        ORDER BY score DESC
+        LIMIT %s
+      ) m
+      JOIN yt.videos v ON v.id = m.video_id
+      ORDER BY m.score DESC, v.published_at DESC
+    """
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(sql, (keyword, source, source, limit))
+        rows = cur.fetchall()
+    return [{
+        "id": r[0],
+        "video_yid": r[1],
+        "title": r[2],
+        "published_at": r[3],
+        "score": float(r[4]),
+        "sources": r[5],
+    } for r in rows]
+
 @app.get("/embedding_stats")
 def get_embedding_stats():
     """임베딩 통계 조회"""
@@ -345,6 +972,22 @@ def get_embedding_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"통계 조회 중 오류 발생: {str(e)}")
 
+def _iter_tag_chunks(chunk_size: int = 5000):
+    """전체 태그 어휘를 서버 사이드 커서로 chunk_size 단위 스트리밍"""
+    with get_conn() as conn:
+        with conn.cursor(name="similar_keywords_tags") as cur:
+            cur.itersize = chunk_size
+            cur.execute("""
+                SELECT DISTINCT unnest(tags) as keyword
+                FROM yt.videos
+                WHERE tags IS NOT NULL AND array_length(tags, 1) > 0
+            """)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [row[0] for row in rows]
+
 @app.get("/similar_keywords")
 def get_similar_keywords(
     q: str,
@@ -366,24 +1009,36 @@ def get_similar_keywords(
         raise HTTPException(status_code=400, detail="검색어를 입력해주세요")
     
     try:
-        # 모든 영상 제목에서 키워드 추출
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT DISTINCT unnest(tags) as keyword
-                    FROM yt.videos
-                    WHERE tags IS NOT NULL AND array_length(tags, 1) > 0
-                """)
-                keywords = [row[0] for row in cur.fetchall()]
+        similarity_calc = get_similarity_calculator()
+        vocab = get_tag_vocab()
         
-        if not keywords:
-            return []
+        def top_keywords(keywords: List[str]) -> List:
+            if not keywords:
+                return []
+            indices, scores = similarity_calc.find_similar_texts(
+                q, keywords, method=method, top_k=limit
+            )
+            return [(keywords[i], score) for i, score in zip(indices.tolist(), scores.tolist())]
         
-        # 유사도 계산
-        similarity_calc = get_similarity_calculator()
-        similar_keywords = similarity_calc.find_similar_texts(
-            q, keywords, method=method, top_k=limit
-        )
+        if vocab is not None and method in ("jaccard", "ngram", "word_overlap"):
+            # 어휘 전체를 미리 인코딩한 희소 행렬로 한 번에 계산
+            similar_keywords = vocab.top_similar(q, method, limit, word_tokenizer=(
+                similarity_calc.word_set if similarity_calc.tokenizer is not None else None))
+        elif vocab is not None:
+            # levenshtein / tfidf는 모든 태그가 0보다 큰 점수를 가질 수 있으므로 메모리 어휘 전체로 계산
+            similar_keywords = top_keywords(list(vocab.tags))
+        elif method == "tfidf":
+            # TF-IDF는 전체 어휘 기준 IDF가 필요하므로 한 번에 계산
+            similar_keywords = top_keywords([keyword for chunk in _iter_tag_chunks() for keyword in chunk])
+            if not similar_keywords:
+                return []
+        else:
+            # 청크 단위로 스트리밍하며 상위 limit개만 유지 (메모리 일정)
+            similar_keywords = []
+            for chunk in _iter_tag_chunks():
+                similar_keywords = heapq.nlargest(
+                    limit, similar_keywords + top_keywords(chunk), key=lambda x: x[1]
+                )
         
         return [
             {
@@ -393,9 +1048,55 @@ def get_similar_keywords(
             for keyword, score in similar_keywords
         ]
     
+    except HTTPException:
+        # 잘못된 요청(400) 등은 그대로 전달
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"키워드 검색 중 오류 발생: {str(e)}")
 
+@app.get("/embedding_store")
+def get_embedding_store_info():
+    """메모리 맵 임베딩 저장소 상태"""
+    store = get_embedding_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.info()}
+
+@app.post("/embedding_store/reload")
+def reload_embedding_store():
+    """CURRENT 포인터를 즉시 확인해 새 스냅샷으로 교체 (요청을 받은 워커만 해당)"""
+    store = get_embedding_store()
+    if store is None:
+        raise HTTPException(status_code=400, detail="EMBEDDING_STORE_DIR가 설정되지 않았습니다")
+    return {"reloaded": store.load(), "snapshot": store.snapshot}
+
+@app.get("/encoder_stats")
+def get_encoder_stats():
+    """검색어 마이크로 배칭 지표 (요청을 받은 워커 기준, 인코더가 아직 없으면 enabled=False)"""
+    if query_encoder is None:
+        return {"enabled": False}
+    return {"enabled": True, **query_encoder.stats()}
+
+@app.get("/suggest")
+def suggest(q: str = "", limit: int = 10):
+    """
+    검색어 자동완성 (영상 제목, 태그, 행궁 키워드 접두사 일치, 참여도 가중치순)
+    
+    Args:
+        q: 입력 중인 검색어
+        limit: 반환할 최대 개수
+    """
+    suggestions = suggest_service.suggest(q, min(max(limit, 0), 50))
+    if suggestions is None:
+        raise HTTPException(status_code=503, detail="자동완성 인덱스를 준비 중입니다")
+    return suggestions
+
+@app.post("/suggest/reload")
+def reload_suggest():
+    """수집 직후 등 즉시 자동완성 인덱스 재빌드 (요청을 받은 워커만 해당)"""
+    rebuilt = suggest_service.refresh(get_conn, force=True)
+    return {"rebuilt": rebuilt, "entries": len(suggest_service.index) if suggest_service.index else 0}
+
 @app.get("/search_methods")
 def get_search_methods():
     """사용 가능한 검색 방법 목록"""
@@ -430,6 +1131,11 @@ def get_search_methods():
                 "name": "tfidf",
                 "description": "TF-IDF 유사도",
                 "requires_embedding": False
+            },
+            {
+                "name": "rerank",
+                "description": "후보 생성(vector/trigram/bm25) 후 코사인·N-gram·최신성·참여도 가중합 재정렬",
+                "requires_embedding": False
             }
         ],
         "embedding_types": [
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+API 앱 임포트 시간 측정 스크립트
+`python -X importtime`으로 main 모듈을 임포트해 누적 시간이 큰 모듈을 보여줍니다.
+--eager는 예전처럼 모델/유사도 모듈까지 함께 임포트했을 때와 비교합니다.
+
+사용 예:
+    python profile_startup.py
+    python profile_startup.py --eager --top 15
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# 예전 main.py가 모듈 임포트 시점에 불러오던 무거운 모듈
+EAGER_MODULES = ["embedding_service", "similarity_utils"]
+
+
+def measure_imports(statement: str) -> List[Tuple[str, int, int]]:
+    """
+    새 인터프리터에서 statement 실행 중 임포트 시간 수집
+
+    Returns:
+        List[Tuple[str, int, int]]: (모듈, 자체 시간 us, 누적 시간 us)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "임포트 실패")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        # 이름 앞 공백(첫 칸 제외)은 중첩 깊이
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(label: str, statement: str, top: int) -> int:
+    rows = measure_imports(statement)
+    # 최상위 임포트(들여쓰기 없음)의 누적 시간 합 = 전체 임포트 시간
+    total = sum(cumulative for name, _, cumulative in rows if not name.startswith(" "))
+    print(f"\n=== {label}: 전체 {total / 1000:.0f}ms ===")
+    for name, _, cumulative in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name.strip()}")
+    return total
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='API 앱 임포트 시간 측정')
+    parser.add_argument('--top', type=int, default=10, help='표시할 모듈 수')
+    parser.add_argument('--eager', action='store_true', help='모델/유사도 모듈을 함께 임포트한 경우와 비교')
+    args = parser.parse_args()
+
+    lazy = report("main (지연 로드)", "import main", args.top)
+    if args.eager:
+        crawler_dir = os.path.join(APP_DIR, "..", "crawler")
+        statement = f"import sys; sys.path.append({crawler_dir!r}); " + \
+                    "; ".join(f"import {name}" for name in EAGER_MODULES) + "; import main"
+        eager = report("main + " + ", ".join(EAGER_MODULES) + " (기존 방식)", statement, args.top)
+        print(f"\n시작 시 임포트 시간 절감: {(eager - lazy) / 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+API 서버 부하 테스트 스크립트
+동시 사용자 수만큼 keep-alive 커넥션을 열고 요청을 반복해 처리량과 지연 시간을 측정합니다.
+
+사용 예:
+    python simple_api_server.py --mode single   --port 8000
+    python simple_api_server.py --mode threaded --port 8001
+    python bench_api.py --url http://localhost:8000 --url http://localhost:8001 --concurrency 16
+"""
+
+import http.client
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlencode, urlparse
+
+# 프런트엔드(simple_frontend.html)가 호출하는 요청 구성
+DEFAULT_REQUESTS = [
+    ("/health", {}),
+    ("/similar_search", {"q": "경복궁", "method": "jaccard", "limit": 10}),
+    ("/similar_search", {"q": "궁궐 데이트", "method": "jaccard", "limit": 10}),
+    ("/similar_keywords", {"q": "궁궐", "limit": 10}),
+    ("/embedding_stats", {}),
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[idx]
+
+
+def run_load(base_url: str, concurrency: int = 8, duration: float = 10.0,
+             requests=DEFAULT_REQUESTS, timeout: float = 30.0) -> Dict:
+    """
+    고정 시간 동안 동시 사용자 부하 생성
+
+    Args:
+        base_url: 서버 주소 (http://host:port)
+        concurrency: 동시 사용자(커넥션) 수
+        duration: 측정 시간(초)
+        requests: (경로, 쿼리 파라미터) 목록, 사용자마다 순서대로 반복
+        timeout: 요청 타임아웃(초)
+
+    Returns:
+        Dict: 요청 수, 오류 수, 처리량, 지연 시간 백분위(ms)
+    """
+    parsed = urlparse(base_url)
+    paths = [path + ("?" + urlencode(params) if params else "") for path, params in requests]
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(offset: int):
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        local_latencies = []
+        local_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    local_errors += 1
+                if resp.getheader("Connection", "").lower() == "close":
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=user, args=(n,), daemon=True) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": base_url,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='API 서버 부하 테스트')
+    parser.add_argument('--url', action='append', help='서버 주소 (여러 번 지정하면 나란히 비교)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='동시 사용자 수')
+    parser.add_argument('--duration', type=float, default=10.0, help='단계별 측정 시간(초)')
+    args = parser.parse_args()
+
+    urls = args.url or ["http://localhost:8000"]
+    print(f"{'url':<28} {'users':>5} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for concurrency in args.concurrency:
+        for url in urls:
+            r = run_load(url, concurrency, args.duration)
+            print(f"{r['url']:<28} {r['concurrency']:>5} {r['requests']:>7} {r['errors']:>5} "
+                  f"{r['rps']:>8.1f} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ import psycopg2
 import psycopg2.extras
 from opensearchpy import OpenSearch
 
+from keyphrase_extractor import KeyphraseExtractor
+from palace_keywords import get_keywords_for_search
+
 
 load_dotenv()
 
@@ -71,6 +74,52 @@ def upsert_global_trend(cur, period_days: int, metrics: dict):
     )
 
 
+def aggregate_keyword_trends(cur, keywords: list, days: int = 30) -> Iterable[tuple]:
+    # keywords @> ARRAY[...] 조건은 GIN 인덱스(idx_comments_keywords)로 키워드별 댓글만 조회
+    cur.execute(
+        """
+        SELECT k.keyword,
+               COUNT(*) AS total_cnt,
+               AVG(c.sentiment_score)::float AS avg_score,
+               SUM((c.sentiment = 'pos')::int) AS pos_cnt,
+               SUM((c.sentiment = 'neg')::int) AS neg_cnt,
+               COUNT(DISTINCT c.video_id) AS video_cnt
+        FROM unnest(%s::text[]) AS k(keyword)
+        JOIN yt.comments c ON c.keywords @> ARRAY[k.keyword]
+        WHERE c.published_at >= now() - %s * interval '1 day'
+        GROUP BY k.keyword
+        """,
+        (keywords, days),
+    )
+    return cur.fetchall()
+
+
+def upsert_keyword_trends(cur, period_days: int, rows: Iterable[tuple]):
+    start = date.today() - timedelta(days=period_days)
+    end = date.today()
+    values = [
+        ("keyword", keyword, start, end, psycopg2.extras.Json({
+            "comments": int(total_cnt),
+            "videos": int(video_cnt),
+            "avg_sentiment_score": float(avg_score) if avg_score is not None else None,
+            "pos_rate": (pos_cnt or 0) / total_cnt,
+            "neg_rate": (neg_cnt or 0) / total_cnt,
+        }))
+        for keyword, total_cnt, avg_score, pos_cnt, neg_cnt, video_cnt in rows
+    ]
+    # scope_id가 NULL이면 UNIQUE 제약으로 충돌을 잡지 못하므로 같은 기간 행을 지우고 다시 넣음
+    cur.execute(
+        "DELETE FROM yt.trends WHERE scope_type = 'keyword' AND period_start = %s AND period_end = %s",
+        (start, end),
+    )
+    psycopg2.extras.execute_values(
+        cur,
+        "INSERT INTO yt.trends (scope_type, keyword, period_start, period_end, metrics) VALUES %s",
+        values,
+        template="(%s, %s, %s, %s, %s::jsonb)",
+    )
+
+
 def update_os_avg_sentiment(os_client: OpenSearch, index: str, video_yid: str, avg_score: float):
     try:
         os_client.update(index=index, id=video_yid, body={"doc": {"avg_sentiment_score": avg_score}})
@@ -113,8 +162,14 @@ def run(days: int = 30, os_index: str = None):
                 period_days=days,
                 metrics={"total_comments": total, "pos_rate": pos_rate, "neg_rate": neg_rate},
             )
+
+            # 행궁 검색 키워드를 저장된 핵심어 형식으로 맞춰 키워드별 트렌드 계산
+            extractor = KeyphraseExtractor()
+            keywords = sorted({extractor.normalize(k) for k in get_keywords_for_search()} - {""})
+            keyword_rows = aggregate_keyword_trends(cur, keywords, days=days)
+            upsert_keyword_trends(cur, period_days=days, rows=keyword_rows)
         conn.commit()
-    print("Aggregated", len(rows), "videos; updated features/trends and OpenSearch")
+    print("Aggregated", len(rows), "videos and", len(keyword_rows), "keywords; updated features/trends and OpenSearch")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+희소 행렬 기반 일괄 유사도 모듈
+후보 텍스트를 한 번 문자 n-gram / 단어 희소 행렬(scipy CSR)로 인코딩해 두고,
+질의마다 희소 내적과 행 합으로 모든 후보의 jaccard / ngram / word_overlap 점수를 계산합니다.
+점수는 SimilarityCalculator의 쌍별 함수와 같습니다. (짧은 텍스트 처리 포함)
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+BATCH_METHODS = ("jaccard", "ngram", "word_overlap")
+
+
+def jaccard_tokens(text: str, n: int = 2) -> set:
+    """jaccard_similarity의 n-gram 집합 (공백 제거 후 n보다 짧으면 원문 하나)"""
+    chars = text.replace(' ', '')
+    if len(chars) < n:
+        return {text}
+    return {chars[i:i + n] for i in range(len(chars) - n + 1)}
+
+
+def ngram_tokens(text: str, n: int = 2) -> Dict[str, int]:
+    """ngram_similarity의 n-gram 개수 (공백 제거 후 n보다 짧으면 공백 제거 텍스트 하나)"""
+    chars = text.replace(' ', '')
+    if len(chars) < n:
+        return {chars: 1}
+    counts: Dict[str, int] = {}
+    for i in range(len(chars) - n + 1):
+        gram = chars[i:i + n]
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def word_tokens(text: str) -> set:
+    """word_overlap_similarity의 단어 집합 (2글자 이상)"""
+    return {word for word in text.split() if len(word) >= 2}
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    점수 상위 k개 인덱스 (내림차순, 동점은 앞선 인덱스 우선)
+
+    전체 정렬 대신 k번째 값 경계를 O(N)으로 찾고 선택된 k개만 정렬합니다.
+    결과는 안정 정렬 후 앞 k개를 자른 것과 같습니다.
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        # k번째로 큰 값보다 큰 점수는 모두 포함, 같은 점수는 앞선 인덱스부터 채움
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(n)
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def _encode(token_maps: List[Dict[str, int]]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+    """토큰 개수 사전 목록을 (후보 × 어휘) CSR 행렬과 어휘 사전으로 변환"""
+    vocab: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    data: List[int] = []
+    for tokens in token_maps:
+        for token, count in tokens.items():
+            indices.append(vocab.setdefault(token, len(vocab)))
+            data.append(count)
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.int32), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+        shape=(len(token_maps), max(len(vocab), 1)),
+    )
+    return matrix, vocab
+
+
+class BatchTextScorer:
+    """후보 텍스트 목록의 희소 n-gram / 단어 행렬 (방법별로 처음 쓸 때 인코딩)"""
+
+    def __init__(self, texts: Sequence[str], n: int = 2, word_tokenizer: Optional[Callable[[str], set]] = None,
+                 word_sets: Optional[Sequence[Optional[Iterable[str]]]] = None):
+        """
+        Args:
+            texts: 후보 텍스트 (이 순서대로 점수 반환)
+            n: 문자 n-gram 크기
+            word_tokenizer: word_overlap용 텍스트 → 단어 집합 함수 (기본: 공백 분리 2글자 이상)
+            word_sets: 후보별로 미리 계산한 단어 (None인 항목은 word_tokenizer로 계산)
+        """
+        self.texts = list(texts)
+        self.n = n
+        self.word_tokenizer = word_tokenizer or word_tokens
+        self.word_sets = word_sets
+        self._matrices: Dict[str, Tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _matrix(self, method: str) -> Tuple:
+        """(행렬, 어휘, 행별 토큰 수) — jaccard/word_overlap은 0/1 행렬, ngram은 개수 행렬(CSC)"""
+        cached = self._matrices.get(method)
+        if cached is not None:
+            return cached
+        if method == "jaccard":
+            token_maps = [dict.fromkeys(jaccard_tokens(t, self.n), 1) for t in self.texts]
+        elif method == "ngram":
+            token_maps = [ngram_tokens(t, self.n) for t in self.texts]
+        elif method == "word_overlap":
+            token_maps = [
+                dict.fromkeys(self.word_tokenizer(t) if self.word_sets is None or self.word_sets[i] is None
+                              else set(self.word_sets[i]), 1)
+                for i, t in enumerate(self.texts)
+            ]
+        else:
+            raise ValueError(f"일괄 계산을 지원하지 않는 방법: {method}")
+        matrix, vocab = _encode(token_maps)
+        row_totals = np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64)
+        if method == "ngram":
+            # 질의 n-gram 열만 잘라 min(개수)를 구하므로 열 우선 형식으로 보관
+            matrix = matrix.tocsc()
+        cached = (matrix, vocab, row_totals)
+        self._matrices[method] = cached
+        return cached
+
+    def scores(self, query: str, method: str = "jaccard") -> np.ndarray:
+        """
+        모든 후보의 유사도 점수
+
+        Returns:
+            np.ndarray: (len(texts),) float64, 후보 순서대로
+        """
+        if not self.texts:
+            return np.zeros(0)
+        matrix, vocab, row_totals = self._matrix(method)
+
+        if method == "ngram":
+            q_counts = ngram_tokens(query, self.n)
+            cols = [vocab[g] for g in q_counts if g in vocab]
+            common = np.zeros(len(self.texts))
+            if cols:
+                sub = matrix[:, cols]
+                caps = np.array([q_counts[g] for g in q_counts if g in vocab], dtype=np.int64)
+                data = np.minimum(sub.data, np.repeat(caps, np.diff(sub.indptr)))
+                common = np.bincount(sub.indices, weights=data, minlength=len(self.texts))
+            total = sum(q_counts.values()) + row_totals
+            return (2 * common) / total
+
+        q_tokens = jaccard_tokens(query, self.n) if method == "jaccard" else self.word_tokenizer(query)
+        q_vector = np.zeros(matrix.shape[1], dtype=np.int64)
+        for token in q_tokens:
+            col = vocab.get(token)
+            if col is not None:
+                q_vector[col] = 1
+        intersection = matrix @ q_vector
+        union = len(q_tokens) + row_totals - intersection
+
+        if method == "word_overlap":
+            # 양쪽 모두 단어가 없으면 1.0, 한쪽만 없으면 0.0
+            if not q_tokens:
+                return (row_totals == 0).astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(row_totals == 0, 0.0, intersection / union)
+        return intersection / union
+
+
+def benchmark(n_texts: int = 100000, repeat: int = 20) -> None:
+    """합성 제목으로 인코딩/질의 시간과 쌍별 함수 대비 속도, 점수 일치 확인"""
+    import random
+    from similarity_utils import SimilarityCalculator
+
+    rng = random.Random(0)
+    words = ["경복궁", "창덕궁", "덕수궁", "야경", "데이트", "한복", "카페", "맛집", "산책", "브이로그",
+             "서울", "여행", "사진", "투어", "가을", "단풍", "궁궐", "체험", "코스", "추천", "a", "궁"]
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 8))) for _ in range(n_texts)]
+    texts[:4] = ["", " ", "궁", "a b"]
+    queries = ["경복궁 야경", "궁", "", "한복 데이트 코스 추천", "없는말"]
+    calculator = SimilarityCalculator()
+
+    for method in BATCH_METHODS:
+        scorer = BatchTextScorer(texts)
+        start = time.perf_counter()
+        scorer.scores(queries[0], method)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in queries:
+                scorer.scores(query, method)
+        batch_ms = (time.perf_counter() - start) / (repeat * len(queries)) * 1000
+
+        sample = texts[:2000]
+        start = time.perf_counter()
+        for query in queries:
+            expected = np.array([calculator.calculate_similarity(query, t, method) for t in sample])
+            assert np.array_equal(BatchTextScorer(sample).scores(query, method), expected), (method, query)
+        loop_ms = (time.perf_counter() - start) / len(queries) * 1000 * (n_texts / len(sample))
+        print(f"{method:<13} 인코딩 {build_ms:7.1f}ms, 질의당 {batch_ms:6.2f}ms (쌍별 루프 추정 {loop_ms:7.1f}ms), 점수 일치")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='희소 행렬 일괄 유사도')
+    parser.add_argument('--bench', action='store_true', help='합성 제목으로 속도/정확도 확인')
+    parser.add_argument('--size', type=int, default=100000, help='합성 제목 수')
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.size)
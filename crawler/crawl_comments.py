@@ -5,6 +5,9 @@ from typing import Iterable, Optional
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
 import psycopg2
+import psycopg2.extras
+
+from text_utils import clean_text
 
 
 load_dotenv()
@@ -48,47 +51,51 @@ def fetch_comment_threads(video_id: str, max_total: int = 500) -> Iterable[dict]
             return
 
 
-def upsert_comment(cur, video_db_id, comment_item):
+def comment_row(comment_item) -> tuple:
     snip = comment_item["snippet"]["topLevelComment"]["snippet"]
-    comment_yid = comment_item["snippet"]["topLevelComment"]["id"]
-    author_channel_id = snip.get("authorChannelId", {}).get("value")
-    author_name = snip.get("authorDisplayName")
     text_raw = snip.get("textDisplay") or snip.get("textOriginal") or ""
-    like_count = snip.get("likeCount") or 0
-    published_at = snip.get("publishedAt")
+    return (
+        comment_item["snippet"]["topLevelComment"]["id"],
+        snip.get("authorChannelId", {}).get("value"),
+        snip.get("authorDisplayName"),
+        text_raw,
+        clean_text(text_raw),  # 수집 시 한 번 정제해 text_clean에 저장 (감성분석/핵심어 단계가 재사용)
+        snip.get("publishedAt"),
+        snip.get("likeCount") or 0,
+    )
+
 
-    # 존재 여부 확인 (comment_yid 기준)
+def insert_comments(cur, video_db_id, comment_items) -> int:
+    rows = {}
+    for item in comment_items:
+        row = comment_row(item)
+        rows.setdefault(row[0], row)
+    if not rows:
+        return 0
+
+    # 이미 저장된 댓글 제외 (comment_yid 기준, 한 번에 조회)
     cur.execute(
-        "SELECT id FROM yt.comments WHERE platform='youtube' AND comment_yid=%s LIMIT 1",
-        (comment_yid,),
+        "SELECT comment_yid FROM yt.comments WHERE platform='youtube' AND comment_yid = ANY(%s)",
+        (list(rows),),
     )
-    exists = cur.fetchone()
-    if exists:
-        return exists[0]
+    for (comment_yid,) in cur.fetchall():
+        rows.pop(comment_yid, None)
+    if not rows:
+        return 0
 
-    cur.execute(
+    psycopg2.extras.execute_values(
+        cur,
         """
         INSERT INTO yt.comments (
           platform, comment_yid, video_id, author_yid, author_name,
-          text_raw, published_at, like_count, sentiment, sentiment_score, metadata
-        )
-        VALUES (
-          'youtube', %s, %s, %s, %s,
-          %s, %s, %s, NULL, NULL, '{}'::jsonb
+          text_raw, text_clean, published_at, like_count, sentiment, sentiment_score, metadata
         )
-        RETURNING id
+        VALUES %s
         """,
-        (
-            comment_yid,
-            video_db_id,
-            author_channel_id,
-            author_name,
-            text_raw,
-            published_at,
-            like_count,
-        ),
+        [(comment_yid, video_db_id, *rest) for comment_yid, *rest in rows.values()],
+        template="('youtube', %s, %s, %s, %s, %s, %s, %s, %s, NULL, NULL, '{}'::jsonb)",
     )
-    return cur.fetchone()[0]
+    return len(rows)
 
 
 def get_recent_video_ids(cur, days: int = 7, limit: int = 50) -> Iterable[tuple[str, str]]:
@@ -120,10 +127,9 @@ def collect_comments(days: int = 7, per_video_limit: int = 200, video_ids: Optio
 
         for video_db_id, video_yid in rows:
             print("Collecting comments for", video_yid)
-            for item in fetch_comment_threads(video_yid, max_total=per_video_limit):
-                _cid = upsert_comment(cur, video_db_id, item)
+            inserted = insert_comments(cur, video_db_id, fetch_comment_threads(video_yid, max_total=per_video_limit))
             conn.commit()
-            print("Done:", video_yid)
+            print("Done:", video_yid, f"({inserted} new)")
 
 
 if __name__ == "__main__":
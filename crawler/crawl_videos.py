@@ -28,6 +28,10 @@ try:
 except ImportError as e:
 	raise SystemExit("opensearch-py가 설치되어 있지 않습니다. 'pip install opensearch-py'로 설치하세요.") from e
 
+from video_keywords import upsert_video_keywords, upsert_search_keywords, search_rank_score
+from korean_tokenizer import tokenize_title
+from text_utils import clean_text
+
 load_dotenv()
 
 API_KEY = os.getenv("YOUTUBE_API_KEY")
@@ -59,13 +63,15 @@ def upsert_channel(cur, channel_id, title):
     return cur.fetchone()[0]
 
 def upsert_video(cur, video_id, channel_db_id, title, published_at):
+    # 정제 제목과 제목 토큰은 수집 시 한 번 계산 (임베딩 파이프라인과 검색 API가 재사용)
+    title_clean = clean_text(title)
     cur.execute("""
-      INSERT INTO yt.videos (platform, video_yid, channel_id, title, published_at)
-      VALUES ('youtube', %s, %s, %s, %s)
+      INSERT INTO yt.videos (platform, video_yid, channel_id, title, title_clean, title_tokens, published_at)
+      VALUES ('youtube', %s, %s, %s, %s, %s, %s)
       ON CONFLICT (platform, video_yid)
-      DO UPDATE SET title = EXCLUDED.title, channel_id = EXCLUDED.channel_id, published_at = EXCLUDED.published_at, updated_at = now()
+      DO UPDATE SET title = EXCLUDED.title, title_clean = EXCLUDED.title_clean, title_tokens = EXCLUDED.title_tokens, channel_id = EXCLUDED.channel_id, published_at = EXCLUDED.published_at, updated_at = now()
       RETURNING id
-    """, (video_id, channel_db_id, title, published_at))
+    """, (video_id, channel_db_id, title, title_clean, tokenize_title(title_clean), published_at))
     return cur.fetchone()[0]
 
 def index_video_os(video_id, title, channel_id, published_at_iso):
@@ -96,6 +102,8 @@ def search_and_ingest(query="행궁", days=30, max_results=50):
     ]
     
     all_videos = []
+    # 영상별로 어떤 검색 키워드가 몇 위로 찾았는지 기록 {videoId: {키워드: 순위 점수}}
+    search_hits = {}
     
     for keyword in palace_keywords:
         print(f"검색 키워드: {keyword}")
@@ -108,7 +116,11 @@ def search_and_ingest(query="행궁", days=30, max_results=50):
             maxResults=max_results
         ).execute()
         
-        all_videos.extend(resp.get("items", []))
+        items = resp.get("items", [])
+        all_videos.extend(items)
+        for rank, item in enumerate(items):
+            hits = search_hits.setdefault(item["id"]["videoId"], {})
+            hits[keyword] = max(hits.get(keyword, 0.0), search_rank_score(rank, len(items)))
         print(f"키워드 '{keyword}'에서 {len(resp.get('items', []))}개 비디오 발견")
     
     # 중복 제거 (videoId 기준)
@@ -147,7 +159,10 @@ def search_and_ingest(query="행궁", days=30, max_results=50):
                     # 1) 채널 upsert → 내부 UUID
                     channel_db_id = upsert_channel(cur, ch_id, ch_title)
                     # 2) 비디오 upsert
-                    upsert_video(cur, vid, channel_db_id, v_title, pub)
+                    video_db_id = upsert_video(cur, vid, channel_db_id, v_title, pub)
+                    # 2-1) 제목 기반 키워드 매핑 갱신
+                    upsert_video_keywords(cur, video_db_id, v_title)
+                    upsert_search_keywords(cur, video_db_id, search_hits.get(vid, {}))
                     # 3) OS 색인 (OpenSearch 연결 문제로 임시 비활성화)
                     # index_video_os(vid, v_title, ch_id, pub)
 
@@ -169,7 +184,10 @@ def search_and_ingest(query="행궁", days=30, max_results=50):
                 # 1) 채널 upsert → 내부 UUID
                 channel_db_id = upsert_channel(cur, ch_id, ch_title)
                 # 2) 비디오 upsert
-                upsert_video(cur, vid, channel_db_id, v_title, pub)
+                video_db_id = upsert_video(cur, vid, channel_db_id, v_title, pub)
+                # 2-1) 제목 기반 키워드 매핑 갱신
+                upsert_video_keywords(cur, video_db_id, v_title)
+                upsert_search_keywords(cur, video_db_id, search_hits.get(vid, {}))
                 # 3) OS 색인 (OpenSearch 연결 문제로 임시 비활성화)
                 # index_video_os(vid, v_title, ch_id, pub)
 
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+임베딩 추론 사이드카 모듈
+모델을 한 프로세스에만 로드하고 Unix 소켓으로 인코딩 요청을 받습니다.
+uvicorn 워커나 스케줄러 작업은 EmbeddingClient로 접속해 모델 사본 하나를 공유하고,
+동시에 들어온 요청은 MicroBatchEncoder가 한 번의 forward pass로 묶어 처리합니다.
+
+프로토콜 (요청/응답 모두 4바이트 big-endian 길이 + 본문):
+    요청: JSON {"op": "encode", "texts": [...], "normalize": true} 또는 {"op": "info"}
+    응답: JSON 헤더 {"ok": true, "shape": [n, dim]} 뒤에 float32 행렬 바이트 (encode)
+          JSON {"ok": true, "model_name": ..., "dimension": ..., "batching": {...}} (info)
+          JSON {"ok": false, "error": ...} (실패)
+
+사용 예:
+    python embedding_server.py --socket /tmp/yt-embedding.sock
+    EMBEDDING_SOCKET=/tmp/yt-embedding.sock uvicorn main:app --workers 4
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from micro_batching import MicroBatchEncoder
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_SOCKET = "/tmp/yt-embedding.sock"
+_LENGTH = struct.Struct(">I")
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise ConnectionError("연결이 끊어졌습니다")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, length)
+
+
+def _send_frames(sock: socket.socket, *payloads: bytes) -> None:
+    sock.sendall(b"".join(_LENGTH.pack(len(p)) + p for p in payloads))
+
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    """커넥션 하나에서 요청을 반복 처리 (클라이언트가 커넥션을 재사용)"""
+
+    def handle(self):
+        server: "EmbeddingServer" = self.server
+        sock = self.request
+        while True:
+            try:
+                request = json.loads(_recv_frame(sock))
+            except (ConnectionError, OSError):
+                return
+            except ValueError as e:
+                _send_frames(sock, json.dumps({"ok": False, "error": f"잘못된 요청: {e}"}).encode())
+                continue
+
+            try:
+                op = request.get("op", "encode")
+                if op == "info":
+                    _send_frames(sock, json.dumps({"ok": True, **server.info()}).encode())
+                elif op == "encode":
+                    embeddings = server.encoder.encode(request.get("texts") or [],
+                                                       normalize=bool(request.get("normalize", True)))
+                    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+                    header = {"ok": True, "shape": list(embeddings.shape)}
+                    _send_frames(sock, json.dumps(header).encode(), embeddings.tobytes())
+                else:
+                    _send_frames(sock, json.dumps({"ok": False, "error": f"알 수 없는 op: {op}"}).encode())
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                _send_frames(sock, json.dumps({"ok": False, "error": str(e)}).encode())
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """모델 하나를 소유하고 Unix 소켓으로 인코딩 요청을 처리하는 서버"""
+
+    daemon_threads = True
+    # 워커 여러 개가 동시에 접속해도 connect가 거절되지 않도록 listen 대기열을 넉넉히
+    request_queue_size = 128
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, model_name: str = DEFAULT_MODEL,
+                 max_batch: int = 64, max_wait_ms: float = 5.0, embedding_service=None):
+        """
+        Args:
+            socket_path: 리슨할 Unix 소켓 경로 (기존 파일은 지움)
+            model_name: 로드할 임베딩 모델
+            max_batch: 마이크로 배치 최대 텍스트 수
+            max_wait_ms: 요청을 모으는 최대 대기 시간(ms)
+            embedding_service: 이미 로드한 EmbeddingService (없으면 생성)
+        """
+        if embedding_service is None:
+            from embedding_service import EmbeddingService
+            embedding_service = EmbeddingService(model_name)
+        self.embedding_service = embedding_service
+        self.encoder = MicroBatchEncoder(embedding_service.encode, max_batch, max_wait_ms,
+                                         name="embedding-server-batcher")
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _EncodeHandler)
+        os.chmod(socket_path, 0o660)
+
+    def info(self) -> Dict:
+        return {
+            "model_name": self.embedding_service.model_name,
+            "dimension": self.embedding_service.get_embedding_dimension(),
+            "batching": self.encoder.stats(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class EmbeddingClient:
+    """
+    임베딩 사이드카 클라이언트 (EmbeddingService와 같은 encode 인터페이스)
+
+    스레드마다 커넥션 하나를 유지하고, 끊어지면 한 번 다시 연결합니다.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, model_name: Optional[str] = None,
+                 timeout: float = 60.0):
+        """
+        Args:
+            socket_path: 사이드카 Unix 소켓 경로
+            model_name: 기대하는 모델 (사이드카 모델과 다르면 경고)
+            timeout: 요청 타임아웃(초)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        info = self.info()
+        self.model_name = info["model_name"]
+        self._dimension = int(info["dimension"])
+        if model_name and model_name != self.model_name:
+            print(f"경고: 요청한 모델({model_name})과 임베딩 사이드카 모델({self.model_name})이 다릅니다")
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._local.sock = sock
+        return sock
+
+    def _call(self, request: Dict, expect_body: bool) -> tuple:
+        payload = json.dumps(request, ensure_ascii=False).encode()
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                _send_frames(sock, payload)
+                header = json.loads(_recv_frame(sock))
+                body = _recv_frame(sock) if expect_body and header.get("ok") else None
+                break
+            except (ConnectionError, OSError):
+                sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+        if not header.get("ok"):
+            raise RuntimeError(f"임베딩 사이드카 오류: {header.get('error')}")
+        return header, body
+
+    def info(self) -> Dict:
+        return self._call({"op": "info"}, expect_body=False)[0]
+
+    def encode(self, texts: Union[str, List[str]], normalize: bool = True) -> np.ndarray:
+        """
+        텍스트를 벡터 임베딩으로 변환 (사이드카에서 다른 요청과 묶어 인코딩)
+
+        Returns:
+            numpy array: 임베딩 벡터 (shape: [len(texts), embedding_dim])
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, self._dimension), dtype=np.float32)
+        header, body = self._call({"op": "encode", "texts": list(texts), "normalize": normalize},
+                                  expect_body=True)
+        # 응답 버퍼는 읽기 전용이므로 복사해 EmbeddingService 결과처럼 수정 가능하게 반환
+        return np.frombuffer(body, dtype=np.float32).reshape(header["shape"]).copy()
+
+    def get_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def batch_encode(self, texts: List[str], batch_size: int = 32, normalize: bool = True) -> np.ndarray:
+        if not texts:
+            return np.array([])
+        return np.vstack([self.encode(texts[i:i + batch_size], normalize=normalize)
+                          for i in range(0, len(texts), batch_size)])
+
+
+def create_embedding_service(model_name: str = DEFAULT_MODEL):
+    """
+    EMBEDDING_SOCKET이 설정되어 있고 사이드카에 연결되면 EmbeddingClient,
+    아니면 프로세스 내 EmbeddingService 반환
+    """
+    socket_path = os.getenv("EMBEDDING_SOCKET")
+    if socket_path:
+        try:
+            client = EmbeddingClient(socket_path, model_name)
+            print(f"임베딩 사이드카 사용: {socket_path} ({client.model_name})")
+            return client
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"임베딩 사이드카 연결 실패 ({socket_path}): {e}, 프로세스 내 모델 로드")
+    from embedding_service import EmbeddingService
+    return EmbeddingService(model_name)
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='임베딩 추론 사이드카')
+    parser.add_argument('--socket', default=os.getenv("EMBEDDING_SOCKET", DEFAULT_SOCKET), help='Unix 소켓 경로')
+    parser.add_argument('--model', default=os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL), help='임베딩 모델')
+    parser.add_argument('--max-batch', type=int, default=int(os.getenv("ENCODE_MAX_BATCH", "64")),
+                        help='마이크로 배치 최대 텍스트 수')
+    parser.add_argument('--max-wait-ms', type=float, default=float(os.getenv("ENCODE_MAX_WAIT_MS", "5")),
+                        help='요청을 모으는 최대 대기 시간(ms)')
+    args = parser.parse_args()
+
+    server = EmbeddingServer(args.socket, args.model, args.max_batch, args.max_wait_ms)
+    print(f"임베딩 사이드카 시작: {args.socket} ({server.embedding_service.model_name}, "
+          f"max_batch={args.max_batch}, max_wait_ms={args.max_wait_ms})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("임베딩 사이드카 종료")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
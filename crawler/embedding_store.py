@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+메모리 맵 기반 온디스크 임베딩 저장소
+
+yt.video_embeddings의 (embedding_type, model_name) 슬라이스별로
+연속된 float32 .npy 파일과 video_id 사이드카 파일을 스냅샷 디렉터리에 내보낸다.
+API는 시작 시 np.load(mmap_mode='r')로 파일을 매핑하므로, 여러 uvicorn 워커가
+페이지 캐시에 올라간 벡터 한 벌을 복사 없이 공유한다.
+
+디렉터리 구조:
+    <root>/CURRENT                          # 현재 스냅샷 이름 (원자적으로 교체)
+    <root>/snapshots/<name>/manifest.json
+    <root>/snapshots/<name>/<slice>.f32.npy # (N, D) float32, 행 단위 L2 정규화
+    <root>/snapshots/<name>/<slice>.ids.npy # (N,) video_id 문자열
+    <root>/snapshots/<name>/<slice>.f16.npy # (선택) float16 압축본
+    <root>/snapshots/<name>/<slice>.i8.npy  # (선택) int8 스칼라 양자화본
+    <root>/snapshots/<name>/<slice>.i8scale.npy  # (D,) 차원별 스케일
+
+압축본이 있으면 후보 검색은 압축본(float16: 1/2, int8: 1/4 크기)으로 하고,
+상위 후보만 float32 원본으로 재정렬(re-rank)한다. float32 파일은 재정렬 대상 행만
+페이지 인되므로 상주 메모리는 대부분 압축본 크기로 유지된다.
+"""
+
+import os
+import re
+import json
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import psycopg2
+
+
+POINTER_FILE = "CURRENT"
+SNAPSHOT_DIR = "snapshots"
+COMPACT_FORMATS = ("float16", "int8")
+SCORE_CHUNK_ROWS = 8192
+
+
+def slice_key(embedding_type: str, model_name: str) -> str:
+    """(임베딩 타입, 모델명)을 파일명으로 쓸 수 있는 슬라이스 키로 변환"""
+    model_slug = re.sub(r"[^0-9A-Za-z._-]+", "--", model_name)
+    return f"{embedding_type}__{model_slug}"
+
+
+def quantize_int8_scale(vectors: np.ndarray, chunk_rows: int = SCORE_CHUNK_ROWS) -> np.ndarray:
+    """
+    차원별 대칭 스칼라 양자화 스케일 계산 (scale[d] = max|x[:, d]| / 127)
+
+    Args:
+        vectors: (N, D) float32 (메모리 맵 가능, 청크 단위로 읽음)
+
+    Returns:
+        np.ndarray: (D,) float32 스케일
+    """
+    max_abs = np.zeros(vectors.shape[1], dtype=np.float32)
+    for start in range(0, len(vectors), chunk_rows):
+        block = np.asarray(vectors[start:start + chunk_rows], dtype=np.float32)
+        np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+    scale = max_abs / 127.0
+    scale[scale == 0] = 1.0
+    return scale
+
+
+def quantize_int8(block: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """float32 블록을 차원별 스케일로 int8 코드로 변환"""
+    return np.clip(np.rint(block / scale), -127, 127).astype(np.int8)
+
+
+def _write_compact(directory: str, key: str, vectors: np.ndarray, formats) -> List[str]:
+    """float32 슬라이스로부터 압축본 파일 생성 (청크 단위)"""
+    written = []
+    count, dim = vectors.shape
+    if "float16" in formats:
+        f16 = np.lib.format.open_memmap(os.path.join(directory, f"{key}.f16.npy"),
+                                        mode="w+", dtype=np.float16, shape=(count, dim))
+        for start in range(0, count, SCORE_CHUNK_ROWS):
+            f16[start:start + SCORE_CHUNK_ROWS] = vectors[start:start + SCORE_CHUNK_ROWS]
+        f16.flush()
+        del f16
+        written.append("float16")
+    if "int8" in formats:
+        scale = quantize_int8_scale(vectors)
+        codes = np.lib.format.open_memmap(os.path.join(directory, f"{key}.i8.npy"),
+                                          mode="w+", dtype=np.int8, shape=(count, dim))
+        for start in range(0, count, SCORE_CHUNK_ROWS):
+            codes[start:start + SCORE_CHUNK_ROWS] = quantize_int8(
+                np.asarray(vectors[start:start + SCORE_CHUNK_ROWS], dtype=np.float32), scale
+            )
+        codes.flush()
+        del codes
+        np.save(os.path.join(directory, f"{key}.i8scale.npy"), scale)
+        written.append("int8")
+    return written
+
+
+def _write_pointer(root: str, snapshot_name: str):
+    """CURRENT 포인터를 임시 파일 + os.replace로 원자적으로 교체"""
+    tmp_path = os.path.join(root, f".{POINTER_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(snapshot_name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, POINTER_FILE))
+
+
+def read_pointer(root: str) -> Optional[str]:
+    """현재 스냅샷 이름 반환 (없으면 None)"""
+    try:
+        with open(os.path.join(root, POINTER_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def export_embeddings(db_config: Dict, root: str, itersize: int = 2000, keep: int = 2,
+                      compact=COMPACT_FORMATS) -> str:
+    """
+    yt.video_embeddings를 새 스냅샷으로 내보낸 뒤 CURRENT를 원자적으로 교체
+
+    모든 슬라이스를 하나의 REPEATABLE READ 트랜잭션에서 읽으므로
+    행 수와 실제 내보낸 행이 일치한다.
+
+    Args:
+        db_config: psycopg2 연결 설정
+        root: 저장소 루트 디렉터리
+        itersize: 서버 사이드 커서 fetch 크기
+        keep: 유지할 스냅샷 개수 (현재 스냅샷 포함)
+        compact: 함께 만들 압축 형식 ("float16", "int8")
+
+    Returns:
+        str: 새 스냅샷 이름
+    """
+    snapshot_name = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    snapshots_root = os.path.join(root, SNAPSHOT_DIR)
+    tmp_dir = os.path.join(snapshots_root, f".{snapshot_name}.tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    manifest = {"created_at": datetime.utcnow().isoformat() + "Z", "slices": []}
+    conn = psycopg2.connect(**db_config)
+    try:
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT embedding_type, model_name, MAX(embedding_dim), COUNT(*)
+                FROM yt.video_embeddings
+                GROUP BY embedding_type, model_name
+            """)
+            slices = cur.fetchall()
+
+        for embedding_type, model_name, dim, total in slices:
+            key = slice_key(embedding_type, model_name)
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT COUNT(*) FROM yt.video_embeddings
+                    WHERE embedding_type = %s AND model_name = %s AND embedding_dim = %s
+                """, (embedding_type, model_name, dim))
+                count = cur.fetchone()[0]
+            # 슬라이스는 (타입, 모델)당 하나의 차원만 담으므로 다른 차원의 행(모델 변경 전 잔여 등)은 제외
+            skipped = total - count
+            if skipped:
+                print(f"경고: {embedding_type} / {model_name} 슬라이스에서 {dim}차원이 아닌 임베딩 {skipped}개 제외")
+
+            vectors = np.lib.format.open_memmap(
+                os.path.join(tmp_dir, f"{key}.f32.npy"),
+                mode="w+", dtype=np.float32, shape=(count, dim)
+            )
+            ids = []
+            with conn.cursor(name=f"export_{len(manifest['slices'])}") as cur:
+                cur.itersize = itersize
+                cur.execute("""
+                    SELECT video_id, embedding_vector
+                    FROM yt.video_embeddings
+                    WHERE embedding_type = %s AND model_name = %s AND embedding_dim = %s
+                    ORDER BY video_id
+                """, (embedding_type, model_name, dim))
+                offset = 0
+                while True:
+                    rows = cur.fetchmany(itersize)
+                    if not rows:
+                        break
+                    block = np.asarray([row[1] for row in rows], dtype=np.float32)
+                    norms = np.linalg.norm(block, axis=1, keepdims=True)
+                    norms[norms == 0] = 1.0
+                    vectors[offset:offset + len(rows)] = block / norms
+                    ids.extend(str(row[0]) for row in rows)
+                    offset += len(rows)
+            vectors.flush()
+            compact_written = _write_compact(tmp_dir, key, vectors, compact or ())
+            del vectors
+            np.save(os.path.join(tmp_dir, f"{key}.ids.npy"), np.asarray(ids, dtype="U36"))
+
+            manifest["slices"].append({
+                "embedding_type": embedding_type,
+                "model_name": model_name,
+                "key": key,
+                "count": count,
+                "dim": dim,
+                "skipped": skipped,
+                "compact": compact_written,
+            })
+            print(f"내보내기 완료: {embedding_type} / {model_name} ({count}개, {dim}차원, 압축: {compact_written})")
+    finally:
+        conn.close()
+
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    os.rename(tmp_dir, os.path.join(snapshots_root, snapshot_name))
+    _write_pointer(root, snapshot_name)
+    print(f"스냅샷 교체 완료: {snapshot_name}")
+
+    _prune_snapshots(root, keep)
+    return snapshot_name
+
+
+def _prune_snapshots(root: str, keep: int):
+    """오래된 스냅샷 삭제 (현재 스냅샷과 최근 keep개는 유지)"""
+    snapshots_root = os.path.join(root, SNAPSHOT_DIR)
+    current = read_pointer(root)
+    names = sorted(n for n in os.listdir(snapshots_root) if not n.startswith("."))
+    for name in names[:-max(keep, 1)]:
+        if name != current:
+            shutil.rmtree(os.path.join(snapshots_root, name), ignore_errors=True)
+
+
+class EmbeddingSlice:
+    """하나의 (embedding_type, model_name) 슬라이스: 메모리 맵 벡터 + video_id"""
+
+    def __init__(self, directory: str, meta: Dict):
+        self.embedding_type = meta["embedding_type"]
+        self.model_name = meta["model_name"]
+        self.dim = meta["dim"]
+        self.vectors = np.load(os.path.join(directory, f"{meta['key']}.f32.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(directory, f"{meta['key']}.ids.npy"))
+        self._row_by_id = None
+        self.compact = {}
+        self.int8_scale = None
+        formats = meta.get("compact", [])
+        if "float16" in formats:
+            self.compact["float16"] = np.load(os.path.join(directory, f"{meta['key']}.f16.npy"), mmap_mode="r")
+        if "int8" in formats:
+            self.compact["int8"] = np.load(os.path.join(directory, f"{meta['key']}.i8.npy"), mmap_mode="r")
+            self.int8_scale = np.load(os.path.join(directory, f"{meta['key']}.i8scale.npy"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, video_id: str) -> Optional[int]:
+        """video_id의 행 번호 (처음 호출 시 역색인 생성)"""
+        if self._row_by_id is None:
+            self._row_by_id = {vid: i for i, vid in enumerate(self.ids.tolist())}
+        return self._row_by_id.get(str(video_id))
+
+    def search(self, query_vector: np.ndarray, top_k: int = 10,
+               threshold: float = -1.0, precision: str = "float32",
+               rerank_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 상위 k개 검색 (벡터는 정규화되어 있으므로 내적 = 코사인)
+
+        Args:
+            query_vector: 쿼리 벡터
+            top_k: 반환할 개수
+            threshold: 최소 유사도
+            precision: 후보 검색에 쓸 표현 ("float32", "float16", "int8")
+            rerank_k: 압축본에서 뽑아 float32로 재정렬할 후보 수 (기본: max(10 * top_k, 100))
+
+        Returns:
+            List[Tuple[str, float]]: (video_id, 유사도) 리스트
+        """
+        if len(self.ids) == 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        if precision == "float32" or precision not in self.compact:
+            scores = self._scores(self.vectors, query)
+            top = _top_k(scores, top_k)
+            return [(str(self.ids[i]), float(scores[i])) for i in top if scores[i] >= threshold]
+
+        # 1단계: 압축본으로 후보 검색
+        approx = self.approximate_scores(query, precision)
+        candidates = _top_k(approx, rerank_k or max(10 * top_k, 100))
+        # 2단계: 후보 행만 float32 원본으로 재정렬
+        candidates = np.sort(candidates)
+        exact = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+        order = _top_k(exact, top_k)
+        return [(str(self.ids[candidates[i]]), float(exact[i])) for i in order if exact[i] >= threshold]
+
+    def approximate_scores(self, query: np.ndarray, precision: str) -> np.ndarray:
+        """압축본 기반 근사 점수 (int8은 스케일을 쿼리 쪽에 곱해 코드 행렬을 그대로 사용)"""
+        if precision == "int8":
+            return self._scores(self.compact["int8"], query * self.int8_scale)
+        return self._scores(self.compact[precision], query)
+
+    @staticmethod
+    def _scores(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """(N, D) 행렬과 쿼리의 내적을 청크 단위 float32 연산으로 계산"""
+        if matrix.dtype == np.float32:
+            return matrix @ query
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SCORE_CHUNK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def nbytes(self, precision: str = "float32") -> int:
+        """표현별 벡터 저장 크기 (바이트)"""
+        if precision == "float32":
+            return int(self.vectors.nbytes)
+        return int(self.compact[precision].nbytes)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (내림차순, argpartition으로 O(N))"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class EmbeddingStore:
+    """
+    스냅샷 디렉터리의 임베딩 슬라이스를 메모리 맵으로 읽는 저장소
+
+    CURRENT 포인터가 바뀌면 새 스냅샷을 열어 참조를 통째로 교체한다.
+    교체 전에 꺼내 간 슬라이스는 요청이 끝날 때까지 그대로 유효하다.
+    """
+
+    def __init__(self, root: str, check_interval: float = 30.0):
+        self.root = root
+        self.check_interval = check_interval
+        self.snapshot = None
+        self._slices = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """현재 스냅샷을 (바뀐 경우에만) 로드. 교체되면 True"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            name = read_pointer(self.root)
+            if name is None or name == self.snapshot:
+                return False
+            directory = os.path.join(self.root, SNAPSHOT_DIR, name)
+            with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            slices = {}
+            for meta in manifest["slices"]:
+                slices[(meta["embedding_type"], meta["model_name"])] = EmbeddingSlice(directory, meta)
+            self._slices = slices
+            self.snapshot = name
+            print(f"임베딩 스냅샷 로드: {name} ({len(slices)}개 슬라이스)")
+            return True
+
+    def maybe_reload(self) -> bool:
+        """check_interval마다 CURRENT 포인터를 확인해 바뀌었으면 다시 로드"""
+        if time.monotonic() - self._last_check < self.check_interval:
+            return False
+        return self.load()
+
+    def get_slice(self, embedding_type: str, model_name: str) -> Optional[EmbeddingSlice]:
+        """슬라이스 조회 (없으면 None)"""
+        return self._slices.get((embedding_type, model_name))
+
+    def info(self) -> Dict:
+        """현재 스냅샷 요약"""
+        return {
+            "root": self.root,
+            "snapshot": self.snapshot,
+            "slices": [
+                {"embedding_type": t, "model_name": m, "count": len(s), "dim": s.dim}
+                for (t, m), s in self._slices.items()
+            ],
+        }
+
+
+def benchmark_recall(store_slice: Optional[EmbeddingSlice] = None,
+                     n_queries: int = 100, top_k: int = 10,
+                     synthetic_rows: int = 50000, synthetic_dim: int = 384,
+                     rerank_factors=(0, 5, 10), seed: int = 42) -> List[Dict]:
+    """
+    압축 표현별 recall@k / 지연 시간 / 크기 비교
+
+    store_slice가 없으면 군집 구조를 가진 합성 데이터로 임시 슬라이스를 만들어 측정한다.
+    rerank_factor 0은 압축본 점수만으로 순위를 매긴 결과(재정렬 없음)이다.
+    """
+    import tempfile
+
+    rng = np.random.default_rng(seed)
+    tmp_dir = None
+    if store_slice is None:
+        tmp_dir = tempfile.mkdtemp(prefix="embedding_bench_")
+        centers = rng.standard_normal((256, synthetic_dim)).astype(np.float32)
+        data = centers[rng.integers(0, 256, synthetic_rows)]
+        data += 0.35 * rng.standard_normal(data.shape).astype(np.float32)
+        data /= np.linalg.norm(data, axis=1, keepdims=True)
+        np.save(os.path.join(tmp_dir, "bench.f32.npy"), data)
+        np.save(os.path.join(tmp_dir, "bench.ids.npy"), np.asarray([str(i) for i in range(synthetic_rows)], dtype="U36"))
+        written = _write_compact(tmp_dir, "bench", data, COMPACT_FORMATS)
+        store_slice = EmbeddingSlice(tmp_dir, {
+            "embedding_type": "bench", "model_name": "synthetic", "key": "bench",
+            "dim": synthetic_dim, "compact": written,
+        })
+
+    rows = rng.choice(len(store_slice), size=min(n_queries, len(store_slice)), replace=False)
+    queries = np.asarray(store_slice.vectors[np.sort(rows)], dtype=np.float32)
+    queries += 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    truth = [set(i for i, _ in store_slice.search(q, top_k)) for q in queries]
+
+    results = []
+    for precision in ("float32",) + tuple(store_slice.compact):
+        for factor in (rerank_factors if precision != "float32" else (0,)):
+            hits = 0
+            started = time.perf_counter()
+            for q, expected in zip(queries, truth):
+                if precision == "float32":
+                    found = store_slice.search(q, top_k)
+                elif factor == 0:
+                    qn = q / np.linalg.norm(q)
+                    approx = store_slice.approximate_scores(qn, precision)
+                    found = [(str(store_slice.ids[i]), 0.0) for i in _top_k(approx, top_k)]
+                else:
+                    found = store_slice.search(q, top_k, precision=precision, rerank_k=factor * top_k)
+                hits += len(expected & set(i for i, _ in found))
+            elapsed = (time.perf_counter() - started) / len(queries)
+            results.append({
+                "precision": precision,
+                "rerank_k": factor * top_k,
+                f"recall@{top_k}": round(hits / (len(queries) * top_k), 4),
+                "ms_per_query": round(elapsed * 1000, 3),
+                "mbytes": round(store_slice.nbytes(precision) / 1e6, 2),
+            })
+
+    if tmp_dir:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="임베딩 메모리 맵 스냅샷 내보내기 / 압축 recall 벤치마크")
+    parser.add_argument("--out", default=os.getenv("EMBEDDING_STORE_DIR", "./data/embedding_store"),
+                        help="저장소 루트 디렉터리")
+    parser.add_argument("--keep", type=int, default=2, help="유지할 스냅샷 개수")
+    parser.add_argument("--no-compact", action="store_true", help="float16/int8 압축본을 만들지 않음")
+    parser.add_argument("--bench", action="store_true",
+                        help="내보내기 대신 recall 벤치마크 실행 (--slice 미지정 시 합성 데이터)")
+    parser.add_argument("--slice", help="벤치마크할 슬라이스 'embedding_type:model_name'")
+    args = parser.parse_args()
+
+    if args.bench:
+        store_slice = None
+        if args.slice:
+            store = EmbeddingStore(args.out)
+            store.load()
+            embedding_type, model_name = args.slice.split(":", 1)
+            store_slice = store.get_slice(embedding_type, model_name)
+            if store_slice is None:
+                raise SystemExit(f"슬라이스를 찾을 수 없습니다: {args.slice}")
+        print("=== 압축 표현 recall 벤치마크 ===")
+        for row in benchmark_recall(store_slice):
+            print(row)
+        return
+
+    db_config = {
+        'host': os.getenv("DB_HOST", "localhost"),
+        'port': int(os.getenv("DB_PORT", "5432")),
+        'dbname': os.getenv("DB_NAME", "yt"),
+        'user': os.getenv("DB_USER", "app"),
+        'password': os.getenv("DB_PASSWORD", "app1234"),
+    }
+    export_embeddings(db_config, args.out, keep=args.keep,
+                      compact=() if args.no_compact else COMPACT_FORMATS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,141 @@
 import os
 import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Callable
 from datetime import datetime
 import psycopg2
 import psycopg2.extras
 from tqdm import tqdm
 
-from embedding_service import EmbeddingService
+from embedding_server import create_embedding_service
 from similarity_utils import SimilarityCalculator
-from text_utils import clean_text
+from text_utils import clean_text, text_hash
+
+
+def _chunked(rows: Iterable, size: int) -> Iterator[List]:
+    """이터러블을 size 개씩 묶어 리스트로 순차 반환"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _prefetch(iterable: Iterable, depth: int = 2) -> Iterator:
+    """
+    백그라운드 스레드에서 iterable을 미리 소비하여 최대 depth개까지 버퍼링
+
+    DB 읽기(서버 사이드 커서 fetch)가 인코딩과 동시에 진행되도록 한다.
+    버퍼가 가득 차면 생산 측이 대기하므로 메모리 사용량은 depth로 제한된다.
+    소비 측이 중간에 멈추면(limit 도달, 예외, close) 생산 스레드를 멈추고
+    iterable을 닫아 서버 사이드 커서가 바로 정리되도록 한다.
+    """
+    buffer = queue.Queue(maxsize=max(depth, 1))
+    done = object()
+    stop = threading.Event()
+    errors = []
+    iterator = iter(iterable)
+
+    def _put(item) -> bool:
+        # 소비 측이 사라진 뒤 put에서 영원히 막히지 않도록 짧게 기다리며 stop을 확인
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker():
+        try:
+            for item in iterator:
+                if not _put(item):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    errors.append(e)
+            _put(done)
+
+    worker = threading.Thread(target=_worker, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+class StageStats:
+    """파이프라인 단계별 처리량 카운터 (스레드 안전)"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, items: int, seconds: float):
+        """배치 하나의 처리 결과 기록 (큐 대기 시간은 제외하고 전달)"""
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy_seconds += seconds
+    
+    def to_dict(self, wall_seconds: float) -> Dict:
+        """처리량 요약 (busy: 실제 작업 시간 기준, wall: 전체 경과 시간 기준)"""
+        with self._lock:
+            return {
+                'stage': self.name,
+                'items': self.items,
+                'batches': self.batches,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'busy_items_per_sec': round(self.items / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+                'wall_items_per_sec': round(self.items / wall_seconds, 2) if wall_seconds else 0.0,
+                'utilization': round(self.busy_seconds / wall_seconds, 3) if wall_seconds else 0.0,
+            }
+
+
+# 프로세스 풀 인코더: 각 워커 프로세스가 모델을 한 번만 로드해 재사용
+_process_embedding_service = None
+
+
+def _init_encoder_process(model_name: str, torch_threads: int):
+    """
+    인코더 워커 프로세스 초기화 (torch intra-op 스레드 수 지정 후 모델 로드)
+
+    EMBEDDING_SOCKET이 설정되어 있으면 메인 프로세스와 같이 사이드카 클라이언트를 사용한다.
+    """
+    global _process_embedding_service
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    _process_embedding_service = create_embedding_service(model_name)
+
+
+def _encode_in_process(texts: List[str]) -> np.ndarray:
+    """워커 프로세스에서 텍스트 배치 인코딩"""
+    return _process_embedding_service.encode(texts, normalize=True)
 
 
 class EmbeddingPipeline:
@@ -25,17 +151,24 @@ class EmbeddingPipeline:
     
     def __init__(self, 
                  model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
-                 batch_size: int = 32):
+                 batch_size: int = 32,
+                 stream_itersize: int = 500,
+                 os_index: Optional[str] = None):
         """
         임베딩 파이프라인 초기화
         
         Args:
             model_name: 사용할 임베딩 모델
             batch_size: 배치 처리 크기
+            stream_itersize: 스트리밍 모드에서 서버 사이드 커서가 한 번에 가져올 행 수
+            os_index: 벡터를 함께 색인할 OpenSearch k-NN 인덱스 (기본: OS_KNN_INDEX, 없으면 비활성)
         """
-        self.embedding_service = EmbeddingService(model_name)
+        self.embedding_service = create_embedding_service(model_name)
         self.similarity_calculator = SimilarityCalculator()
         self.batch_size = batch_size
+        self.stream_itersize = stream_itersize
+        self.os_index = os_index or os.getenv("OS_KNN_INDEX")
+        self._os_client = None
         
         # 데이터베이스 연결 설정
         self.db_config = {
@@ -59,7 +192,7 @@ class EmbeddingPipeline:
         with psycopg2.connect(**self.db_config) as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 query = """
-                SELECT v.id, v.video_yid, v.title, v.tags, v.description
+                SELECT v.id, v.video_yid, v.title, v.tags, v.description, v.title_clean, v.description_clean
                 FROM yt.videos v
                 LEFT JOIN yt.video_embeddings ve ON v.id = ve.video_id
                 WHERE ve.video_id IS NULL
@@ -71,6 +204,100 @@ class EmbeddingPipeline:
                 cur.execute(query)
                 return cur.fetchall()
     
+    def iter_videos_without_embeddings(self, 
+                                       limit: Optional[int] = None,
+                                       itersize: Optional[int] = None) -> Iterator[Dict]:
+        """
+        임베딩이 없는 영상들을 서버 사이드(named) 커서로 스트리밍 조회
+        
+        fetchall() 대신 itersize 행 단위로 나눠 가져오므로
+        백로그 크기와 관계없이 메모리 사용량이 일정하다.
+        
+        Args:
+            limit: 조회할 최대 개수
+            itersize: 한 번의 네트워크 왕복으로 가져올 행 수
+            
+        Yields:
+            Dict: 영상 정보
+        """
+        query = """
+        SELECT v.id, v.video_yid, v.title, v.tags, v.description, v.title_clean, v.description_clean
+        FROM yt.videos v
+        LEFT JOIN yt.video_embeddings ve ON v.id = ve.video_id
+        WHERE ve.video_id IS NULL
+        ORDER BY v.published_at DESC
+        """
+        params = []
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+        
+        conn = psycopg2.connect(**self.db_config)
+        try:
+            with conn.cursor(name="videos_without_embeddings",
+                             cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.itersize = itersize or self.stream_itersize
+                cur.execute(query, params)
+                for row in cur:
+                    yield row
+        finally:
+            conn.close()
+    
+    def iter_videos_needing_embeddings(self,
+                                       limit: Optional[int] = None,
+                                       itersize: Optional[int] = None) -> Iterator[Dict]:
+        """
+        임베딩 갱신이 필요할 수 있는 영상들을 스트리밍 조회
+        
+        현재 모델 기준으로 (1) 임베딩이 없거나 (2) text_hash가 비어 있거나
+        (3) 마지막 임베딩 이후 임베딩 입력(제목/설명/태그)이 바뀐 경우만 조회한다.
+        재수집이나 백필처럼 입력과 무관한 UPDATE도 바꾸는 updated_at 대신
+        입력 컬럼이 바뀔 때만 트리거가 갱신하는 content_updated_at을 비교한다.
+        실제로 다시 인코딩할지는 iter_prepared에서 정제 텍스트 해시를 비교해 결정한다.
+        마지막 임베딩 시각은 생성 시각과 확인 시각(checked_at) 중 늦은 값을 사용한다.
+        
+        Args:
+            limit: 조회할 최대 개수
+            itersize: 한 번의 네트워크 왕복으로 가져올 행 수
+            
+        Yields:
+            Dict: 영상 정보 (+ hashes: 타입별 기존 text_hash)
+        """
+        query = """
+        SELECT v.id, v.video_yid, v.title, v.tags, v.description, v.title_clean, v.description_clean, e.hashes,
+               v.published_at, c.channel_yid
+        FROM yt.videos v
+        LEFT JOIN yt.channels c ON c.id = v.channel_id
+        LEFT JOIN (
+            SELECT video_id,
+                   jsonb_object_agg(embedding_type, text_hash) AS hashes,
+                   bool_or(text_hash IS NULL) AS missing_hash,
+                   MIN(GREATEST(created_at, checked_at)) AS embedded_at
+            FROM yt.video_embeddings
+            WHERE model_name = %s
+            GROUP BY video_id
+        ) e ON e.video_id = v.id
+        WHERE e.video_id IS NULL
+           OR e.missing_hash
+           OR v.content_updated_at > e.embedded_at
+        ORDER BY v.published_at DESC
+        """
+        params = [self.embedding_service.model_name]
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+        
+        conn = psycopg2.connect(**self.db_config)
+        try:
+            with conn.cursor(name="videos_needing_embeddings",
+                             cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.itersize = itersize or self.stream_itersize
+                cur.execute(query, params)
+                for row in cur:
+                    yield row
+        finally:
+            conn.close()
+    
     def create_embeddings_table(self):
         """임베딩 저장을 위한 테이블 생성"""
         with psycopg2.connect(**self.db_config) as conn:
@@ -84,11 +311,19 @@ class EmbeddingPipeline:
                     embedding_vector FLOAT[] NOT NULL,
                     embedding_dim INTEGER NOT NULL,
                     model_name TEXT NOT NULL,
+                    text_hash TEXT,
                     created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    checked_at TIMESTAMPTZ,
                     UNIQUE(video_id, embedding_type, model_name)
                 );
                 """)
                 
+                # 기존 테이블에 입력 텍스트 해시 / 확인 시각 컬럼 추가
+                cur.execute("""
+                ALTER TABLE yt.video_embeddings ADD COLUMN IF NOT EXISTS text_hash TEXT;
+                ALTER TABLE yt.video_embeddings ADD COLUMN IF NOT EXISTS checked_at TIMESTAMPTZ;
+                """)
+                
                 # 인덱스 생성
                 cur.execute("""
                 CREATE INDEX IF NOT EXISTS idx_video_embeddings_video_id 
@@ -100,6 +335,12 @@ class EmbeddingPipeline:
                 ON yt.video_embeddings(embedding_type);
                 """)
                 
+                # 동일 텍스트 벡터 재사용 조회용
+                cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_video_embeddings_text_hash 
+                ON yt.video_embeddings(model_name, text_hash);
+                """)
+                
                 # 벡터 유사도 검색을 위한 인덱스 (PostgreSQL pgvector 확장 필요)
                 try:
                     cur.execute("""
@@ -123,8 +364,13 @@ class EmbeddingPipeline:
         Returns:
             Dict[str, str]: 임베딩용 텍스트들
         """
-        title = clean_text(video.get('title', ''))
-        description = clean_text(video.get('description', ''))
+        # 수집/정제 단계에서 저장한 정제 텍스트 우선 (없으면 여기서 정제)
+        title = video.get('title_clean')
+        if title is None:
+            title = clean_text(video.get('title', ''))
+        description = video.get('description_clean')
+        if description is None:
+            description = clean_text(video.get('description', ''))
         tags = video.get('tags', [])
         
         # 태그를 문자열로 변환
@@ -146,17 +392,19 @@ class EmbeddingPipeline:
             'full_text': full_text
         }
     
-    def generate_video_embeddings(self, video: Dict) -> Dict[str, np.ndarray]:
+    def generate_video_embeddings(self, video: Dict,
+                                  texts: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
         """
         단일 영상에 대한 임베딩 생성
         
         Args:
             video: 영상 정보
+            texts: 미리 준비된 임베딩용 텍스트 (없으면 video에서 생성)
             
         Returns:
             Dict[str, np.ndarray]: 임베딩 타입별 벡터
         """
-        texts = self.prepare_text_for_embedding(video)
+        texts = texts or self.prepare_text_for_embedding(video)
         embeddings = {}
         
         for text_type, text in texts.items():
@@ -170,35 +418,248 @@ class EmbeddingPipeline:
         
         return embeddings
     
-    def save_embeddings(self, video_id: str, embeddings: Dict[str, np.ndarray]):
+    def save_embeddings(self, video_id: str, embeddings: Dict[str, np.ndarray],
+                        text_hashes: Optional[Dict[str, str]] = None):
         """
         임베딩을 데이터베이스에 저장
         
         Args:
             video_id: 영상 ID
             embeddings: 임베딩 딕셔너리
+            text_hashes: 타입별 입력 텍스트 해시
         """
+        text_hashes = text_hashes or {}
         with psycopg2.connect(**self.db_config) as conn:
             with conn.cursor() as cur:
                 for embedding_type, vector in embeddings.items():
                     cur.execute("""
                     INSERT INTO yt.video_embeddings 
-                    (video_id, embedding_type, embedding_vector, embedding_dim, model_name)
-                    VALUES (%s, %s, %s, %s, %s)
+                    (video_id, embedding_type, embedding_vector, embedding_dim, model_name, text_hash)
+                    VALUES (%s, %s, %s, %s, %s, %s)
                     ON CONFLICT (video_id, embedding_type, model_name)
                     DO UPDATE SET 
                         embedding_vector = EXCLUDED.embedding_vector,
                         embedding_dim = EXCLUDED.embedding_dim,
+                        text_hash = EXCLUDED.text_hash,
                         created_at = now()
                     """, (
                         video_id,
                         embedding_type,
                         vector.tolist(),
                         len(vector),
-                        self.embedding_service.model_name
+                        self.embedding_service.model_name,
+                        text_hashes.get(embedding_type)
                     ))
                 conn.commit()
     
+    def iter_prepared(self, videos: Iterable[Dict]) -> Iterator[Tuple[Dict, Dict[str, str], Dict[str, str]]]:
+        """
+        영상 스트림을 (영상, 임베딩용 텍스트, 텍스트 해시) 스트림으로 변환 (정제 단계)
+        
+        영상에 기존 해시(hashes)가 있으면 해시가 바뀐 타입만 남긴다.
+        바뀐 타입이 없는 영상도 그대로 전달되어 쓰기 단계에서 확인 시각만 갱신된다.
+        
+        Args:
+            videos: 영상 정보 이터러블
+            
+        Yields:
+            Tuple[Dict, Dict[str, str], Dict[str, str]]: (영상 정보, 타입별 텍스트, 타입별 해시)
+        """
+        for video in videos:
+            previous = video.get('hashes') or {}
+            texts = {}
+            hashes = {}
+            for text_type, text in self.prepare_text_for_embedding(video).items():
+                digest = text_hash(text)
+                if previous.get(text_type) == digest:
+                    continue
+                texts[text_type] = text
+                hashes[text_type] = digest
+            yield video, texts, hashes
+    
+    def lookup_cached_vectors(self, conn, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """
+        같은 입력 텍스트로 이미 계산된 벡터 조회 (현재 모델 기준)
+        
+        Args:
+            conn: 조회용 연결
+            hashes: 텍스트 해시 리스트
+            
+        Returns:
+            Dict[str, np.ndarray]: 해시별 벡터
+        """
+        if not hashes:
+            return {}
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT ON (text_hash) text_hash, embedding_vector
+                FROM yt.video_embeddings
+                WHERE model_name = %s AND text_hash = ANY(%s)
+            """, (self.embedding_service.model_name, hashes))
+            rows = cur.fetchall()
+        conn.commit()
+        return {digest: np.asarray(vector, dtype=np.float32) for digest, vector in rows}
+    
+    def iter_with_cached_vectors(self, batches: Iterable[List]) -> Iterator[Tuple[List, Dict[str, np.ndarray]]]:
+        """
+        배치 스트림에 재사용 가능한 기존 벡터를 붙여 전달 (중복 제거 단계)
+        
+        Args:
+            batches: iter_prepared 결과를 묶은 배치 이터러블
+            
+        Yields:
+            Tuple[List, Dict[str, np.ndarray]]: (배치, 해시별 기존 벡터)
+        """
+        conn = psycopg2.connect(**self.db_config)
+        try:
+            for prepared in batches:
+                hashes = list({digest for _, _, item_hashes in prepared for digest in item_hashes.values()})
+                yield prepared, self.lookup_cached_vectors(conn, hashes)
+        finally:
+            conn.close()
+    
+    def encode_prepared_batch(self, prepared: List[Tuple[Dict, Dict[str, str], Dict[str, str]]],
+                              cached: Optional[Dict[str, np.ndarray]] = None) -> List[Tuple[Dict, Dict[str, np.ndarray], Dict[str, str]]]:
+        """
+        정제된 영상 배치를 한 번의 encode 호출로 임베딩
+        
+        같은 텍스트(해시)는 배치 안에서 한 번만 인코딩하고,
+        cached에 있는 텍스트는 인코딩하지 않고 기존 벡터를 재사용한다.
+        빈 텍스트는 EmbeddingService.encode에서 0 벡터로 채워지므로
+        generate_video_embeddings와 동일한 결과를 낸다.
+        
+        Args:
+            prepared: (영상 정보, 타입별 텍스트, 타입별 해시) 리스트
+            cached: 해시별 기존 벡터
+            
+        Returns:
+            List[Tuple[Dict, Dict[str, np.ndarray], Dict[str, str]]]: (영상 정보, 타입별 벡터, 타입별 해시) 리스트
+        """
+        cached = cached or {}
+        hashes, texts = self._unique_texts(prepared, cached)
+        vectors = self.embedding_service.encode(texts, normalize=True) if texts else []
+        return self._assemble_encoded(prepared, cached, hashes, vectors)
+    
+    @staticmethod
+    def _unique_texts(prepared: List[Tuple[Dict, Dict[str, str], Dict[str, str]]],
+                      cached: Dict[str, np.ndarray]) -> Tuple[List[str], List[str]]:
+        """배치에서 실제로 인코딩해야 하는 고유 텍스트 (해시, 텍스트) 목록"""
+        unique = {}
+        for _, texts, hashes in prepared:
+            for text_type, text in texts.items():
+                digest = hashes[text_type]
+                if digest not in cached and digest not in unique:
+                    unique[digest] = text
+        return list(unique.keys()), list(unique.values())
+    
+    @staticmethod
+    def _assemble_encoded(prepared: List[Tuple[Dict, Dict[str, str], Dict[str, str]]],
+                          cached: Dict[str, np.ndarray],
+                          hashes: List[str],
+                          vectors) -> List[Tuple[Dict, Dict[str, np.ndarray], Dict[str, str]]]:
+        """고유 텍스트별 벡터를 영상별 타입 딕셔너리로 되돌림"""
+        by_hash = dict(cached)
+        by_hash.update(zip(hashes, vectors))
+        results = []
+        for video, texts, item_hashes in prepared:
+            embeddings = {text_type: by_hash[item_hashes[text_type]] for text_type in texts}
+            results.append((video, embeddings, item_hashes))
+        return results
+    
+    def save_embeddings_batch(self, cur, encoded: List[Tuple[Dict, Dict[str, np.ndarray], Dict[str, str]]]):
+        """
+        여러 영상의 임베딩을 한 번의 다중 행 upsert로 저장
+        
+        바뀐 타입만 upsert하고(created_at은 실제로 다시 인코딩한 행만 갱신),
+        배치의 모든 영상은 checked_at을 갱신해 다음 실행에서 다시 조회되지 않도록 한다.
+        
+        Args:
+            cur: 쓰기용 커서 (커밋은 호출자가 담당)
+            encoded: (영상 정보, 타입별 벡터, 타입별 해시) 리스트
+        """
+        model_name = self.embedding_service.model_name
+        rows = [
+            (video['id'], embedding_type, np.asarray(vector).tolist(), len(vector), model_name,
+             hashes[embedding_type])
+            for video, embeddings, hashes in encoded
+            for embedding_type, vector in embeddings.items()
+        ]
+        if rows:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO yt.video_embeddings 
+                (video_id, embedding_type, embedding_vector, embedding_dim, model_name, text_hash)
+                VALUES %s
+                ON CONFLICT (video_id, embedding_type, model_name)
+                DO UPDATE SET 
+                    embedding_vector = EXCLUDED.embedding_vector,
+                    embedding_dim = EXCLUDED.embedding_dim,
+                    text_hash = EXCLUDED.text_hash,
+                    created_at = now()
+                """, rows, page_size=len(rows))
+        
+        video_ids = [str(video['id']) for video, _, _ in encoded]
+        if video_ids:
+            cur.execute("""
+                UPDATE yt.video_embeddings
+                SET checked_at = now()
+                WHERE model_name = %s AND video_id = ANY(%s::uuid[])
+            """, (model_name, video_ids))
+    
+    def get_os_client(self):
+        """OpenSearch 클라이언트 (k-NN 색인을 사용할 때만 생성)"""
+        if self._os_client is None:
+            from opensearchpy import OpenSearch
+            self._os_client = OpenSearch(
+                hosts=[os.getenv("OS_HOST", "https://localhost:9200")],
+                http_auth=(os.getenv("OS_USER", "admin"), os.getenv("OS_PASSWORD", "App1234!@#")),
+                use_ssl=True,
+                verify_certs=False,
+            )
+        return self._os_client
+    
+    def push_embeddings_to_opensearch(self, encoded: List[Tuple[Dict, Dict[str, np.ndarray], Dict[str, str]]]) -> int:
+        """
+        임베딩을 OpenSearch k-NN 필드(embedding_<타입>)에 bulk 부분 업데이트
+        
+        문서 ID는 기존 색인과 같은 video_yid이며, 문서가 없으면 새로 만든다.
+        검색 결과를 Postgres 경로와 같은 id로 돌려주기 위한 video_db_id(yt.videos.id)와
+        필터용 published_at / channel_id도 함께 기록한다.
+        
+        Args:
+            encoded: (영상 정보, 타입별 벡터, 타입별 해시) 리스트
+            
+        Returns:
+            int: 색인된 문서 수
+        """
+        if not self.os_index:
+            return 0
+        from opensearchpy import helpers
+        
+        actions = []
+        for video, embeddings, _ in encoded:
+            if not embeddings or not video.get('video_yid'):
+                continue
+            doc = {f"embedding_{text_type}": np.asarray(vector, dtype=np.float32).tolist()
+                   for text_type, vector in embeddings.items()}
+            doc['embedding_model'] = self.embedding_service.model_name
+            doc['video_id'] = video['video_yid']
+            doc['video_db_id'] = str(video['id'])
+            if video.get('published_at'):
+                doc['published_at'] = video['published_at'].isoformat()
+            if video.get('channel_yid'):
+                doc['channel_id'] = video['channel_yid']
+            actions.append({
+                "_op_type": "update",
+                "_index": self.os_index,
+                "_id": video['video_yid'],
+                "doc": doc,
+                "doc_as_upsert": True,
+            })
+        if not actions:
+            return 0
+        success, _ = helpers.bulk(self.get_os_client(), actions, raise_on_error=False)
+        return success
+    
     def process_videos_batch(self, videos: List[Dict]) -> Tuple[int, int]:
         """
         영상 배치 처리
@@ -215,10 +676,12 @@ class EmbeddingPipeline:
         for video in tqdm(videos, desc="Processing videos"):
             try:
                 # 임베딩 생성
-                embeddings = self.generate_video_embeddings(video)
+                texts = self.prepare_text_for_embedding(video)
+                embeddings = self.generate_video_embeddings(video, texts)
                 
                 # 데이터베이스 저장
-                self.save_embeddings(video['id'], embeddings)
+                text_hashes = {text_type: text_hash(text) for text_type, text in texts.items()}
+                self.save_embeddings(video['id'], embeddings, text_hashes)
                 
                 success_count += 1
                 
@@ -228,50 +691,285 @@ class EmbeddingPipeline:
         
         return success_count, error_count
     
-    def run(self, limit: Optional[int] = None, batch_size: Optional[int] = None):
+    def run(self, limit: Optional[int] = None, batch_size: Optional[int] = None,
+            streaming: bool = False, pipelined: bool = False,
+            max_pending_batches: int = 4, encoder_workers: int = 0, torch_threads: int = 0):
         """
         임베딩 생성 파이프라인 실행
         
         Args:
             limit: 처리할 최대 영상 수
             batch_size: 배치 크기
+            streaming: True이면 다음 배치를 백그라운드에서 미리 읽는 스트리밍 모드로 실행
+                (False여도 같은 서버 사이드 커서/변경 감지 경로를 순차 실행)
+            pipelined: True이면 읽기/인코딩/쓰기 단계를 동시에 실행하는 파이프라인 모드로 실행
+            max_pending_batches: 파이프라인 모드 단계 사이 큐 상한
+            encoder_workers: 파이프라인 모드 인코더 프로세스 수 (0이면 현재 프로세스)
+            torch_threads: 파이프라인 모드 워커 프로세스별 torch 스레드 수 (0이면 기본값)
         """
         if batch_size:
             self.batch_size = batch_size
         
-        print("=== 임베딩 생성 파이프라인 시작 ===")
+        if pipelined:
+            return self.run_pipelined(limit, max_pending_batches=max_pending_batches,
+                                      encoder_workers=encoder_workers, torch_threads=torch_threads)
+        if streaming:
+            return self.run_streaming(limit)
+        
+        # 기본 모드도 스트리밍과 같은 변경 감지 경로(content_updated_at + text_hash)를 사용하고
+        # 백그라운드 선읽기만 하지 않는다
+        return self.run_streaming(limit, prefetch_batches=0)
+    
+    def run_streaming(self, limit: Optional[int] = None, prefetch_batches: int = 2):
+        """
+        스트리밍 모드 임베딩 파이프라인 (fetch → clean → encode → write)
+        
+        - 서버 사이드 커서로 itersize 단위 조회 (전체 백로그를 메모리에 올리지 않음)
+        - 백그라운드 스레드가 다음 배치를 미리 읽어 인코딩과 DB 읽기가 겹침
+        - 배치 단위 다중 행 upsert, 하나의 쓰기 연결 재사용
+        
+        Args:
+            limit: 처리할 최대 영상 수
+            prefetch_batches: 미리 읽어 둘 최대 배치 수 (메모리 상한, 0이면 선읽기 없이 순차 실행)
+        """
+        print("=== 임베딩 생성 파이프라인 시작 (스트리밍) ===")
         print(f"모델: {self.embedding_service.model_name}")
-        print(f"배치 크기: {self.batch_size}")
+        print(f"배치 크기: {self.batch_size}, 커서 itersize: {self.stream_itersize}")
         
-        # 테이블 생성
         self.create_embeddings_table()
         
-        # 처리할 영상 조회
-        videos = self.get_videos_without_embeddings(limit)
-        print(f"처리할 영상 수: {len(videos)}")
+        videos = self.iter_videos_needing_embeddings(limit)
+        batches = self.iter_with_cached_vectors(
+            _chunked(self.iter_prepared(videos), self.batch_size)
+        )
+        if prefetch_batches > 0:
+            batches = _prefetch(batches, depth=prefetch_batches)
         
-        if not videos:
-            print("처리할 영상이 없습니다.")
-            return
-        
-        # 배치별 처리
         total_success = 0
         total_error = 0
         
-        for i in range(0, len(videos), self.batch_size):
-            batch = videos[i:i + self.batch_size]
-            print(f"\n배치 {i//self.batch_size + 1}/{(len(videos)-1)//self.batch_size + 1} 처리 중...")
-            
-            success, error = self.process_videos_batch(batch)
-            total_success += success
-            total_error += error
-            
-            print(f"배치 완료: 성공 {success}, 실패 {error}")
+        with psycopg2.connect(**self.db_config) as write_conn:
+            for batch_no, (prepared, cached) in enumerate(batches, start=1):
+                try:
+                    encoded = self.encode_prepared_batch(prepared, cached)
+                    with write_conn.cursor() as cur:
+                        self.save_embeddings_batch(cur, encoded)
+                    write_conn.commit()
+                    total_success += len(prepared)
+                except Exception as e:
+                    write_conn.rollback()
+                    print(f"배치 {batch_no} 처리 실패: {e}")
+                    total_error += len(prepared)
+                    continue
+                
+                try:
+                    self.push_embeddings_to_opensearch(encoded)
+                except Exception as e:
+                    print(f"배치 {batch_no} OpenSearch 색인 실패: {e}")
+                
+                print(f"배치 {batch_no} 완료: 누적 성공 {total_success}, 실패 {total_error}")
+        write_conn.close()
         
         print(f"\n=== 파이프라인 완료 ===")
         print(f"총 성공: {total_success}")
         print(f"총 실패: {total_error}")
-        print(f"성공률: {total_success/(total_success+total_error)*100:.1f}%")
+        if total_success + total_error:
+            print(f"성공률: {total_success/(total_success+total_error)*100:.1f}%")
+        else:
+            print("처리할 영상이 없습니다.")
+    
+    def run_pipelined(self,
+                      limit: Optional[int] = None,
+                      max_pending_batches: int = 4,
+                      encoder_workers: int = 0,
+                      torch_threads: int = 0) -> Dict:
+        """
+        생산자/소비자 파이프라인 모드 (읽기 스레드 → 인코더 → 쓰기 스레드)
+        
+        - 읽기 스레드: 서버 사이드 커서 조회 + 텍스트 정제
+        - 인코더: 현재 프로세스 모델 또는 프로세스 풀(encoder_workers > 0)
+        - 쓰기 스레드: 배치 단위 다중 행 upsert
+        단계 사이 큐는 max_pending_batches로 제한되어 느린 단계가 있으면
+        앞 단계가 대기(backpressure)하므로 메모리 사용량이 일정하게 유지된다.
+        
+        Args:
+            limit: 처리할 최대 영상 수
+            max_pending_batches: 단계 사이 큐에 쌓일 수 있는 최대 배치 수
+            encoder_workers: 인코더 프로세스 수 (0이면 현재 프로세스에서 인코딩)
+            torch_threads: 워커 프로세스별 torch intra-op 스레드 수 (0이면 기본값)
+            
+        Returns:
+            Dict: 성공/실패 개수와 단계별 처리량
+        """
+        print("=== 임베딩 생성 파이프라인 시작 (파이프라인 모드) ===")
+        print(f"모델: {self.embedding_service.model_name}")
+        print(f"배치 크기: {self.batch_size}, 최대 대기 배치: {max_pending_batches}, "
+              f"인코더 프로세스: {encoder_workers or '없음(현재 프로세스)'}")
+        
+        self.create_embeddings_table()
+        
+        stop = object()
+        read_queue = queue.Queue(maxsize=max(max_pending_batches, 1))
+        write_queue = queue.Queue(maxsize=max(max_pending_batches, 1))
+        stats = {name: StageStats(name) for name in ('read', 'encode', 'write')}
+        counts = {'success': 0, 'error': 0}
+        counts_lock = threading.Lock()
+        errors = []
+        
+        def add_count(key: str, n: int):
+            # 인코더(메인 스레드)와 쓰기 스레드가 함께 갱신하므로 잠금 아래에서 증가
+            with counts_lock:
+                counts[key] += n
+        
+        def reader():
+            try:
+                videos = self.iter_videos_needing_embeddings(limit)
+                batches = self.iter_with_cached_vectors(
+                    _chunked(self.iter_prepared(videos), self.batch_size)
+                )
+                started = time.perf_counter()
+                for batch in batches:
+                    stats['read'].record(len(batch[0]), time.perf_counter() - started)
+                    read_queue.put(batch)
+                    started = time.perf_counter()
+            except Exception as e:
+                errors.append(e)
+                print(f"읽기 단계 실패: {e}")
+            finally:
+                read_queue.put(stop)
+        
+        def writer():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db_config)
+            except Exception as e:
+                errors.append(e)
+                print(f"쓰기 연결 실패: {e}")
+            while True:
+                encoded = write_queue.get()
+                if encoded is stop:
+                    break
+                if conn is None:
+                    # 연결이 없으면 큐만 비워 상위 단계가 막히지 않도록 함
+                    add_count('error', len(encoded))
+                    continue
+                started = time.perf_counter()
+                try:
+                    with conn.cursor() as cur:
+                        self.save_embeddings_batch(cur, encoded)
+                    conn.commit()
+                    add_count('success', len(encoded))
+                except Exception as e:
+                    conn.rollback()
+                    add_count('error', len(encoded))
+                    print(f"배치 저장 실패: {e}")
+                else:
+                    try:
+                        self.push_embeddings_to_opensearch(encoded)
+                    except Exception as e:
+                        print(f"OpenSearch 색인 실패: {e}")
+                stats['write'].record(len(encoded), time.perf_counter() - started)
+            if conn is not None:
+                conn.close()
+        
+        wall_started = time.perf_counter()
+        reader_thread = threading.Thread(target=reader, name="embedding-reader", daemon=True)
+        writer_thread = threading.Thread(target=writer, name="embedding-writer", daemon=True)
+        reader_thread.start()
+        writer_thread.start()
+        
+        try:
+            if encoder_workers > 0:
+                self._encode_with_process_pool(read_queue, write_queue, stop, stats['encode'],
+                                               add_count, max_pending_batches,
+                                               encoder_workers, torch_threads)
+            else:
+                while True:
+                    batch = read_queue.get()
+                    if batch is stop:
+                        break
+                    prepared, cached = batch
+                    started = time.perf_counter()
+                    try:
+                        encoded = self.encode_prepared_batch(prepared, cached)
+                    except Exception as e:
+                        add_count('error', len(prepared))
+                        print(f"배치 인코딩 실패: {e}")
+                        continue
+                    stats['encode'].record(len(prepared), time.perf_counter() - started)
+                    write_queue.put(encoded)
+        finally:
+            write_queue.put(stop)
+            # 인코더가 중간에 멈춘 경우에도 읽기 스레드가 put에서 막히지 않도록 남은 배치를 비움
+            while reader_thread.is_alive() or not read_queue.empty():
+                try:
+                    if read_queue.get(timeout=0.1) is stop:
+                        break
+                except queue.Empty:
+                    continue
+            reader_thread.join()
+            writer_thread.join()
+        
+        wall_seconds = time.perf_counter() - wall_started
+        stage_stats = [stats[name].to_dict(wall_seconds) for name in ('read', 'encode', 'write')]
+        
+        print(f"\n=== 파이프라인 완료 ({wall_seconds:.2f}초) ===")
+        print(f"총 성공: {counts['success']}")
+        print(f"총 실패: {counts['error']}")
+        for stage in stage_stats:
+            print(f"[{stage['stage']}] {stage['items']}개 / {stage['batches']}배치, "
+                  f"busy {stage['busy_seconds']}초 ({stage['busy_items_per_sec']}개/초), "
+                  f"wall {stage['wall_items_per_sec']}개/초, 가동률 {stage['utilization']:.0%}")
+        
+        return {
+            'success': counts['success'],
+            'error': counts['error'],
+            'wall_seconds': round(wall_seconds, 3),
+            'stages': stage_stats,
+        }
+    
+    def _encode_with_process_pool(self, read_queue: queue.Queue, write_queue: queue.Queue,
+                                  stop, encode_stats: StageStats, add_count: Callable[[str, int], None],
+                                  max_pending_batches: int, encoder_workers: int,
+                                  torch_threads: int):
+        """
+        프로세스 풀로 배치를 인코딩하고 입력 순서대로 쓰기 큐에 전달
+        
+        진행 중인 배치 수를 max_pending_batches로 제한하여 풀 앞에서도 backpressure를 유지한다.
+        """
+        in_flight = deque()
+        
+        def drain_one():
+            prepared, cached, hashes, future, submitted = in_flight.popleft()
+            try:
+                vectors = future.result()
+            except Exception as e:
+                add_count('error', len(prepared))
+                print(f"배치 인코딩 실패: {e}")
+                return
+            encode_stats.record(len(prepared), time.perf_counter() - submitted)
+            write_queue.put(self._assemble_encoded(prepared, cached, hashes, vectors))
+        
+        with ProcessPoolExecutor(max_workers=encoder_workers,
+                                 initializer=_init_encoder_process,
+                                 initargs=(self.embedding_service.model_name, torch_threads)) as pool:
+            while True:
+                batch = read_queue.get()
+                if batch is stop:
+                    break
+                prepared, cached = batch
+                hashes, texts = self._unique_texts(prepared, cached)
+                if not texts:
+                    # 모두 재사용 가능한 배치는 풀을 거치지 않고 바로 쓰기 단계로 전달
+                    write_queue.put(self._assemble_encoded(prepared, cached, [], []))
+                    continue
+                in_flight.append((prepared, cached, hashes,
+                                  pool.submit(_encode_in_process, texts),
+                                  time.perf_counter()))
+                while len(in_flight) >= max(max_pending_batches, 1):
+                    drain_one()
+            while in_flight:
+                drain_one()
     
     def get_embedding_stats(self) -> Dict:
         """임베딩 통계 조회"""
@@ -325,5 +1023,31 @@ def test_embedding_pipeline():
     pipeline.run(limit=10, batch_size=2)
 
 
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='기존 데이터 임베딩 생성')
+    parser.add_argument('--model', default="sentence-transformers/all-MiniLM-L6-v2", help='임베딩 모델')
+    parser.add_argument('--limit', type=int, default=10, help='처리할 최대 영상 수 (기본 10, 0이면 전체 백로그)')
+    parser.add_argument('--batch-size', type=int, default=32, help='배치 크기')
+    parser.add_argument('--streaming', action='store_true', help='서버 사이드 커서 스트리밍 모드')
+    parser.add_argument('--pipelined', action='store_true', help='읽기/인코딩/쓰기 동시 실행 파이프라인 모드')
+    parser.add_argument('--max-pending-batches', type=int, default=4, help='파이프라인 단계 사이 큐 상한')
+    parser.add_argument('--encoder-workers', type=int, default=0, help='인코더 프로세스 수 (0이면 현재 프로세스)')
+    parser.add_argument('--torch-threads', type=int, default=0, help='워커 프로세스별 torch 스레드 수')
+    parser.add_argument('--test', action='store_true', help='통계 조회 후 최대 10개 영상으로 소규모 테스트')
+    args = parser.parse_args()
+
+    if args.test:
+        test_embedding_pipeline()
+        return
+
+    pipeline = EmbeddingPipeline(model_name=args.model, batch_size=args.batch_size)
+    pipeline.run(limit=args.limit, streaming=args.streaming, pipelined=args.pipelined,
+                 max_pending_batches=args.max_pending_batches,
+                 encoder_workers=args.encoder_workers, torch_threads=args.torch_threads)
+
+
 if __name__ == "__main__":
-    test_embedding_pipeline()
+    main()
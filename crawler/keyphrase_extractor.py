@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+댓글 핵심어 추출 모듈
+정제된 댓글(text_utils.clean_text)을 korean_tokenizer로 토큰화해 단어/인접 두 단어 구를 후보로 만들고,
+배치 단위 TF-IDF(또는 댓글별 TextRank)로 상위 핵심어를 골라 yt.comments.keywords에 저장합니다.
+키워드 트렌드 조회는 GIN 인덱스(idx_comments_keywords)로 keywords @> ARRAY['경복궁'] 조건을 바로 사용합니다.
+
+사용 예:
+    python keyphrase_extractor.py "경복궁 야경 진짜 예뻐요 한복 입고 가면 사진 잘 나와요"
+    python keyphrase_extractor.py --backfill          # 감성분석은 끝났지만 keywords가 비어 있는 댓글 채우기
+    python keyphrase_extractor.py --backfill --all    # 추출 설정을 바꾼 뒤 전체 다시 계산
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from korean_tokenizer import BaseTokenizer, get_tokenizer
+
+EXTRACT_METHODS = ("tfidf", "textrank")
+
+# 댓글에 흔하지만 주제를 나타내지 않는 말
+_STOPWORDS = frozenset([
+    "진짜", "정말", "너무", "완전", "그냥", "이거", "저거", "그거", "여기", "거기", "우리", "저희",
+    "영상", "댓글", "구독", "좋아요", "오늘", "이번", "하다", "있다", "없다", "되다", "같다", "보다",
+    "이다", "아니다", "그렇다", "많다", "좋다", "싶다",
+])
+
+
+class KeyphraseExtractor:
+    """배치 단위 핵심어 추출기 (문서 빈도는 처리한 댓글 전체에 누적)"""
+
+    def __init__(self, tokenizer: Optional[BaseTokenizer] = None, top_n: int = 8,
+                 method: str = "tfidf", window: int = 3):
+        """
+        Args:
+            tokenizer: 한국어 토크나이저 (기본: get_tokenizer(), 제목 토큰과 같은 KOREAN_TOKENIZER)
+            top_n: 댓글당 저장할 최대 핵심어 수
+            method: tfidf (배치 내 문서 빈도 사용) 또는 textrank (댓글 안 동시 출현 그래프)
+            window: textrank 동시 출현 창 크기
+        """
+        if method not in EXTRACT_METHODS:
+            raise ValueError(f"알 수 없는 추출 방법: {method} (사용 가능: {', '.join(EXTRACT_METHODS)})")
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.top_n = top_n
+        self.method = method
+        self.window = window
+        self._df: Counter = Counter()
+        self._n_docs = 0
+
+    def words(self, text: str) -> List[str]:
+        """후보 단어 (2글자 이상, 불용어 제외, 등장 순서)"""
+        return [t for t in self.tokenizer.tokenize(text) if len(t) >= 2 and t not in _STOPWORDS]
+
+    @staticmethod
+    def phrases(words: Sequence[str]) -> List[str]:
+        """후보 핵심어: 단어와 인접한 두 단어 구 ("궁궐 카페")"""
+        return list(words) + [f"{a} {b}" for a, b in zip(words, words[1:]) if a != b]
+
+    def normalize(self, phrase: str) -> str:
+        """검색 키워드를 저장된 핵심어 형식으로 변환 ("궁궐 카페에서" → "궁궐 카페")"""
+        return " ".join(self.words(phrase))
+
+    def extract_batch(self, texts: Sequence[Optional[str]]) -> List[List[str]]:
+        """
+        정제된 댓글 배치의 핵심어
+
+        Args:
+            texts: clean_text로 정제한 댓글
+
+        Returns:
+            List[List[str]]: 댓글 순서대로 점수 내림차순 핵심어 (후보가 없으면 빈 리스트)
+        """
+        docs = [self.words(text or "") for text in texts]
+        if self.method == "textrank":
+            return [self._textrank(words) for words in docs]
+
+        doc_phrases = [self.phrases(words) for words in docs]
+        for phrases in doc_phrases:
+            self._df.update(set(phrases))
+        self._n_docs += len(doc_phrases)
+        return [self._tfidf(phrases) for phrases in doc_phrases]
+
+    def _tfidf(self, phrases: List[str]) -> List[str]:
+        if not phrases:
+            return []
+        counts = Counter(phrases)
+        scores = {
+            phrase: count * (math.log((1 + self._n_docs) / (1 + self._df[phrase])) + 1.0)
+            for phrase, count in counts.items()
+        }
+        # Counter는 첫 등장 순서를 유지하므로 동점은 앞에 나온 핵심어 우선
+        return sorted(scores, key=scores.get, reverse=True)[:self.top_n]
+
+    def _textrank(self, words: List[str], damping: float = 0.85, iterations: int = 30) -> List[str]:
+        if not words:
+            return []
+        vocab: Dict[str, int] = {}
+        for word in words:
+            vocab.setdefault(word, len(vocab))
+        ids = [vocab[word] for word in words]
+        graph = np.zeros((len(vocab), len(vocab)))
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:i + self.window]:
+                if a != b:
+                    graph[a, b] += 1.0
+                    graph[b, a] += 1.0
+        out_weight = graph.sum(axis=1)
+        transition = np.divide(graph, out_weight[:, None], out=np.zeros_like(graph), where=out_weight[:, None] > 0)
+        rank = np.full(len(vocab), 1.0 / len(vocab))
+        for _ in range(iterations):
+            rank = (1 - damping) / len(vocab) + damping * (transition.T @ rank)
+
+        scores = {word: float(rank[idx]) for word, idx in vocab.items()}
+        for phrase in self.phrases(words)[len(words):]:
+            a, b = phrase.split(" ", 1)
+            scores[phrase] = max(scores.get(phrase, 0.0), scores[a] + scores[b])
+        return sorted(scores, key=scores.get, reverse=True)[:self.top_n]
+
+
+def update_comment_keywords(cur, values: List[tuple]) -> None:
+    """(id, published_at, 핵심어 리스트) 목록을 한 번의 UPDATE로 저장 (published_at으로 파티션 한정)"""
+    import psycopg2.extras
+
+    psycopg2.extras.execute_values(cur, """
+      UPDATE yt.comments AS c SET keywords = t.keywords
+      FROM (VALUES %s) AS t(id, published_at, keywords)
+      WHERE c.id = t.id AND c.published_at = t.published_at
+    """, values, template="(%s::uuid, %s::timestamptz, %s::text[])")
+
+
+def backfill_comment_keywords(db_config: Optional[Dict] = None, batch_size: int = 1000,
+                              only_missing: bool = True, method: Optional[str] = None) -> Dict[str, int]:
+    """
+    감성분석이 끝난 댓글의 핵심어(yt.comments.keywords) 일괄 계산
+
+    Args:
+        db_config: DB 접속 정보 (기본: 환경변수)
+        batch_size: 한 번에 읽고 쓸 댓글 수 (TF-IDF 문서 빈도는 배치를 넘어 누적)
+        only_missing: True면 keywords가 NULL인 댓글만, False면 전체
+        method: tfidf 또는 textrank (기본: COMMENT_KEYWORDS_METHOD, 없으면 tfidf)
+
+    Returns:
+        Dict[str, int]: 처리한 댓글 수
+    """
+    import psycopg2
+
+    from text_utils import clean_text
+
+    if db_config is None:
+        db_config = {
+            'host': os.getenv("DB_HOST", "localhost"),
+            'port': int(os.getenv("DB_PORT", "5432")),
+            'dbname': os.getenv("DB_NAME", "yt"),
+            'user': os.getenv("DB_USER", "app"),
+            'password': os.getenv("DB_PASSWORD", "app1234"),
+        }
+    extractor = KeyphraseExtractor(top_n=int(os.getenv("COMMENT_KEYWORDS_TOP_N", "8")),
+                                   method=method or os.getenv("COMMENT_KEYWORDS_METHOD", "tfidf"))
+    where = "AND keywords IS NULL" if only_missing else ""
+    stats = {'comments': 0}
+
+    with psycopg2.connect(**db_config) as read_conn, psycopg2.connect(**db_config) as write_conn:
+        with read_conn.cursor(name="comment_keywords_backfill") as read_cur:
+            read_cur.itersize = batch_size
+            read_cur.execute(f"""
+                SELECT id, published_at, text_raw, text_clean FROM yt.comments
+                WHERE sentiment IS NOT NULL {where}
+            """)
+            while True:
+                rows = read_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                keywords = extractor.extract_batch([
+                    text_clean if text_clean is not None else clean_text(text_raw)
+                    for _, _, text_raw, text_clean in rows
+                ])
+                with write_conn.cursor() as cur:
+                    update_comment_keywords(cur, [
+                        (str(cid), published_at, phrases)
+                        for (cid, published_at, _, _), phrases in zip(rows, keywords)
+                    ])
+                write_conn.commit()
+                stats['comments'] += len(rows)
+
+    print(f"댓글 핵심어 계산 완료 ({extractor.method}, {extractor.tokenizer.name}): 댓글 {stats['comments']}개")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='댓글 핵심어 추출')
+    parser.add_argument('text', nargs='*', help='핵심어를 뽑을 댓글')
+    parser.add_argument('--method', choices=EXTRACT_METHODS, default=None, help='기본: COMMENT_KEYWORDS_METHOD')
+    parser.add_argument('--backfill', action='store_true', help='yt.comments.keywords 채우기')
+    parser.add_argument('--all', action='store_true', help='--backfill 시 전체 댓글 다시 계산')
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill_comment_keywords(only_missing=not args.all, method=args.method)
+    else:
+        texts = [" ".join(args.text)] if args.text else [
+            "경복궁 야경 진짜 예뻐요 한복 입고 가면 사진 잘 나와요",
+            "창덕궁 후원 예약하고 갔는데 단풍이 너무 좋았어요",
+            "궁궐 카페 추천 감사합니다 경복궁 근처 카페 가봐야겠네요",
+        ]
+        extractor = KeyphraseExtractor(method=args.method or os.getenv("COMMENT_KEYWORDS_METHOD", "tfidf"))
+        for text, phrases in zip(texts, extractor.extract_batch(texts)):
+            print(f"[{extractor.method}] {text} -> {phrases}")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+임베딩 기반 검색어 → 행궁 키워드 라우팅 모듈
+행궁 키워드/카테고리 벡터를 한 번 계산해 .npz로 저장해 두고,
+질의 벡터(메모이즈)와 키워드 행렬의 내적 한 번으로 가장 가까운 키워드를 찾습니다.
+"""
+
+import os
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from palace_matcher import PALACE_KEYWORDS, PALACE_CATEGORIES
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_VECTORS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "keyword_vectors.npz"
+)
+
+
+def build_keyword_vectors(path: str = DEFAULT_VECTORS_PATH, model_name: str = DEFAULT_MODEL,
+                          embedding_service=None) -> str:
+    """
+    키워드/카테고리 벡터 계산 후 저장
+
+    카테고리 벡터는 소속 키워드 벡터 평균을 정규화한 값입니다.
+
+    Args:
+        path: 저장할 .npz 경로
+        model_name: 임베딩 모델
+        embedding_service: 재사용할 EmbeddingService (없으면 생성)
+
+    Returns:
+        str: 저장한 파일 경로
+    """
+    if embedding_service is None:
+        from embedding_server import create_embedding_service
+        embedding_service = create_embedding_service(model_name)
+
+    keywords = list(PALACE_KEYWORDS)
+    vectors = embedding_service.encode(keywords, normalize=True).astype(np.float32)
+    row_of = {keyword: i for i, keyword in enumerate(keywords)}
+
+    categories = list(PALACE_CATEGORIES)
+    category_vectors = np.zeros((len(categories), vectors.shape[1]), dtype=np.float32)
+    for i, category in enumerate(categories):
+        rows = [row_of[k] for k in PALACE_CATEGORIES[category] if k in row_of]
+        if rows:
+            mean = vectors[rows].mean(axis=0)
+            category_vectors[i] = mean / max(np.linalg.norm(mean), 1e-12)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        keywords=np.array(keywords),
+        vectors=vectors,
+        categories=np.array(categories),
+        category_vectors=category_vectors,
+        model_name=np.array(embedding_service.model_name),
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+class KeywordRouter:
+    """미리 계산한 키워드 벡터로 검색어를 행궁 키워드에 라우팅"""
+
+    def __init__(self, path: str = DEFAULT_VECTORS_PATH, model_name: str = DEFAULT_MODEL,
+                 cache_size: int = 4096, build_if_missing: bool = True):
+        """
+        Args:
+            path: 키워드 벡터 .npz 경로
+            model_name: 임베딩 모델 (저장된 벡터와 다르면 다시 계산)
+            cache_size: 질의 벡터 LRU 캐시 크기
+            build_if_missing: 파일이 없거나 키워드 목록/모델이 바뀌었으면 새로 계산
+        """
+        self.path = path
+        self.model_name = model_name
+        self._embedding_service = None
+
+        if not self._load():
+            if not build_if_missing:
+                raise FileNotFoundError(f"키워드 벡터가 없거나 오래되었습니다: {path}")
+            build_keyword_vectors(path, model_name, self.get_embedding_service())
+            self._load()
+
+        self._embed_cached = lru_cache(maxsize=cache_size)(self._embed_query)
+
+    def _load(self) -> bool:
+        """저장된 벡터 로드 (없거나 현재 키워드 목록/모델과 다르면 False)"""
+        if not os.path.exists(self.path):
+            return False
+        with np.load(self.path) as data:
+            keywords = [str(k) for k in data["keywords"]]
+            if keywords != list(PALACE_KEYWORDS) or str(data["model_name"]) != self.model_name:
+                return False
+            self.keywords = keywords
+            self.vectors = np.ascontiguousarray(data["vectors"], dtype=np.float32)
+            self.categories = [str(c) for c in data["categories"]]
+            self.category_vectors = np.ascontiguousarray(data["category_vectors"], dtype=np.float32)
+        return True
+
+    def get_embedding_service(self):
+        """질의 인코딩용 모델 (캐시에 없는 질의가 처음 들어올 때 로드)"""
+        if self._embedding_service is None:
+            from embedding_server import create_embedding_service
+            self._embedding_service = create_embedding_service(self.model_name)
+        return self._embedding_service
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        vector = self.get_embedding_service().encode(query, normalize=True)[0].astype(np.float32)
+        vector.flags.writeable = False
+        return vector
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """정규화된 질의 벡터 (공백 정리 후 메모이즈)"""
+        return self._embed_cached(" ".join(query.lower().split()))
+
+    def route(self, query: str, top_k: int = 3, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        질의와 코사인 유사도가 높은 키워드
+
+        Args:
+            query: 사용자 검색어
+            top_k: 반환할 키워드 수
+            threshold: 최소 유사도
+
+        Returns:
+            List[Tuple[str, float]]: (키워드, 유사도) 리스트
+        """
+        scores = self.vectors @ self.embed_query(query)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(self.keywords[i], float(scores[i])) for i in order if scores[i] >= threshold]
+
+    def route_category(self, query: str) -> Tuple[Optional[str], float]:
+        """질의와 가장 가까운 카테고리와 유사도"""
+        if not self.categories:
+            return None, 0.0
+        scores = self.category_vectors @ self.embed_query(query)
+        best = int(np.argmax(scores))
+        return self.categories[best], float(scores[best])
+
+    def cache_info(self) -> Dict:
+        info = self._embed_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def benchmark(router: KeywordRouter, queries: List[str], repeat: int = 1000):
+    """첫 호출(모델 인코딩)과 캐시된 질의의 라우팅 시간 비교"""
+    for query in queries:
+        start = time.perf_counter()
+        router.route(query)
+        first_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = router.route(query)
+        cached_us = (time.perf_counter() - start) / repeat * 1e6
+        print(f"'{query}': 첫 호출 {first_ms:.1f}ms, 캐시 {cached_us:.1f}us -> {result}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='행궁 키워드 벡터 라우터')
+    parser.add_argument('--build', action='store_true', help='키워드 벡터 다시 계산')
+    parser.add_argument('--path', default=os.getenv("KEYWORD_VECTORS_PATH", DEFAULT_VECTORS_PATH))
+    parser.add_argument('--model', default=os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL))
+    parser.add_argument('--bench', action='store_true', help='라우팅 시간 측정')
+    args = parser.parse_args()
+
+    if args.build:
+        print(f"키워드 벡터 저장: {build_keyword_vectors(args.path, args.model)}")
+
+    router = KeywordRouter(args.path, args.model)
+    queries = ["고궁 데이트", "궁 근처 커피숍", "조선 왕조 궁전 구경", "경복궁 야경 사진"]
+    if args.bench:
+        benchmark(router, queries)
+    else:
+        for query in queries:
+            print(f"'{query}' -> {router.route(query)} / 카테고리 {router.route_category(query)}")
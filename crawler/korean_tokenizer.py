@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+한국어 토크나이저 모듈
+형태소 분석기(kiwipiepy → konlpy Okt)를 순서대로 시도하고, 둘 다 없으면
+조사를 떼어 내는 순수 파이썬 토크나이저를 사용합니다. ("경복궁에서" → "경복궁")
+영상 제목은 수집 시 한 번 토큰화해 yt.videos.title_tokens에 저장하고,
+유사도 계산(word_overlap, TF-IDF)은 저장된 토큰을 재사용합니다.
+
+사용 예:
+    python korean_tokenizer.py "경복궁에서 한복 입고 야경 데이트"
+    python korean_tokenizer.py --backfill          # title_tokens가 비어 있는 영상 채우기
+    python korean_tokenizer.py --backfill --all    # 토크나이저를 바꾼 뒤 전체 다시 계산
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+TOKENIZER_NAMES = ("kiwi", "okt", "simple")
+
+# 긴 조사부터 떼어 냄 (한 글자 조사는 남는 어간이 두 글자 이상일 때만)
+_JOSA = sorted([
+    "에서부터", "으로부터", "에게서", "한테서", "이라고", "이라는", "까지", "부터", "에서", "에게", "한테",
+    "으로", "처럼", "보다", "이랑", "하고", "라고", "라는", "이나", "이며", "에는", "에도", "으로는",
+    "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "랑",
+], key=len, reverse=True)
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+class BaseTokenizer:
+    """토크나이저 공통 인터페이스 (같은 텍스트는 LRU 캐시 재사용)"""
+
+    name = "base"
+
+    def __init__(self, cache_size: int = 8192):
+        self._cached = lru_cache(maxsize=cache_size)(self._tokenize_text)
+
+    def _tokenize_text(self, text: str) -> Tuple[str, ...]:
+        raise NotImplementedError
+
+    def tokenize(self, text: Optional[str]) -> Tuple[str, ...]:
+        """
+        텍스트를 검색용 토큰으로 분리
+
+        Returns:
+            Tuple[str, ...]: 소문자 토큰 (등장 순서, 중복 포함)
+        """
+        if not text:
+            return ()
+        return self._cached(text)
+
+
+class SimpleTokenizer(BaseTokenizer):
+    """순수 파이썬 폴백: 한글/영숫자 덩어리로 나누고 끝의 조사를 제거"""
+
+    name = "simple"
+
+    @staticmethod
+    def strip_josa(word: str) -> str:
+        for josa in _JOSA:
+            if word.endswith(josa):
+                stem = word[:-len(josa)]
+                if len(stem) >= (2 if len(josa) == 1 else 1):
+                    return stem
+        return word
+
+    def _tokenize_text(self, text: str) -> Tuple[str, ...]:
+        tokens = []
+        for chunk in _TOKEN_RE.findall(text.lower()):
+            tokens.append(self.strip_josa(chunk) if "가" <= chunk[0] <= "힣" else chunk)
+        return tuple(tokens)
+
+
+class KiwiTokenizer(BaseTokenizer):
+    """kiwipiepy 형태소 분석 (체언, 용언 어간, 어근, 외국어, 숫자만 사용)"""
+
+    name = "kiwi"
+    KEEP_TAGS = ("NNG", "NNP", "NR", "VV", "VA", "XR", "SL", "SN", "SH")
+
+    def __init__(self, cache_size: int = 8192):
+        from kiwipiepy import Kiwi
+        self._kiwi = Kiwi()
+        super().__init__(cache_size)
+
+    def _tokenize_text(self, text: str) -> Tuple[str, ...]:
+        return tuple(
+            token.form.lower() for token in self._kiwi.tokenize(text)
+            if token.tag.startswith(self.KEEP_TAGS)
+        )
+
+
+class OktTokenizer(BaseTokenizer):
+    """konlpy Okt 형태소 분석 (명사, 동사/형용사 원형, 영문, 숫자)"""
+
+    name = "okt"
+    KEEP_POS = ("Noun", "Verb", "Adjective", "Alpha", "Number")
+
+    def __init__(self, cache_size: int = 8192):
+        from konlpy.tag import Okt
+        self._okt = Okt()
+        self._lock = threading.Lock()  # JVM 분석기는 스레드 간 공유 시 직렬화
+        super().__init__(cache_size)
+
+    def _tokenize_text(self, text: str) -> Tuple[str, ...]:
+        with self._lock:
+            pos = self._okt.pos(text, norm=True, stem=True)
+        return tuple(word.lower() for word, tag in pos if tag in self.KEEP_POS)
+
+
+_BACKENDS = {"kiwi": KiwiTokenizer, "okt": OktTokenizer, "simple": SimpleTokenizer}
+_instances: Dict[str, BaseTokenizer] = {}
+_instances_lock = threading.Lock()
+
+
+def get_tokenizer(name: Optional[str] = None) -> BaseTokenizer:
+    """
+    토크나이저 싱글톤
+
+    Args:
+        name: kiwi, okt, simple 또는 auto (기본: KOREAN_TOKENIZER 환경변수, 없으면 auto)
+              auto는 kiwi → okt → simple 순서로 사용 가능한 것을 고름
+
+    Raises:
+        ValueError: 알 수 없는 이름
+    """
+    name = (name or os.getenv("KOREAN_TOKENIZER", "auto")).lower()
+    if name != "auto" and name not in _BACKENDS:
+        raise ValueError(f"알 수 없는 토크나이저: {name} (사용 가능: auto, {', '.join(TOKENIZER_NAMES)})")
+    with _instances_lock:
+        if name in _instances:
+            return _instances[name]
+        candidates = TOKENIZER_NAMES if name == "auto" else (name,)
+        tokenizer = None
+        for candidate in candidates:
+            try:
+                tokenizer = _BACKENDS[candidate]()
+                break
+            except Exception as e:
+                # 패키지 미설치 또는 JVM 없음 → 다음 후보
+                if candidate == name:
+                    raise
+                print(f"{candidate} 토크나이저 사용 불가 ({e}), 다음 후보 시도")
+        _instances[name] = tokenizer
+        return tokenizer
+
+
+def tokenize_title(title: Optional[str], tokenizer: Optional[BaseTokenizer] = None) -> List[str]:
+    """yt.videos.title_tokens에 저장할 제목 토큰"""
+    return list((tokenizer or get_tokenizer()).tokenize(title))
+
+
+def backfill_title_tokens(db_config: Optional[Dict] = None, batch_size: int = 1000,
+                          only_missing: bool = True) -> Dict[str, int]:
+    """
+    영상 제목 토큰(yt.videos.title_tokens) 일괄 계산
+
+    Args:
+        db_config: DB 접속 정보 (기본: 환경변수)
+        batch_size: 한 번에 읽고 쓸 영상 수
+        only_missing: True면 title_tokens가 NULL인 영상만, False면 전체 (토크나이저 변경 시)
+
+    Returns:
+        Dict[str, int]: 처리한 영상 수
+    """
+    import psycopg2
+    import psycopg2.extras
+
+    if db_config is None:
+        db_config = {
+            'host': os.getenv("DB_HOST", "localhost"),
+            'port': int(os.getenv("DB_PORT", "5432")),
+            'dbname': os.getenv("DB_NAME", "yt"),
+            'user': os.getenv("DB_USER", "app"),
+            'password': os.getenv("DB_PASSWORD", "app1234"),
+        }
+    from text_utils import clean_text
+
+    tokenizer = get_tokenizer()
+    where = "WHERE title_tokens IS NULL" if only_missing else ""
+    stats = {'videos': 0}
+
+    with psycopg2.connect(**db_config) as read_conn, psycopg2.connect(**db_config) as write_conn:
+        with read_conn.cursor(name="title_tokens_backfill") as read_cur:
+            read_cur.itersize = batch_size
+            read_cur.execute(f"SELECT id, title, title_clean FROM yt.videos {where}")
+            while True:
+                rows = read_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                # 수집기와 같이 정제 제목을 토큰화 (정제 값이 없으면 여기서 정제)
+                values = [(str(video_id), tokenize_title(title_clean if title_clean is not None else clean_text(title),
+                                                         tokenizer))
+                          for video_id, title, title_clean in rows]
+                with write_conn.cursor() as cur:
+                    psycopg2.extras.execute_values(cur, """
+                      UPDATE yt.videos AS v SET title_tokens = t.tokens
+                      FROM (VALUES %s) AS t(id, tokens)
+                      WHERE v.id = t.id
+                    """, values, template="(%s::uuid, %s::text[])")
+                write_conn.commit()
+                stats['videos'] += len(rows)
+
+    print(f"제목 토큰 계산 완료 ({tokenizer.name}): 영상 {stats['videos']}개")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='한국어 토크나이저')
+    parser.add_argument('text', nargs='*', help='토큰화할 문장')
+    parser.add_argument('--tokenizer', default=None, help='kiwi, okt, simple, auto')
+    parser.add_argument('--backfill', action='store_true', help='yt.videos.title_tokens 채우기')
+    parser.add_argument('--all', action='store_true', help='--backfill 시 전체 영상 다시 계산')
+    args = parser.parse_args()
+
+    if args.tokenizer:
+        os.environ["KOREAN_TOKENIZER"] = args.tokenizer
+    if args.backfill:
+        backfill_title_tokens(only_missing=not args.all)
+    texts = [" ".join(args.text)] if args.text else [
+        "경복궁에서 한복 입고 야경 데이트", "창덕궁 후원 가을 단풍 브이로그", "덕수궁 돌담길을 걷다가 카페로",
+    ]
+    tokenizer = get_tokenizer()
+    for text in texts:
+        print(f"[{tokenizer.name}] {text} -> {list(tokenizer.tokenize(text))}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+동적 마이크로 배칭 인코더 모듈
+여러 스레드에서 동시에 들어오는 인코딩 요청을 짧은 시간(max_wait_ms) 동안 모아
+한 번의 forward pass로 처리한 뒤 요청별 결과를 돌려줍니다.
+배치 크기 1짜리 인코딩이 반복되는 대신 모델 호출 횟수를 줄입니다.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("texts", "normalize", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str], normalize: bool):
+        self.texts = texts
+        self.normalize = normalize
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatchEncoder:
+    """요청을 모아 한 번에 인코딩하는 래퍼 (EmbeddingService와 같은 encode 인터페이스)"""
+
+    def __init__(self, encode_fn: Callable, max_batch: int = 32, max_wait_ms: float = 5.0,
+                 name: str = "micro-batch-encoder"):
+        """
+        Args:
+            encode_fn: encode(texts, normalize=...) -> np.ndarray (예: EmbeddingService.encode)
+            max_batch: 한 번에 인코딩할 최대 텍스트 수
+            max_wait_ms: 첫 요청 이후 다음 요청을 기다리는 최대 시간(ms). 0이면 대기 없이 쌓인 요청만 묶음
+        """
+        self.encode_fn = encode_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        # max_batch를 넘겨 이번 배치에 넣지 못한 요청 (다음 배치의 첫 요청, 워커 스레드만 사용)
+        self._carry: Optional[_Request] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0,
+                       "queue_wait_s": 0.0, "encode_s": 0.0, "max_batch_seen": 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: Union[str, List[str]], normalize: bool = True) -> Future:
+        """인코딩 요청을 큐에 넣고 Future 반환 (결과: np.ndarray [len(texts), dim])"""
+        if isinstance(texts, str):
+            texts = [texts]
+        request = _Request(list(texts), normalize)
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: Union[str, List[str]], normalize: bool = True) -> np.ndarray:
+        """submit 후 결과를 기다림"""
+        return self.submit(texts, normalize).result()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """
+        첫 요청부터 max_wait 동안 또는 max_batch를 채울 때까지 요청 수집
+
+        더하면 max_batch를 넘는 요청은 다음 배치로 넘긴다. (첫 요청 하나가 max_batch보다 크면 그대로 단독 배치)
+        """
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch:
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first, self._carry = self._carry, None
+            batch = self._collect(first if first is not None else self._queue.get())
+            # normalize 옵션이 다른 요청은 따로 인코딩
+            for normalize in (True, False):
+                group = [r for r in batch if r.normalize == normalize]
+                if group:
+                    self._encode_group(group, normalize)
+
+    def _encode_group(self, group: List[_Request], normalize: bool) -> None:
+        texts = [text for request in group for text in request.texts]
+        started = time.perf_counter()
+        try:
+            embeddings = self.encode_fn(texts, normalize=normalize) if texts else None
+            if texts and len(embeddings) != len(texts):
+                raise RuntimeError(f"인코딩 결과 수가 입력과 다릅니다: {len(embeddings)} != {len(texts)}")
+            finished = time.perf_counter()
+
+            offset = 0
+            for request in group:
+                n = len(request.texts)
+                if n:
+                    request.future.set_result(embeddings[offset:offset + n])
+                else:
+                    request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+                offset += n
+        except Exception as e:
+            # 결과를 받지 못한 요청만 실패 처리 (워커 스레드는 계속 동작)
+            for request in group:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            with self._stats_lock:
+                self._stats["errors"] += len(group)
+            return
+
+        with self._stats_lock:
+            stats = self._stats
+            stats["requests"] += len(group)
+            stats["texts"] += len(texts)
+            stats["batches"] += 1
+            stats["queue_wait_s"] += sum(started - r.enqueued_at for r in group)
+            stats["encode_s"] += finished - started
+            stats["max_batch_seen"] = max(stats["max_batch_seen"], len(texts))
+
+    def stats(self) -> Dict:
+        """누적 배칭 지표 (평균 배치 크기, 평균 큐 대기/인코딩 시간 ms)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        requests = stats["requests"] or 1
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": stats["requests"],
+            "texts": stats["texts"],
+            "batches": stats["batches"],
+            "errors": stats["errors"],
+            "pending": self._queue.qsize(),
+            "avg_batch_size": round(stats["texts"] / batches, 2),
+            "max_batch_seen": stats["max_batch_seen"],
+            "avg_queue_wait_ms": round(stats["queue_wait_s"] / requests * 1000, 3),
+            "avg_encode_ms": round(stats["encode_s"] / batches * 1000, 3),
+        }
+
+
+def benchmark(encode_fn, concurrency: int = 16, requests_per_user: int = 20,
+              max_batch: int = 32, max_wait_ms: float = 2.0) -> None:
+    """동시 사용자들이 검색어 하나씩 인코딩할 때 직접 호출과 마이크로 배칭의 처리량/지연 비교"""
+    queries = [f"경복궁 야경 데이트 {i}" for i in range(concurrency * requests_per_user)]
+    batcher = MicroBatchEncoder(encode_fn, max_batch, max_wait_ms)
+    model_lock = threading.Lock()
+
+    def direct(text):
+        # 모델 하나를 여러 스레드가 나눠 쓰는 기존 방식 (배치 크기 1)
+        with model_lock:
+            return encode_fn([text], normalize=True)
+
+    for label, fn in (("direct", direct), ("batched", lambda text: batcher.encode(text))):
+        latencies = []
+        lock = threading.Lock()
+
+        def user(offset):
+            local = []
+            for i in range(requests_per_user):
+                start = time.perf_counter()
+                fn(queries[offset * requests_per_user + i])
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(f"{label:<8} {len(latencies) / elapsed:8.1f} q/s  "
+              f"p50 {latencies[len(latencies) // 2] * 1000:7.1f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f}ms")
+    print(f"batched stats: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='마이크로 배칭 처리량 측정')
+    parser.add_argument('--model', default=os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 사용자 수')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    from embedding_service import EmbeddingService
+    service = EmbeddingService(args.model)
+    benchmark(service.encode, args.concurrency, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+행궁 키워드 매칭 모듈
+키워드 목록, 카테고리, 의미 매핑의 단일 원본과 미리 컴파일된 매처를 제공합니다.
+루트와 crawler의 palace_keywords.py는 이 모듈을 다시 내보냅니다.
+
+매처는 import 시 한 번 만들어지며, 질의 하나를 처리하는 비용은
+키워드 목록 크기가 아니라 질의 길이와 실제 매칭된 키워드 수에 비례합니다.
+- 키워드 ⊂ 질의: Aho-Corasick 오토마톤으로 질의를 한 번 훑어 찾음
+- 질의 ⊂ 키워드, 질의 단어 ⊂ 키워드: 키워드 부분 문자열 인덱스 조회
+- 공통 단어: 단어 역색인
+- 의미 유사도: 동의어 → 해당 그룹 단어를 포함한 키워드 역색인
+"""
+
+import time
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 행궁 관련 검색어 목록
+PALACE_KEYWORDS = [
+    # 주요 궁궐
+    "경복궁", "창덕궁", "덕수궁", "창경궁", "경희궁",
+
+    # 행궁 일반
+    "행궁", "궁궐", "고궁", "왕궁",
+
+    # 구체적 장소
+    "경복궁 근정전", "창덕궁 인정전", "덕수궁 중화전",
+    "창경궁 명정전", "경희궁 숭정전",
+
+    # 관련 용어
+    "궁궐 관광", "고궁 투어", "궁궐 역사", "조선 궁궐",
+    "궁궐 문화", "궁궐 체험", "궁궐 가이드",
+
+    # 지역별
+    "서울 궁궐", "종로 궁궐", "중구 궁궐",
+
+    # 활동
+    "궁궐 산책", "궁궐 사진", "궁궐 탐방", "궁궐 답사",
+
+    # 데이트/맛집 관련
+    "궁궐 데이트", "궁궐 카페", "궁궐 맛집", "궁궐 식당",
+    "궁궐 주변 카페", "궁궐 주변 맛집", "궁궐 주변 식당",
+    "궁궐 데이트코스", "궁궐 커플여행", "궁궐 연인여행"
+]
+
+# 검색어 카테고리별 분류
+PALACE_CATEGORIES = {
+    "main_palaces": ["경복궁", "창덕궁", "덕수궁", "창경궁", "경희궁"],
+    "general_terms": ["행궁", "궁궐", "고궁", "왕궁"],
+    "specific_places": [
+        "경복궁 근정전", "창덕궁 인정전", "덕수궁 중화전",
+        "창경궁 명정전", "경희궁 숭정전"
+    ],
+    "activities": [
+        "궁궐 관광", "고궁 투어", "궁궐 역사", "조선 궁궐",
+        "궁궐 문화", "궁궐 체험", "궁궐 가이드",
+        "궁궐 산책", "궁궐 사진", "궁궐 탐방", "궁궐 답사",
+        "궁궐 데이트", "궁궐 카페", "궁궐 맛집", "궁궐 식당",
+        "궁궐 주변 카페", "궁궐 주변 맛집", "궁궐 주변 식당",
+        "궁궐 데이트코스", "궁궐 커플여행", "궁궐 연인여행"
+    ],
+    "locations": ["서울 궁궐", "종로 궁궐", "중구 궁궐"]
+}
+
+# 의미적 유사도 매핑 (한국어)
+SEMANTIC_MAPPING = {
+    "데이트": ["데이트", "커플", "연인", "커플여행", "연인여행", "데이트코스"],
+    "카페": ["카페", "커피", "음료", "휴식", "브런치"],
+    "식당": ["식당", "맛집", "음식", "레스토랑", "식사", "먹방"],
+    "여행": ["여행", "관광", "투어", "방문", "체험"],
+    "산책": ["산책", "걷기", "산책로", "걷기", "도보"],
+    "사진": ["사진", "촬영", "포토", "인스타", "스냅"]
+}
+
+
+class AhoCorasick:
+    """여러 패턴을 텍스트 한 번 순회로 찾는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: 찾을 문자열 목록 (빈 문자열 제외)
+        """
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+
+        for pattern in set(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = nxt
+            self.output[state].append(pattern)
+
+        # BFS로 실패 링크 계산
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if self.goto[f].get(ch, 0) != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find_all(self, text: str) -> set:
+        """text에 부분 문자열로 등장하는 패턴 집합"""
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            if self.output[state]:
+                found.update(self.output[state])
+        return found
+
+
+class KeywordMatcher:
+    """키워드 목록을 미리 색인한 유사 키워드 매처"""
+
+    def __init__(self, keywords: List[str], semantic_mapping: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            keywords: 키워드 목록 (순서가 동점 정렬 순서)
+            semantic_mapping: 의미 그룹 {대표어: [동의어, ...]}
+        """
+        self.keywords = list(keywords)
+        semantic_mapping = semantic_mapping or {}
+        lowered = [keyword.lower() for keyword in self.keywords]
+        self._lengths = [len(keyword) for keyword in lowered]
+        self._word_counts = [len(set(keyword.split())) for keyword in lowered]
+
+        # 소문자 키워드 → 인덱스 (완전 일치 / 키워드 ⊂ 질의)
+        self._by_lower: Dict[str, List[int]] = defaultdict(list)
+        for idx, keyword in enumerate(lowered):
+            self._by_lower[keyword].append(idx)
+        self._automaton = AhoCorasick(self._by_lower)
+
+        # 키워드의 모든 부분 문자열 → 인덱스 (질의 ⊂ 키워드)
+        self._substrings: Dict[str, set] = defaultdict(set)
+        for idx, keyword in enumerate(lowered):
+            for start in range(len(keyword)):
+                for end in range(start + 1, len(keyword) + 1):
+                    self._substrings[keyword[start:end]].add(idx)
+
+        # 단어 역색인 (공통 단어)
+        self._word_index: Dict[str, List[int]] = defaultdict(list)
+        for idx, keyword in enumerate(lowered):
+            for word in set(keyword.split()):
+                self._word_index[word].append(idx)
+
+        # 동의어 → 그룹 단어 중 하나라도 포함하는 키워드 집합 (의미 유사도)
+        self._semantic: Dict[str, set] = defaultdict(set)
+        for values in semantic_mapping.values():
+            matched = set()
+            for value in values:
+                matched |= self._substrings.get(value, set())
+            for value in values:
+                self._semantic[value] |= matched
+
+    def similarities(self, query: str) -> Dict[int, float]:
+        """
+        질의와 매칭되는 키워드 인덱스별 유사도
+
+        점수 규칙 (먼저 해당하는 규칙 하나만 적용):
+        1. 완전 일치 1.0
+        2. 포함 관계 0.8 × (짧은 길이 / 긴 길이)
+        3. 의미 그룹 일치 0.6
+        4. 공통 단어 0.4 × (공통 단어 수 / 더 많은 단어 수)
+        5. 질의 단어(2자 이상)가 키워드에 포함 0.2
+        """
+        q = query.lower()
+        q_len = len(q)
+        scores: Dict[int, float] = {}
+
+        if not q:
+            # 빈 질의는 모든 키워드에 포함되어 포함 관계 점수 0.0
+            return {idx: 0.0 for idx in range(len(self.keywords))}
+
+        for idx in self._by_lower.get(q, ()):
+            scores[idx] = 1.0
+
+        contained = set(self._substrings.get(q, ()))
+        for keyword in self._automaton.find_all(q):
+            contained.update(self._by_lower[keyword])
+        for idx in contained:
+            if idx not in scores:
+                k_len = self._lengths[idx]
+                scores[idx] = 0.8 * (min(q_len, k_len) / max(q_len, k_len))
+
+        for idx in self._semantic.get(q, ()):
+            if idx not in scores:
+                scores[idx] = 0.6
+
+        q_words = set(q.split())
+        common = defaultdict(int)
+        for word in q_words:
+            for idx in self._word_index.get(word, ()):
+                common[idx] += 1
+        for idx, count in common.items():
+            if idx not in scores:
+                scores[idx] = 0.4 * (count / max(len(q_words), self._word_counts[idx]))
+
+        for word in q.split():
+            if len(word) >= 2:
+                for idx in self._substrings.get(word, ()):
+                    if idx not in scores:
+                        scores[idx] = 0.2
+
+        return scores
+
+    def contained_in(self, text: str) -> List[int]:
+        """text에 부분 문자열로 포함된 키워드 인덱스 (대소문자 무시, 키워드 목록 순서)"""
+        found = []
+        for keyword in self._automaton.find_all(text.lower()):
+            found.extend(self._by_lower[keyword])
+        return sorted(found)
+
+    def find_most_similar(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """유사도 상위 top_k 키워드 (동점은 키워드 목록 순서)"""
+        if not query:
+            return [(keyword, 0.0) for keyword in self.keywords[:max(top_k, 0)]]
+        scores = self.similarities(query)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(self.keywords[idx], score) for idx, score in ranked]
+
+
+def reference_similarities(query: str, keywords: List[str],
+                           semantic_mapping: Dict[str, List[str]], top_k: int = 5) -> List[Tuple[str, float]]:
+    """
+    키워드마다 문자열 비교를 반복하는 기존 구현 (매처 검증 및 벤치마크 기준)
+    """
+    query_lower = query.lower()
+    similarities = []
+
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        similarity = 0.0
+
+        if query_lower == keyword_lower:
+            similarities.append((keyword, 1.0))
+            continue
+
+        if query_lower in keyword_lower or keyword_lower in query_lower:
+            similarity = 0.8 * (min(len(query_lower), len(keyword_lower)) / max(len(query_lower), len(keyword_lower)))
+            similarities.append((keyword, similarity))
+            continue
+
+        for semantic_key, semantic_values in semantic_mapping.items():
+            if query_lower in semantic_values:
+                for semantic_value in semantic_values:
+                    if semantic_value in keyword_lower:
+                        similarity = 0.6
+                        break
+                if similarity > 0:
+                    break
+
+        if similarity == 0:
+            query_words = set(query_lower.split())
+            keyword_words = set(keyword_lower.split())
+            common_words = query_words.intersection(keyword_words)
+            if common_words:
+                similarity = 0.4 * (len(common_words) / max(len(query_words), len(keyword_words)))
+
+        if similarity == 0:
+            for word in query_lower.split():
+                if len(word) >= 2 and word in keyword_lower:
+                    similarity = 0.2
+
+        if similarity > 0:
+            similarities.append((keyword, similarity))
+
+    similarities.sort(key=lambda x: x[1], reverse=True)
+    return similarities[:top_k]
+
+
+# import 시 한 번 컴파일
+PALACE_MATCHER = KeywordMatcher(PALACE_KEYWORDS, SEMANTIC_MAPPING)
+
+
+def get_all_keywords():
+    """모든 행궁 관련 키워드 반환"""
+    return PALACE_KEYWORDS.copy()
+
+def get_keywords_by_category(category):
+    """카테고리별 키워드 반환"""
+    return PALACE_CATEGORIES.get(category, [])
+
+def get_keywords_for_search():
+    """검색에 사용할 키워드 목록 반환 (중복 제거)"""
+    all_keywords = set()
+    for category_keywords in PALACE_CATEGORIES.values():
+        all_keywords.update(category_keywords)
+    return list(all_keywords)
+
+def find_most_similar_keywords(query, top_k=5):
+    """입력된 쿼리와 가장 유사한 행궁 키워드들 반환"""
+    return PALACE_MATCHER.find_most_similar(query, top_k)
+
+
+TEST_QUERIES = [
+    "궁궐", "경복궁", "고궁", "왕궁", "궁궐 관광", "데이트", "커피", "맛집 추천",
+    "경복궁 야간개장", "창덕궁 후원 산책", "서울 데이트 코스", "사진", "", "행궁동 카페",
+]
+
+def benchmark(sizes=(1, 10, 100), repeat: int = 200, seed: int = 42):
+    """
+    기존 구현과 컴파일 매처의 질의당 시간 비교
+
+    실제 키워드 목록에 질의와 겹치지 않는 합성 키워드를 덧붙여 목록 크기를 늘립니다.
+    두 구현의 결과가 같은지도 함께 확인합니다.
+
+    Args:
+        sizes: 원래 목록 대비 키워드 목록 배수
+        repeat: 측정 반복 횟수
+        seed: 합성 키워드 난수 시드
+    """
+    import random
+    rng = random.Random(seed)
+    filler_chars = [chr(code) for code in range(ord("가"), ord("가") + 400)]
+
+    for size in sizes:
+        keywords = list(PALACE_KEYWORDS)
+        while len(keywords) < len(PALACE_KEYWORDS) * size:
+            words = ["".join(rng.choice(filler_chars) for _ in range(rng.randint(2, 4)))
+                     for _ in range(rng.randint(1, 3))]
+            keywords.append("zz" + " ".join(words))
+
+        build_start = time.perf_counter()
+        matcher = KeywordMatcher(keywords, SEMANTIC_MAPPING)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        for query in TEST_QUERIES:
+            expected = reference_similarities(query, keywords, SEMANTIC_MAPPING, top_k=10)
+            assert matcher.find_most_similar(query, 10) == expected, query
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in TEST_QUERIES:
+                reference_similarities(query, keywords, SEMANTIC_MAPPING, top_k=5)
+        naive_us = (time.perf_counter() - start) / (repeat * len(TEST_QUERIES)) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in TEST_QUERIES:
+                matcher.find_most_similar(query, 5)
+        compiled_us = (time.perf_counter() - start) / (repeat * len(TEST_QUERIES)) * 1e6
+
+        print(f"키워드 {len(keywords):>5}개 | 기존 {naive_us:9.1f}us/질의 | "
+              f"컴파일 {compiled_us:7.1f}us/질의 | 빌드 {build_ms:7.1f}ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='행궁 키워드 매처')
+    parser.add_argument('--bench', action='store_true', help='기존 구현 대비 질의당 시간 측정')
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark()
+    else:
+        for query in TEST_QUERIES:
+            print(f"\n=== '{query}' 검색 결과 ===")
+            for keyword, score in find_most_similar_keywords(query, 3):
+                print(f"  {keyword}: {score:.3f}")
@@ -3,9 +3,11 @@ from typing import Iterable
 
 from dotenv import load_dotenv
 import psycopg2
+import psycopg2.extras
 
 from sentiment_infer import SentimentService
 from text_utils import clean_text
+from keyphrase_extractor import KeyphraseExtractor
 
 
 load_dotenv()
@@ -22,7 +24,7 @@ DB = dict(
 def iter_unprocessed_comments(cur, batch_size: int = 200) -> Iterable[tuple]:
     cur.execute(
         """
-        SELECT id, text_raw
+        SELECT id, published_at, text_raw, text_clean
         FROM yt.comments
         WHERE sentiment IS NULL
         LIMIT %s
@@ -34,23 +36,38 @@ def iter_unprocessed_comments(cur, batch_size: int = 200) -> Iterable[tuple]:
 
 def process_sentiment(batch_size: int = 200):
     svc = SentimentService()
+    # 감성분석과 같은 배치에서 핵심어도 추출 (TF-IDF 문서 빈도는 실행 동안 누적)
+    extractor = KeyphraseExtractor(top_n=int(os.getenv("COMMENT_KEYWORDS_TOP_N", "8")),
+                                   method=os.getenv("COMMENT_KEYWORDS_METHOD", "tfidf"))
     with psycopg2.connect(**DB) as conn, conn.cursor() as cur:
         while True:
             rows = iter_unprocessed_comments(cur, batch_size=batch_size)
             if not rows:
                 print("No more comments to process.")
                 break
-            for cid, text_raw in rows:
-                label, score = svc.infer(text_raw or "")
-                cur.execute(
-                    "UPDATE yt.comments SET sentiment=%s, sentiment_score=%s WHERE id=%s",
-                    (label, score, cid),
-                )
+            # 수집 시 저장한 text_clean 사용 (없는 행만 여기서 정제해 함께 저장)
+            cleaned = [text_clean if text_clean is not None else clean_text(text_raw)
+                       for _, _, text_raw, text_clean in rows]
+            keywords = extractor.extract_batch(cleaned)
+            values = []
+            for (cid, published_at, _, _), text, phrases in zip(rows, cleaned, keywords):
+                label, score = svc.infer(text, cleaned=True)
+                values.append((cid, published_at, text, label, score, phrases))
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                UPDATE yt.comments AS c
+                SET text_clean = t.text_clean, sentiment = t.sentiment,
+                    sentiment_score = t.sentiment_score, keywords = t.keywords
+                FROM (VALUES %s) AS t(id, published_at, text_clean, sentiment, sentiment_score, keywords)
+                WHERE c.id = t.id AND c.published_at = t.published_at
+                """,
+                values,
+                template="(%s::uuid, %s::timestamptz, %s, %s, %s::numeric, %s::text[])",
+            )
             conn.commit()
             print("Processed", len(rows), "comments")
 
 
 if __name__ == "__main__":
     process_sentiment()
-
-
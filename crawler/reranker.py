@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+후보 재정렬(rerank) 모듈
+1단계 후보 생성기(trigram, BM25, 벡터)가 고른 수백 개 후보 블록에 대해
+코사인, 문자 n-gram 유사도, 최신성, 참여도 특성을 NumPy 배열 연산으로 한 번에 계산하고
+가중합으로 최종 순위를 정합니다. (후보마다 Python 루프를 돌지 않음)
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+FEATURES = ("cosine", "ngram", "recency", "engagement")
+DEFAULT_WEIGHTS = {"cosine": 0.55, "ngram": 0.25, "recency": 0.1, "engagement": 0.1}
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """
+    "cosine:0.6,ngram:0.2" 형식의 가중치 파싱 (지정하지 않은 특성은 기본값)
+
+    Raises:
+        ValueError: 알 수 없는 특성이나 숫자가 아닌 가중치
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    if not spec:
+        return weights
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition(":")
+        name = name.strip()
+        if name not in FEATURES:
+            raise ValueError(f"알 수 없는 재정렬 특성: {name} (사용 가능: {', '.join(FEATURES)})")
+        weights[name] = float(value)
+    return weights
+
+
+def _codepoints(texts: List[str]) -> np.ndarray:
+    """공백을 제거한 문자열들을 (N, 최대 길이) 코드포인트 행렬로 변환 (빈 칸은 0)"""
+    stripped = np.char.replace(np.asarray(texts, dtype=str), " ", "")
+    if stripped.dtype.itemsize == 0:
+        return np.zeros((len(texts), 0), dtype=np.uint32)
+    width = stripped.dtype.itemsize // 4
+    return stripped.view(np.uint32).reshape(len(texts), width)
+
+
+def ngram_similarity_block(query: str, texts: List[str], n: int = 2) -> np.ndarray:
+    """
+    SimilarityCalculator.ngram_similarity(query, text, n)와 같은 값을 후보 전체에 대해 계산
+
+    공백을 제거한 문자 n-gram 다중집합의 Dice 계수 2 * 공통 / (전체1 + 전체2)이며,
+    n보다 짧은 텍스트는 텍스트 전체를 n-gram 하나로 취급합니다.
+
+    Returns:
+        np.ndarray: (len(texts),) float64 점수
+    """
+    if not texts:
+        return np.zeros(0)
+    codes = _codepoints(texts)
+    lengths = (codes != 0).sum(axis=1)
+    q = query.replace(" ", "")
+
+    cand_counts = np.where(lengths < n, 1, lengths - n + 1)
+    if len(q) < n:
+        # 짧은 질의의 n-gram은 질의 전체 → 같은 짧은 후보와만 일치
+        stripped = np.char.replace(np.asarray(texts, dtype=str), " ", "")
+        common = ((lengths < n) & (stripped == q)).astype(np.float64)
+        return 2 * common / (1 + cand_counts)
+
+    q_grams: Dict[str, int] = {}
+    for i in range(len(q) - n + 1):
+        gram = q[i:i + n]
+        q_grams[gram] = q_grams.get(gram, 0) + 1
+
+    common = np.zeros(len(texts))
+    positions = codes.shape[1] - n + 1
+    if positions > 0:
+        valid = np.arange(positions)[None, :] <= (lengths - n)[:, None]
+        for gram, q_count in q_grams.items():
+            # 후보의 모든 시작 위치에서 n글자가 gram과 같은지 (겹치는 출현도 셈)
+            hit = valid.copy()
+            for offset, ch in enumerate(gram):
+                hit &= codes[:, offset:offset + positions] == ord(ch)
+            common += np.minimum(hit.sum(axis=1), q_count)
+    return 2 * common / (sum(q_grams.values()) + cand_counts)
+
+
+def recency_scores(published_epoch: np.ndarray, half_life_days: float = 30.0,
+                   now: Optional[float] = None) -> np.ndarray:
+    """게시 후 half_life_days마다 절반이 되는 최신성 점수 (0~1, 게시일 없음은 0)"""
+    published_epoch = np.asarray(published_epoch, dtype=np.float64)
+    now = time.time() if now is None else now
+    age_days = np.clip((now - published_epoch) / 86400.0, 0.0, None)
+    scores = np.exp(-math.log(2) * age_days / half_life_days)
+    return np.where(np.isnan(published_epoch), 0.0, scores)
+
+
+def engagement_scores(engagement: np.ndarray) -> np.ndarray:
+    """log1p(참여도)를 블록 최댓값으로 나눈 점수 (0~1, mv_top_videos_30d에 없으면 0)"""
+    values = np.log1p(np.clip(np.nan_to_num(np.asarray(engagement, dtype=np.float64)), 0.0, None))
+    top = values.max() if len(values) else 0.0
+    return values / top if top > 0 else np.zeros_like(values)
+
+
+def cosine_scores(query_vector: Optional[np.ndarray], vectors: Optional[np.ndarray]) -> np.ndarray:
+    """정규화된 후보 벡터 행렬과 질의의 코사인 (벡터가 없는 행은 0 벡터 → 0)"""
+    if query_vector is None or vectors is None or vectors.size == 0:
+        return np.zeros(0 if vectors is None else len(vectors))
+    query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(query)
+    if norm == 0:
+        return np.zeros(len(vectors))
+    return (np.asarray(vectors, dtype=np.float32) @ (query / norm)).astype(np.float64)
+
+
+class Reranker:
+    """특성 가중합 재정렬기"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, half_life_days: float = 30.0,
+                 ngram_size: int = 2):
+        """
+        Args:
+            weights: 특성별 가중치 (cosine, ngram, recency, engagement)
+            half_life_days: 최신성 점수 반감기(일)
+            ngram_size: 제목 n-gram 크기
+        """
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.half_life_days = half_life_days
+        self.ngram_size = ngram_size
+
+    def features(self, query: str, titles: List[str], published_epoch: np.ndarray,
+                 engagement: np.ndarray, query_vector: Optional[np.ndarray] = None,
+                 vectors: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        후보 블록의 특성 행렬
+
+        Args:
+            query: 검색어
+            titles: 후보 제목
+            published_epoch: 게시 시각 (epoch 초, 없으면 NaN)
+            engagement: mv_top_videos_30d.engagement_score (없으면 0)
+            query_vector: 정규화된 질의 임베딩 (없으면 cosine 특성 0)
+            vectors: 후보 임베딩 (N, D), 임베딩이 없는 후보는 0 벡터
+
+        Returns:
+            np.ndarray: (N, len(FEATURES)) 특성 행렬
+        """
+        n = len(titles)
+        matrix = np.zeros((n, len(FEATURES)))
+        if n == 0:
+            return matrix
+        cosine = cosine_scores(query_vector, vectors)
+        if len(cosine) == n:
+            matrix[:, 0] = cosine
+        matrix[:, 1] = ngram_similarity_block(query, titles, self.ngram_size)
+        matrix[:, 2] = recency_scores(published_epoch, self.half_life_days)
+        matrix[:, 3] = engagement_scores(engagement)
+        return matrix
+
+    def rank(self, features: np.ndarray, limit: int) -> tuple:
+        """
+        가중합 점수 상위 limit개
+
+        Returns:
+            tuple: (후보 인덱스 배열, 점수 배열) 점수 내림차순, 동점은 후보 순서 유지
+        """
+        weights = np.array([self.weights.get(name, 0.0) for name in FEATURES])
+        scores = features @ weights
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return order, scores[order]
+
+
+def benchmark(n_candidates: int = 300, dim: int = 384, repeat: int = 200) -> None:
+    """합성 후보 블록의 특성 계산/정렬 시간과 루프 기반 ngram 계산 비교"""
+    import random
+    from collections import Counter
+
+    rng = random.Random(0)
+    words = ["경복궁", "창덕궁", "야경", "데이트", "한복", "카페", "맛집", "산책", "브이로그", "서울"]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(2, 8))) for _ in range(n_candidates)]
+    vectors = np.random.default_rng(0).standard_normal((n_candidates, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vector = vectors[0]
+    published = time.time() - np.random.default_rng(1).uniform(0, 90 * 86400, n_candidates)
+    engagement = np.random.default_rng(2).integers(0, 10 ** 6, n_candidates)
+    query = "경복궁 야경 데이트"
+    reranker = Reranker()
+
+    def loop_ngram(a: str, b: str, n: int = 2) -> float:
+        def grams(t):
+            t = t.replace(' ', '')
+            return [t] if len(t) < n else [t[i:i + n] for i in range(len(t) - n + 1)]
+        c1, c2 = Counter(grams(a)), Counter(grams(b))
+        common = sum(min(c1[g], c2[g]) for g in c1 if g in c2)
+        return 2 * common / (sum(c1.values()) + sum(c2.values()))
+
+    expected = np.array([loop_ngram(query, t) for t in titles])
+    assert np.allclose(ngram_similarity_block(query, titles), expected)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        features = reranker.features(query, titles, published, engagement, query_vector, vectors)
+        reranker.rank(features, 10)
+    block_ms = (time.perf_counter() - start) / repeat * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        [loop_ngram(query, t) for t in titles]
+    loop_ms = (time.perf_counter() - start) / repeat * 1000
+    print(f"후보 {n_candidates}개: 전체 특성+정렬 {block_ms:.2f}ms, (참고) 루프 ngram만 {loop_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='후보 재정렬기')
+    parser.add_argument('--bench', action='store_true', help='합성 후보 블록으로 재정렬 시간 측정')
+    parser.add_argument('--candidates', type=int, default=300)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.candidates)
@@ -18,6 +18,11 @@ from crawl_comments import collect_comments
 from process_comments import process_sentiment
 from aggregate_sentiment import run as aggregate_sentiment
 from generate_embeddings import EmbeddingPipeline
+from embedding_store import export_embeddings
+from video_keywords import backfill_title_keywords
+from korean_tokenizer import backfill_title_tokens
+from keyphrase_extractor import backfill_comment_keywords
+from text_cleaning import backfill_clean_text
 
 # 로깅 설정
 logging.basicConfig(
@@ -68,10 +73,60 @@ class DataProcessingScheduler:
         """임베딩 생성"""
         try:
             logger.info("임베딩 생성 시작")
-            self.embedding_pipeline.run(limit=200, batch_size=20)
+            self.embedding_pipeline.run(limit=200, batch_size=20, streaming=True)
             logger.info("임베딩 생성 완료")
         except Exception as e:
             logger.error(f"임베딩 생성 실패: {e}")
+            return
+        self.export_embedding_store()
+    
+    def export_embedding_store(self):
+        """API용 메모리 맵 임베딩 스냅샷 내보내기 (EMBEDDING_STORE_DIR 설정 시)"""
+        store_dir = os.getenv("EMBEDDING_STORE_DIR")
+        if not store_dir:
+            return
+        try:
+            logger.info("임베딩 스냅샷 내보내기 시작")
+            snapshot = export_embeddings(self.embedding_pipeline.db_config, store_dir)
+            logger.info(f"임베딩 스냅샷 내보내기 완료: {snapshot}")
+        except Exception as e:
+            logger.error(f"임베딩 스냅샷 내보내기 실패: {e}")
+    
+    def refresh_video_keywords(self):
+        """영상-키워드 매핑 재계산 (아직 매핑하지 않았거나 제목이 바뀐 영상만)"""
+        try:
+            logger.info("키워드 매핑 재계산 시작")
+            result = backfill_title_keywords(self.embedding_pipeline.db_config)
+            logger.info(f"키워드 매핑 재계산 완료: 영상 {result['videos']}개, 매핑 {result['mappings']}개")
+        except Exception as e:
+            logger.error(f"키워드 매핑 재계산 실패: {e}")
+    
+    def fill_clean_text(self):
+        """수집 경로 밖에서 들어왔거나 원문이 바뀐 댓글/영상의 정제 텍스트 채우기"""
+        try:
+            logger.info("정제 텍스트 계산 시작")
+            result = backfill_clean_text(self.embedding_pipeline.db_config)
+            logger.info(f"정제 텍스트 계산 완료: 댓글 {result['comments']}개, 영상 {result['videos']}개")
+        except Exception as e:
+            logger.error(f"정제 텍스트 계산 실패: {e}")
+    
+    def fill_title_tokens(self):
+        """수집 경로 밖에서 들어온 영상의 제목 토큰 채우기"""
+        try:
+            logger.info("제목 토큰 계산 시작")
+            result = backfill_title_tokens(self.embedding_pipeline.db_config)
+            logger.info(f"제목 토큰 계산 완료: 영상 {result['videos']}개")
+        except Exception as e:
+            logger.error(f"제목 토큰 계산 실패: {e}")
+    
+    def fill_comment_keywords(self):
+        """핵심어 단계 이전에 감성분석된 댓글의 keywords 채우기 (새 댓글은 감성분석 배치에서 함께 계산)"""
+        try:
+            logger.info("댓글 핵심어 계산 시작")
+            result = backfill_comment_keywords(self.embedding_pipeline.db_config)
+            logger.info(f"댓글 핵심어 계산 완료: 댓글 {result['comments']}개")
+        except Exception as e:
+            logger.error(f"댓글 핵심어 계산 실패: {e}")
     
     def full_pipeline(self):
         """전체 파이프라인 실행"""
@@ -88,9 +143,19 @@ class DataProcessingScheduler:
             # 3. 데이터 집계
             self.aggregate_sentiment_data()
             
-            # 4. 임베딩 생성
+            # 4. 정제 텍스트 / 제목 토큰 채우기 (임베딩과 키워드 단계가 재사용)
+            self.fill_clean_text()
+            self.fill_title_tokens()
+            
+            # 5. 임베딩 생성
             self.generate_embeddings()
             
+            # 6. 키워드 매핑 재계산
+            self.refresh_video_keywords()
+            
+            # 7. 댓글 핵심어 채우기
+            self.fill_comment_keywords()
+            
             elapsed_time = time.time() - start_time
             logger.info(f"=== 전체 파이프라인 완료 (소요시간: {elapsed_time:.2f}초) ===")
             
@@ -151,7 +216,8 @@ def main():
     parser = argparse.ArgumentParser(description='데이터 처리 자동화 스케줄러')
     parser.add_argument('--mode', choices=['schedule', 'once'], default='schedule',
                        help='실행 모드: schedule(스케줄러), once(한 번만 실행)')
-    parser.add_argument('--task', choices=['collect', 'sentiment', 'aggregate', 'embedding', 'full'],
+    parser.add_argument('--task', choices=['collect', 'sentiment', 'aggregate', 'embedding', 'keywords',
+                                           'clean_text', 'title_tokens', 'comment_keywords', 'full'],
                        help='특정 작업만 실행 (once 모드에서만 사용)')
     
     args = parser.parse_args()
@@ -167,6 +233,14 @@ def main():
             scheduler.aggregate_sentiment_data()
         elif args.task == 'embedding':
             scheduler.generate_embeddings()
+        elif args.task == 'keywords':
+            scheduler.refresh_video_keywords()
+        elif args.task == 'clean_text':
+            scheduler.fill_clean_text()
+        elif args.task == 'title_tokens':
+            scheduler.fill_title_tokens()
+        elif args.task == 'comment_keywords':
+            scheduler.fill_comment_keywords()
         elif args.task == 'full':
             scheduler.full_pipeline()
         else:
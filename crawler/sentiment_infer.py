@@ -18,8 +18,9 @@ class SentimentService:
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
         self.pipeline = TextClassificationPipeline(model=self.model, tokenizer=self.tokenizer, return_all_scores=False)
 
-    def infer(self, text: str) -> Tuple[str, float]:
-        t = clean_text(text)
+    def infer(self, text: str, cleaned: bool = False) -> Tuple[str, float]:
+        # cleaned=True면 이미 정제된 텍스트(yt.comments.text_clean)로 보고 다시 정제하지 않음
+        t = text if cleaned else clean_text(text)
         if not t:
             return "neu", 0.0
         out = self.pipeline(t, truncation=True)[0]
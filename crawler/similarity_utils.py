@@ -3,9 +3,13 @@ from typing import List, Tuple, Union, Optional
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 import re
+import heapq
+import threading
 from collections import Counter
 import Levenshtein
 from nltk import ngrams
+from collections import OrderedDict
+from batch_similarity import BatchTextScorer, BATCH_METHODS, top_k_indices, word_tokens
 # 한국어 형태소 분석은 konlpy 사용 (선택사항)
 
 
@@ -21,12 +25,66 @@ class SimilarityCalculator:
     - TF-IDF 유사도
     """
     
-    def __init__(self):
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words=None,  # 한국어는 별도 처리
-            ngram_range=(1, 2)
-        )
+    def __init__(self, tokenizer=None):
+        """
+        Args:
+            tokenizer: 한국어 토크나이저 (korean_tokenizer.get_tokenizer()). 지정하면 word_overlap과
+                       TF-IDF가 공백 분리 대신 형태소 토큰을 사용 ("경복궁에서" = "경복궁")
+        """
+        self.tokenizer = tokenizer
+        if tokenizer is not None:
+            self.tfidf_vectorizer = TfidfVectorizer(
+                max_features=1000,
+                tokenizer=tokenizer.tokenize,
+                token_pattern=None,
+                lowercase=False,  # 토크나이저가 소문자로 반환
+                ngram_range=(1, 2)
+            )
+        else:
+            self.tfidf_vectorizer = TfidfVectorizer(
+                max_features=1000,
+                stop_words=None,  # 한국어는 별도 처리
+                ngram_range=(1, 2)
+            )
+        # 최근 후보 목록별 희소 n-gram 행렬 (같은 후보로 반복 질의 시 재사용, 요청 스레드 간 공유)
+        self._batch_scorers = OrderedDict()
+        self._batch_cache_size = 4
+        self._batch_lock = threading.Lock()
+        # Levenshtein.distance의 score_cutoff 지원 여부 (구버전 python-Levenshtein은 없음)
+        self._distance_supports_cutoff = True
+    
+    def batch_scorer(self, candidates: List[str],
+                     candidate_tokens: Optional[List[Optional[List[str]]]] = None) -> BatchTextScorer:
+        """
+        후보 목록의 일괄 점수 계산기 (같은 후보와 토큰이면 캐시된 행렬 사용)
+        
+        Args:
+            candidates: 후보 텍스트
+            candidate_tokens: 후보별로 미리 계산한 토큰 (예: yt.videos.title_tokens, 없으면 토큰화)
+        """
+        texts = tuple(candidates)
+        tokens_key = None
+        if self.tokenizer is not None and candidate_tokens is not None:
+            # 같은 제목이라도 저장된 토큰이 다르면(토크나이저 변경 후 백필 등) 다른 행렬
+            tokens_key = tuple(tuple(tokens) if tokens is not None else None for tokens in candidate_tokens)
+        key = (texts, tokens_key)
+        with self._batch_lock:
+            scorer = self._batch_scorers.get(key)
+            if scorer is not None:
+                self._batch_scorers.move_to_end(key)
+                return scorer
+        
+        # 행렬 생성은 잠금 밖에서 (다른 후보 목록 조회를 막지 않도록)
+        if self.tokenizer is not None:
+            scorer = BatchTextScorer(texts, word_tokenizer=self.word_set, word_sets=candidate_tokens)
+        else:
+            scorer = BatchTextScorer(texts)
+        with self._batch_lock:
+            scorer = self._batch_scorers.setdefault(key, scorer)
+            self._batch_scorers.move_to_end(key)
+            while len(self._batch_scorers) > self._batch_cache_size:
+                self._batch_scorers.popitem(last=False)
+        return scorer
     
     def cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """
@@ -98,6 +156,78 @@ class SimilarityCalculator:
         
         return 1.0 - (distance / max_len)
     
+    def levenshtein_top_k(self, query: str, candidates: List[str], top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        편집 거리 유사도 상위 k개 (가지치기)
+        
+        길이 차이는 편집 거리의 하한이므로 유사도 상한은 1 - |길이 차이| / max(길이)입니다.
+        상한이 높은 후보부터 계산하면서, 현재 k번째 점수로 허용되는 최대 거리를
+        score_cutoff로 넘겨 그보다 먼 후보는 계산을 일찍 끝내고, 상한이 k번째 점수보다
+        낮아지면 나머지 후보는 계산하지 않습니다. 결과는 전체 계산 후 정렬한 것과 같습니다.
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (후보 인덱스, 유사도) 유사도 내림차순, 동점은 후보 순서
+        """
+        n = len(candidates)
+        k = max(0, min(int(top_k), n))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=n)
+        q_len = len(query)
+        if q_len == 0:
+            # 빈 질의: 빈 후보만 1.0
+            scores = (lengths == 0).astype(np.float64)
+            indices = top_k_indices(scores, k)
+            return indices, scores[indices]
+        
+        longer = np.maximum(lengths, q_len)
+        # 점수와 같은 식으로 계산해야 부동소수점 비교가 어긋나지 않음 (거리 = 길이 차이일 때의 점수)
+        upper = 1.0 - (np.abs(lengths - q_len) / longer)
+        order = np.argsort(-upper, kind="stable")
+        
+        # (점수, -인덱스) 최소 힙: 맨 앞이 현재 k번째(가장 약한) 결과
+        heap: List[Tuple[float, int]] = []
+        chunk = 4096
+        for start in range(0, n, chunk):
+            # numpy 스칼라 접근 비용을 피하려고 청크 단위로 파이썬 리스트로 변환
+            block = order[start:start + chunk]
+            if len(heap) == k and upper[block[0]] < heap[0][0]:
+                break
+            stop = False
+            for idx, bound, max_len in zip(block.tolist(), upper[block].tolist(), longer[block].tolist()):
+                if len(heap) == k:
+                    kth_score = heap[0][0]
+                    if bound < kth_score:
+                        stop = True
+                        break
+                    # 점수가 kth_score 이상이 되려면 필요한 최대 거리
+                    max_distance = int((1.0 - kth_score) * max_len + 1e-9)
+                    distance = self._bounded_distance(query, candidates[idx], max_distance)
+                    if distance > max_distance:
+                        continue
+                else:
+                    distance = Levenshtein.distance(query, candidates[idx])
+                item = (1.0 - (distance / max_len), -idx)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+            if stop:
+                break
+        
+        ranked = sorted(heap, reverse=True)
+        return (np.array([-i for _, i in ranked], dtype=np.int64),
+                np.array([s for s, _ in ranked], dtype=np.float64))
+    
+    def _bounded_distance(self, text1: str, text2: str, max_distance: int) -> int:
+        """max_distance를 넘으면 일찍 끝내는 편집 거리 (score_cutoff 미지원 버전이면 전체 계산)"""
+        if self._distance_supports_cutoff:
+            try:
+                return Levenshtein.distance(text1, text2, score_cutoff=max_distance)
+            except TypeError:
+                self._distance_supports_cutoff = False
+        return Levenshtein.distance(text1, text2)
+    
     def ngram_similarity(self, text1: str, text2: str, n: int = 2) -> float:
         """
         N-gram 유사도 계산 (문자 단위)
@@ -137,13 +267,15 @@ class SimilarityCalculator:
         
         return (2 * common_ngrams) / total_ngrams if total_ngrams > 0 else 0.0
     
-    def tfidf_similarity(self, texts: List[str], query: str) -> List[float]:
+    def tfidf_similarity(self, texts: List[str], query: str,
+                         text_tokens: Optional[List[Optional[List[str]]]] = None) -> List[float]:
         """
         TF-IDF 기반 유사도 계산
         
         Args:
             texts: 비교할 텍스트 리스트
             query: 쿼리 텍스트
+            text_tokens: 텍스트별로 미리 계산한 토큰 (토크나이저가 있을 때만 사용, 없는 항목은 토큰화)
             
         Returns:
             List[float]: 각 텍스트와의 TF-IDF 유사도
@@ -151,12 +283,19 @@ class SimilarityCalculator:
         if not texts or not query:
             return [0.0] * len(texts)
         
-        # 모든 텍스트에 쿼리 추가
-        all_texts = texts + [query]
-        
         try:
-            # TF-IDF 벡터화
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(all_texts)
+            if self.tokenizer is not None and text_tokens is not None:
+                # 저장된 토큰을 그대로 문서로 사용 (요청마다 형태소 분석하지 않음)
+                docs = [
+                    tokens if tokens is not None else self.tokenizer.tokenize(text)
+                    for text, tokens in zip(texts, text_tokens)
+                ]
+                docs.append(self.tokenizer.tokenize(query))
+                vectorizer = TfidfVectorizer(max_features=1000, analyzer=_token_ngrams)
+                tfidf_matrix = vectorizer.fit_transform(docs)
+            else:
+                # 모든 텍스트에 쿼리 추가 후 TF-IDF 벡터화
+                tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts + [query])
             
             # 쿼리 벡터 (마지막)
             query_vector = tfidf_matrix[-1]
@@ -170,6 +309,16 @@ class SimilarityCalculator:
             print(f"TF-IDF similarity error: {e}")
             return [0.0] * len(texts)
     
+    def word_set(self, text: str) -> set:
+        """
+        단어 겹침 비교용 단어 집합
+        
+        토크나이저가 있으면 형태소 토큰, 없으면 공백으로 나눈 2글자 이상 단어
+        """
+        if self.tokenizer is not None:
+            return set(self.tokenizer.tokenize(text))
+        return word_tokens(text)
+    
     def word_overlap_similarity(self, text1: str, text2: str) -> float:
         """
         단어 겹침 유사도 계산
@@ -180,15 +329,8 @@ class SimilarityCalculator:
         Returns:
             float: 단어 겹침 유사도 (0~1)
         """
-        def tokenize_korean(text: str) -> set:
-            """한국어 텍스트를 단어로 분할"""
-            # 간단한 공백 기반 분할 (실제로는 형태소 분석기 사용 권장)
-            words = set(text.split())
-            # 2글자 이상 단어만 포함
-            return {word for word in words if len(word) >= 2}
-        
-        words1 = tokenize_korean(text1)
-        words2 = tokenize_korean(text2)
+        words1 = self.word_set(text1)
+        words2 = self.word_set(text2)
         
         if not words1 and not words2:
             return 1.0
@@ -239,16 +381,61 @@ class SimilarityCalculator:
         else:
             raise ValueError(f"지원하지 않는 방법: {method}")
     
+    def score_candidates(self,
+                         query: str,
+                         candidates: List[str],
+                         method: str = "cosine",
+                         embeddings: Optional[np.ndarray] = None,
+                         query_embedding: Optional[np.ndarray] = None,
+                         candidate_tokens: Optional[List[Optional[List[str]]]] = None) -> np.ndarray:
+        """
+        모든 후보의 유사도 점수
+        
+        Args:
+            query: 쿼리 텍스트
+            candidates: 후보 텍스트 리스트
+            method: 유사도 계산 방법
+            embeddings: 후보 텍스트의 임베딩 (벡터 기반 방법용)
+            query_embedding: 쿼리 임베딩 (벡터 기반 방법용)
+            candidate_tokens: 후보별로 미리 계산한 토큰 (word_overlap, tfidf에서 토큰화 생략)
+            
+        Returns:
+            np.ndarray: 후보 순서대로의 점수 (shape: [len(candidates)])
+        """
+        if method == "cosine" and embeddings is not None and query_embedding is not None:
+            # 벡터 기반 유사도 계산 (후보 전체를 한 번에)
+            if len(candidates) == 0:
+                return np.zeros(0)
+            return cosine_similarity(np.asarray(query_embedding).reshape(1, -1),
+                                     np.asarray(embeddings)[:len(candidates)])[0].astype(np.float64)
+        
+        if method == "tfidf":
+            # TF-IDF 기반 유사도 계산
+            return np.asarray(self.tfidf_similarity(list(candidates), query, candidate_tokens), dtype=np.float64)
+        
+        if method in BATCH_METHODS:
+            # 희소 n-gram/단어 행렬로 후보 전체를 한 번에 계산 (쌍별 함수와 같은 점수)
+            return self.batch_scorer(candidates, candidate_tokens).scores(query, method)
+        
+        # 텍스트 기반 유사도 계산
+        return np.fromiter(
+            (self.calculate_similarity(query, candidate, method) for candidate in candidates),
+            dtype=np.float64, count=len(candidates)
+        )
+    
     def find_similar_texts(self, 
                           query: str, 
                           candidates: List[str], 
                           method: str = "cosine",
                           embeddings: Optional[np.ndarray] = None,
                           query_embedding: Optional[np.ndarray] = None,
-                          top_k: int = 5) -> List[Tuple[str, float]]:
+                          top_k: int = 5,
+                          candidate_tokens: Optional[List[Optional[List[str]]]] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         유사한 텍스트 찾기
         
+        같은 텍스트가 여러 번 있어도 후보 위치로 구분할 수 있도록 인덱스를 반환합니다.
+        
         Args:
             query: 쿼리 텍스트
             candidates: 후보 텍스트 리스트
@@ -256,33 +443,23 @@ class SimilarityCalculator:
             embeddings: 후보 텍스트의 임베딩 (벡터 기반 방법용)
             query_embedding: 쿼리 임베딩 (벡터 기반 방법용)
             top_k: 반환할 상위 개수
+            candidate_tokens: 후보별로 미리 계산한 토큰 (예: yt.videos.title_tokens)
             
         Returns:
-            List[Tuple[str, float]]: (텍스트, 유사도) 튜플 리스트
+            Tuple[np.ndarray, np.ndarray]: (후보 인덱스, 유사도) 유사도 내림차순, 동점은 후보 순서
         """
-        similarities = []
+        if method == "levenshtein":
+            return self.levenshtein_top_k(query, candidates, top_k)
         
-        if method == "cosine" and embeddings is not None and query_embedding is not None:
-            # 벡터 기반 유사도 계산
-            for i, candidate in enumerate(candidates):
-                similarity = self.cosine_similarity(query_embedding, embeddings[i])
-                similarities.append((candidate, similarity))
-        
-        elif method == "tfidf":
-            # TF-IDF 기반 유사도 계산
-            sim_scores = self.tfidf_similarity(candidates, query)
-            for candidate, score in zip(candidates, sim_scores):
-                similarities.append((candidate, float(score)))
-        
-        else:
-            # 텍스트 기반 유사도 계산
-            for candidate in candidates:
-                similarity = self.calculate_similarity(query, candidate, method)
-                similarities.append((candidate, similarity))
-        
-        # 유사도 순으로 정렬하고 상위 k개 반환
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        scores = self.score_candidates(query, candidates, method, embeddings, query_embedding, candidate_tokens)
+        indices = top_k_indices(scores, top_k)
+        return indices, scores[indices]
+
+
+def _token_ngrams(tokens) -> List[str]:
+    """토큰 목록의 unigram + bigram (미리 토큰화한 문서용 TF-IDF analyzer)"""
+    tokens = list(tokens)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
 
 
 def test_similarity_calculator():
@@ -312,8 +489,8 @@ def test_similarity_calculator():
             )
             
             print(f"Query: {query}")
-            for text, score in results:
-                print(f"  {text}: {score:.4f}")
+            for idx, score in zip(*results):
+                print(f"  {candidates[idx]}: {score:.4f}")
                 
         except Exception as e:
             print(f"Error with {method}: {e}")
@@ -326,8 +503,8 @@ def test_similarity_calculator():
         )
         
         print(f"Query: {query}")
-        for text, score in results:
-            print(f"  {text}: {score:.4f}")
+        for idx, score in zip(*results):
+            print(f"  {candidates[idx]}: {score:.4f}")
             
     except Exception as e:
         print(f"Error with TF-IDF: {e}")
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+검색어 자동완성 인덱스 모듈
+영상 제목, 태그, 행궁 키워드를 정규화된 키의 정렬 배열로 만들고
+접두사 범위를 이진 탐색한 뒤 가중치 상위 후보를 반환합니다.
+가중치는 mv_top_videos_30d의 참여도(조회수 + 좋아요)를 로그 스케일로 사용합니다.
+"""
+
+import math
+import threading
+import time
+from contextlib import closing
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from palace_matcher import PALACE_KEYWORDS
+
+# 출처별 기본 가중치 (참여도 점수에 더함)
+SOURCE_BOOST = {"keyword": 3.0, "tag": 1.0, "title": 0.5}
+# 제목은 단어 시작 위치마다 키를 만들어 중간 단어로도 완성 (앞쪽 몇 단어까지만)
+MAX_TITLE_WORD_STARTS = 6
+# 이 길이 이하 접두사는 후보 범위가 넓으므로 빌드 시 상위 결과를 미리 계산
+PRECOMPUTED_PREFIX_LEN = 2
+PRECOMPUTED_TOP_K = 20
+# 접두사 범위 끝을 표시하는 문자
+_PREFIX_END = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """소문자 + 공백 정리"""
+    return " ".join(text.lower().split())
+
+
+class SuggestIndex:
+    """정렬 배열 기반 접두사 자동완성 인덱스"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float]]):
+        """
+        Args:
+            entries: (표시 문자열, 출처, 가중치) 목록. 같은 문자열은 가중치를 합산하고 가장 무거운 출처를 사용
+        """
+        merged: Dict[str, List] = {}
+        for text, kind, weight in entries:
+            text = " ".join(text.split())
+            if not text:
+                continue
+            key = text.lower()
+            item = merged.get(key)
+            if item is None:
+                merged[key] = [text, kind, weight, weight]
+            else:
+                item[2] += weight
+                if weight > item[3]:
+                    item[1], item[3] = kind, weight
+
+        self.texts: List[str] = []
+        self.kinds: List[str] = []
+        weights = []
+        keyed = []
+        for i, (key, (text, kind, weight, _)) in enumerate(merged.items()):
+            self.texts.append(text)
+            self.kinds.append(kind)
+            weights.append(weight)
+            words = key.split(" ")
+            starts = range(min(len(words), MAX_TITLE_WORD_STARTS)) if kind == "title" else range(len(words))
+            for w in starts:
+                keyed.append((" ".join(words[w:]), i))
+
+        keyed.sort()
+        self.keys: List[str] = [k for k, _ in keyed]
+        self.entry_ids = np.array([i for _, i in keyed], dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.float64)
+        self._key_weights = self.weights[self.entry_ids] if len(keyed) else np.zeros(0)
+        self._precomputed: Dict[str, List[int]] = {}
+        self._precompute()
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _PREFIX_END, lo)
+        return lo, hi
+
+    def _top_entries(self, lo: int, hi: int, k: int) -> List[int]:
+        """키 범위 [lo, hi)에서 가중치 상위 k개 항목 (같은 항목은 한 번만)"""
+        if hi <= lo:
+            return []
+        weights = self._key_weights[lo:hi]
+        # 한 항목이 여러 키(단어 시작 위치)로 들어갈 수 있으므로 여유 있게 뽑은 뒤 중복 제거
+        want = min(len(weights), k * 3)
+        if want < len(weights):
+            part = np.argpartition(-weights, want - 1)[:want]
+        else:
+            part = np.arange(len(weights))
+        order = part[np.lexsort((part, -weights[part]))]
+        result, seen = [], set()
+        for pos in order:
+            entry = int(self.entry_ids[lo + pos])
+            if entry not in seen:
+                seen.add(entry)
+                result.append(entry)
+                if len(result) >= k:
+                    break
+        if len(result) < k and want < len(weights):
+            # 중복이 많아 부족하면 전체 범위 정렬 (드묾)
+            order = np.lexsort((np.arange(len(weights)), -weights))
+            for pos in order:
+                entry = int(self.entry_ids[lo + pos])
+                if entry not in seen:
+                    seen.add(entry)
+                    result.append(entry)
+                    if len(result) >= k:
+                        break
+        return result
+
+    def _precompute(self) -> None:
+        """짧은 접두사(1~2자)별 상위 결과 미리 계산"""
+        prefixes = set()
+        for key in self.keys:
+            for n in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+                if len(key) >= n:
+                    prefixes.add(key[:n])
+        for prefix in prefixes:
+            lo, hi = self._range(prefix)
+            self._precomputed[prefix] = self._top_entries(lo, hi, PRECOMPUTED_TOP_K)
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        접두사 자동완성
+
+        Args:
+            query: 입력 중인 검색어
+            limit: 반환할 최대 개수
+
+        Returns:
+            List[Dict]: {"text", "kind", "weight"} 리스트 (가중치 내림차순)
+        """
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        cached = self._precomputed.get(prefix)
+        if cached is not None and limit <= PRECOMPUTED_TOP_K:
+            entries = cached[:limit]
+        else:
+            lo, hi = self._range(prefix)
+            entries = self._top_entries(lo, hi, limit)
+        return [
+            {"text": self.texts[i], "kind": self.kinds[i], "weight": round(float(self.weights[i]), 4)}
+            for i in entries
+        ]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+def load_suggest_entries(conn) -> List[Tuple[str, str, float]]:
+    """
+    DB에서 자동완성 항목과 가중치 수집
+
+    - 제목: 기본 가중치 + log(1 + 참여도)
+    - 태그: 기본 가중치 + log(1 + 태그 영상 수) + log(1 + 태그 영상 참여도 합)
+    - 행궁 키워드: 기본 가중치
+    """
+    entries = [(keyword, "keyword", SOURCE_BOOST["keyword"]) for keyword in PALACE_KEYWORDS]
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT v.title, COALESCE(m.engagement_score, 0)
+            FROM yt.videos v
+            LEFT JOIN yt.mv_top_videos_30d m ON m.id = v.id
+        """)
+        for title, engagement in cur.fetchall():
+            entries.append((title, "title", SOURCE_BOOST["title"] + math.log1p(max(float(engagement), 0.0))))
+
+        cur.execute("""
+            SELECT t, COUNT(*), SUM(COALESCE(m.engagement_score, 0))
+            FROM yt.videos v
+            CROSS JOIN unnest(v.tags) AS t
+            LEFT JOIN yt.mv_top_videos_30d m ON m.id = v.id
+            WHERE t IS NOT NULL AND t <> ''
+            GROUP BY t
+        """)
+        for tag, video_count, engagement in cur.fetchall():
+            entries.append((tag, "tag", SOURCE_BOOST["tag"] + math.log1p(video_count)
+                            + math.log1p(max(float(engagement or 0), 0.0))))
+    return entries
+
+
+def data_signature(conn) -> Tuple:
+    """영상 수와 마지막 수정 시각 (수집 후 바뀌면 인덱스 재빌드)"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*), MAX(updated_at) FROM yt.videos")
+        count, updated_at = cur.fetchone()
+    return count, updated_at.isoformat() if updated_at else None
+
+
+def build_suggest_index(conn) -> SuggestIndex:
+    return SuggestIndex(load_suggest_entries(conn))
+
+
+class SuggestService:
+    """자동완성 인덱스 보관 및 백그라운드 재빌드 (수집 후 데이터가 바뀌면 교체)"""
+
+    def __init__(self):
+        self.index: Optional[SuggestIndex] = None
+        self.signature = None
+        self.built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self, connect, force: bool = False) -> bool:
+        """
+        데이터 시그니처가 바뀌었으면 새 인덱스를 만들어 교체
+
+        Args:
+            connect: 새 DB 커넥션을 반환하는 함수 (사용 후 닫음)
+            force: 시그니처와 관계없이 재빌드
+
+        Returns:
+            bool: 재빌드 여부
+        """
+        with self._lock:
+            with closing(connect()) as conn:
+                signature = data_signature(conn)
+                if not force and self.index is not None and signature == self.signature:
+                    return False
+                index = build_suggest_index(conn)
+            # 요청 처리 중인 쪽은 이전 인덱스를 계속 쓰고, 다음 요청부터 새 인덱스 사용
+            self.index, self.signature, self.built_at = index, signature, time.time()
+            return True
+
+    def start(self, connect, interval: float = 60.0) -> None:
+        """백그라운드 스레드에서 즉시 빌드 후 interval초마다 변경 확인"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    if self.refresh(connect):
+                        print(f"자동완성 인덱스 빌드 완료: {len(self.index)}개 항목")
+                except Exception as e:
+                    print(f"자동완성 인덱스 빌드 실패: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, name="suggest-index", daemon=True)
+        self._thread.start()
+
+    def suggest(self, query: str, limit: int = 10) -> Optional[List[Dict]]:
+        """인덱스가 아직 없으면 None"""
+        index = self.index
+        if index is None:
+            return None
+        return index.suggest(query, limit)
+
+
+def benchmark(index: SuggestIndex, queries: List[str], repeat: int = 2000) -> None:
+    """접두사별 질의당 시간 출력"""
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = index.suggest(query, 10)
+        per_query_us = (time.perf_counter() - start) / repeat * 1e6
+        print(f"'{query}': {per_query_us:.1f}us -> {[r['text'] for r in result[:3]]}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description='자동완성 인덱스')
+    parser.add_argument('--bench', action='store_true', help='합성 제목 10만 개로 질의 시간 측정')
+    args = parser.parse_args()
+
+    if args.bench:
+        rng = random.Random(0)
+        words = ["경복궁", "창덕궁", "덕수궁", "야경", "데이트", "한복", "카페", "맛집", "산책", "브이로그",
+                 "서울", "여행", "사진", "투어", "가을", "단풍", "궁궐", "체험", "코스", "추천"]
+        entries = [(keyword, "keyword", SOURCE_BOOST["keyword"]) for keyword in PALACE_KEYWORDS]
+        for _ in range(100000):
+            title = " ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+            entries.append((title, "title", SOURCE_BOOST["title"] + math.log1p(rng.randint(0, 10 ** 6))))
+        start = time.perf_counter()
+        index = SuggestIndex(entries)
+        print(f"빌드 {len(index)}개 항목, {len(index.keys)}개 키: {time.perf_counter() - start:.2f}s")
+        benchmark(index, ["경", "경복", "경복궁 ", "경복궁 야", "데이트 코", "브이로그 서울 여", "없는검색어"])
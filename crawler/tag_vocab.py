@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+태그 어휘 메모리 인덱스 모듈
+yt.tag_vocab(트리거로 증분 갱신)을 한 번 읽어 메모리에 두고,
+어휘 버전((행 수, video_count 합, MAX(updated_at)))이 바뀌었을 때만 다시 로드합니다.
+유사 키워드 API는 매 요청 태그 전체를 DISTINCT 스캔하는 대신
+미리 만든 희소 행렬(top_similar) 또는 문자 역색인(char_candidates)으로 점수를 계산합니다.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class TagVocabIndex:
+    """태그 어휘와 후보 검색용 역색인"""
+
+    def __init__(self, check_interval: float = 10.0):
+        """
+        Args:
+            check_interval: 버전 확인 최소 간격(초)
+        """
+        self.check_interval = check_interval
+        self.version = None
+        self.tags: List[str] = []
+        self.counts: List[int] = []
+        self._char_index: Dict[str, List[int]] = {}
+        self._scorer = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_version(conn) -> Tuple:
+        """어휘 버전 (행 수, video_count 합, MAX(updated_at)) - 커밋된 변경만 보이고 증감/추가/삭제마다 바뀜"""
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*), COALESCE(SUM(video_count), 0), MAX(updated_at) FROM yt.tag_vocab")
+            count, total, updated_at = cur.fetchone()
+            return int(count), int(total), updated_at
+
+    def load(self, conn) -> None:
+        """yt.tag_vocab 전체를 읽어 인덱스 재구성"""
+        with conn.cursor() as cur:
+            cur.execute("SELECT tag, video_count, updated_at FROM yt.tag_vocab ORDER BY video_count DESC, tag")
+            rows = cur.fetchall()
+        # 버전은 읽은 행에서 직접 계산해 (별도 조회 사이에 커밋된 변경과 섞이지 않게) 데이터와 짝을 맞춤
+        version = (len(rows), sum(row[1] for row in rows), max((row[2] for row in rows), default=None))
+
+        tags = [row[0] for row in rows]
+        char_index = defaultdict(list)
+        for idx, tag in enumerate(tags):
+            for ch in set(tag.lower()):
+                char_index[ch].append(idx)
+
+        # 새 인덱스를 다 만든 뒤 한 번에 교체 (읽는 쪽은 잠금 없이 사용)
+        self.tags, self.counts = tags, [row[1] for row in rows]
+        self._char_index = dict(char_index)
+        self._scorer = None
+        self.version = version
+
+    def refresh(self, connect: Callable) -> "TagVocabIndex":
+        """
+        check_interval마다 버전을 확인하고 바뀌었으면 다시 로드
+
+        Args:
+            connect: 새 커넥션을 반환하는 팩토리 (사용 후 닫음)
+        """
+        now = time.monotonic()
+        if self.version is not None and now - self._last_check < self.check_interval:
+            return self
+        with self._lock:
+            if self.version is not None and time.monotonic() - self._last_check < self.check_interval:
+                return self
+            with closing(connect()) as conn:
+                if self.version is None or self.current_version(conn) != self.version:
+                    self.load(conn)
+            self._last_check = time.monotonic()
+        return self
+
+    def _union(self, index: Dict[str, List[int]], keys) -> List[str]:
+        ids = set()
+        for key in keys:
+            ids.update(index.get(key, ()))
+        return [self.tags[i] for i in sorted(ids)]
+
+    def top_similar(self, query: str, method: str, limit: int,
+                    word_tokenizer: Optional[Callable[[str], set]] = None) -> List[Tuple[str, float]]:
+        """
+        전체 태그를 희소 n-gram/단어 행렬로 한 번에 점수 매겨 상위 limit개 (점수 0 제외)
+
+        행렬은 어휘를 다시 로드할 때까지 재사용합니다. method는 batch_similarity.BATCH_METHODS 중 하나,
+        word_tokenizer는 word_overlap 단어 분리 함수 (SimilarityCalculator.word_set)입니다.
+        """
+        from batch_similarity import BatchTextScorer, top_k_indices
+
+        tags, cached = self.tags, self._scorer
+        if cached is not None and cached[0] is tags and cached[1] == word_tokenizer:
+            scorer = cached[2]
+        else:
+            # 다시 로드되는 중에도 현재 태그 목록과 짝이 맞는 행렬만 사용
+            scorer = BatchTextScorer(tags, word_tokenizer=word_tokenizer)
+            self._scorer = (tags, word_tokenizer, scorer)
+        scores = scorer.scores(query, method)
+        return [(tags[i], float(scores[i])) for i in top_k_indices(scores, limit) if scores[i] > 0]
+
+    def char_candidates(self, query: str) -> List[str]:
+        """질의와 문자를 하나 이상 공유하는 태그 (소문자 기준)"""
+        return self._union(self._char_index, set(query.lower()))
+
+    def __len__(self) -> int:
+        return len(self.tags)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+텍스트 정제 단계 모듈
+수집 시 text_utils.clean_text 결과를 yt.comments.text_clean, yt.videos.title_clean/description_clean에
+한 번 저장하고, 감성분석/핵심어/임베딩 단계는 저장된 정제 텍스트를 읽습니다.
+수집 경로 밖에서 들어왔거나 원문이 바뀌어 비어 있는 행은 이 모듈의 백필로 일괄 채웁니다.
+
+사용 예:
+    python text_cleaning.py            # 비어 있는 정제 텍스트 채우기
+    python text_cleaning.py --all      # clean_text 규칙을 바꾼 뒤 전체 다시 계산
+"""
+
+import os
+from typing import Dict, Optional
+
+from text_utils import clean_text
+
+
+def _default_db_config() -> Dict:
+    return {
+        'host': os.getenv("DB_HOST", "localhost"),
+        'port': int(os.getenv("DB_PORT", "5432")),
+        'dbname': os.getenv("DB_NAME", "yt"),
+        'user': os.getenv("DB_USER", "app"),
+        'password': os.getenv("DB_PASSWORD", "app1234"),
+    }
+
+
+def backfill_clean_text(db_config: Optional[Dict] = None, batch_size: int = 1000,
+                        only_missing: bool = True) -> Dict[str, int]:
+    """
+    댓글/영상 정제 텍스트 일괄 계산
+
+    Args:
+        db_config: DB 접속 정보 (기본: 환경변수)
+        batch_size: 한 번에 읽고 쓸 행 수
+        only_missing: True면 정제 텍스트가 NULL인 행만, False면 전체
+
+    Returns:
+        Dict[str, int]: 처리한 댓글/영상 수
+    """
+    import psycopg2
+    import psycopg2.extras
+
+    db_config = db_config or _default_db_config()
+    stats = {'comments': 0, 'videos': 0}
+    comment_where = "WHERE text_clean IS NULL" if only_missing else ""
+    video_where = (
+        "WHERE title_clean IS NULL OR (description IS NOT NULL AND description_clean IS NULL)"
+        if only_missing else ""
+    )
+
+    with psycopg2.connect(**db_config) as read_conn, psycopg2.connect(**db_config) as write_conn:
+        with read_conn.cursor(name="comments_clean_backfill") as read_cur:
+            read_cur.itersize = batch_size
+            read_cur.execute(f"SELECT id, published_at, text_raw FROM yt.comments {comment_where}")
+            while True:
+                rows = read_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                with write_conn.cursor() as cur:
+                    psycopg2.extras.execute_values(cur, """
+                      UPDATE yt.comments AS c SET text_clean = t.text_clean
+                      FROM (VALUES %s) AS t(id, published_at, text_clean)
+                      WHERE c.id = t.id AND c.published_at = t.published_at
+                    """, [(str(cid), published_at, clean_text(text_raw)) for cid, published_at, text_raw in rows],
+                        template="(%s::uuid, %s::timestamptz, %s)")
+                write_conn.commit()
+                stats['comments'] += len(rows)
+
+        with read_conn.cursor(name="videos_clean_backfill") as read_cur:
+            read_cur.itersize = batch_size
+            read_cur.execute(f"SELECT id, title, description FROM yt.videos {video_where}")
+            while True:
+                rows = read_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                values = [
+                    (str(video_id), clean_text(title), clean_text(description) if description is not None else None)
+                    for video_id, title, description in rows
+                ]
+                with write_conn.cursor() as cur:
+                    psycopg2.extras.execute_values(cur, """
+                      UPDATE yt.videos AS v
+                      SET title_clean = t.title_clean, description_clean = t.description_clean
+                      FROM (VALUES %s) AS t(id, title_clean, description_clean)
+                      WHERE v.id = t.id
+                    """, values, template="(%s::uuid, %s, %s)")
+                write_conn.commit()
+                stats['videos'] += len(rows)
+
+    print(f"정제 텍스트 계산 완료: 댓글 {stats['comments']}개, 영상 {stats['videos']}개")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='댓글/영상 정제 텍스트 백필')
+    parser.add_argument('--all', action='store_true', help='전체 행 다시 계산')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    backfill_clean_text(batch_size=args.batch_size, only_missing=not args.all)
@@ -1,21 +1,26 @@
+import hashlib
 import html
 import re
 from typing import Tuple
 
-_whitespace_re = re.compile(r"\s+")
-_emoji_re = re.compile(
-    r"[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]+",
+# 이모지와 공백 연속 구간을 한 번의 치환으로 공백 하나로 바꿈 (모듈 로드 시 한 번 컴파일)
+_noise_re = re.compile(
+    r"(?:[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]|\s)+",
     flags=re.UNICODE,
 )
 
 
 def clean_text(raw: str) -> str:
+    # 결과는 yt.comments.text_clean / yt.videos.title_clean, description_clean에 저장되어 재사용됨
     if not raw:
         return ""
-    text = html.unescape(raw)
-    text = _emoji_re.sub(" ", text)
-    text = _whitespace_re.sub(" ", text)
-    return text.strip()
+    text = html.unescape(raw) if "&" in raw else raw
+    return _noise_re.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    # 정제된 입력 텍스트의 내용 해시 (바뀌지 않은 임베딩은 다시 계산하지 않음)
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
 
 
 def label_to_score(label: str, prob: float) -> float:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+영상-키워드 매핑 모듈
+수집 시점에 영상 제목과 행궁 키워드를 매칭해 yt.video_keywords에 저장합니다.
+YouTube 검색 키워드(어떤 키워드가 영상을 찾았는지)도 함께 보존하며,
+수집 경로 밖에서 들어왔거나 제목이 바뀐 영상은 backfill_title_keywords()로 다시 계산합니다.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from palace_matcher import PALACE_MATCHER, KeywordMatcher
+
+TITLE_SOURCE = "title"
+SEARCH_SOURCE = "search"
+
+
+def title_keyword_scores(title: str, keywords: Iterable[str] = None) -> List[Tuple[str, float]]:
+    """
+    제목에 포함된 키워드와 점수 계산
+    
+    점수는 키워드 길이 / 제목 길이로, 기존 API가 요청마다 계산하던
+    "매칭 키워드가 제목에 포함된 정도"와 같은 값입니다.
+    포함된 키워드는 미리 컴파일된 매처의 Aho-Corasick 오토마톤으로 제목을 한 번 훑어 찾습니다.
+    
+    Args:
+        title: 영상 제목
+        keywords: 매칭할 키워드 목록 (기본: 전체 행궁 키워드, palace_matcher.PALACE_MATCHER 사용)
+        
+    Returns:
+        List[Tuple[str, float]]: (키워드, 점수) 리스트 (키워드 목록 순서)
+    """
+    if not title:
+        return []
+    matcher = PALACE_MATCHER if keywords is None else KeywordMatcher(list(keywords))
+    title_len = len(title.lower())
+    return [
+        (matcher.keywords[idx], min(len(matcher.keywords[idx]) / title_len, 1.0))
+        for idx in matcher.contained_in(title)
+    ]
+
+
+def upsert_video_keywords(cur, video_db_id, title: str, source: str = TITLE_SOURCE) -> int:
+    """
+    영상 하나의 키워드 매핑 갱신
+    
+    같은 source의 기존 매핑은 지우고 다시 넣으므로 제목이 바뀌어도
+    오래된 키워드가 남지 않습니다. 제목 매핑이면 yt.video_keywords_state에 제목 해시를
+    기록해 백필 대상에서 빠지게 합니다. (yt.videos는 건드리지 않으므로 updated_at이 바뀌지 않음)
+    psycopg2 / psycopg3 커서 모두 사용 가능합니다.
+    
+    Args:
+        cur: DB 커서
+        video_db_id: yt.videos.id
+        title: 영상 제목
+        source: 매핑 근거
+        
+    Returns:
+        int: 저장된 키워드 수
+    """
+    scores = title_keyword_scores(title)
+    cur.execute(
+        "DELETE FROM yt.video_keywords WHERE video_id = %s AND source = %s",
+        (video_db_id, source),
+    )
+    if source == TITLE_SOURCE:
+        cur.execute("""
+          INSERT INTO yt.video_keywords_state (video_id, title_md5, mapped_at)
+          VALUES (%s, md5(%s), now())
+          ON CONFLICT (video_id)
+          DO UPDATE SET title_md5 = EXCLUDED.title_md5, mapped_at = EXCLUDED.mapped_at
+        """, (video_db_id, title))
+    if not scores:
+        return 0
+    cur.execute("""
+      INSERT INTO yt.video_keywords (keyword, video_id, score, source)
+      SELECT k.keyword, %s, k.score, %s
+      FROM unnest(%s::text[], %s::real[]) AS k(keyword, score)
+      ON CONFLICT (keyword, video_id, source)
+      DO UPDATE SET score = EXCLUDED.score, created_at = now()
+    """, (video_db_id, source, [k for k, _ in scores], [s for _, s in scores]))
+    return len(scores)
+
+
+def search_rank_score(rank: int, total: int) -> float:
+    """
+    검색 결과 순위를 점수로 변환 (1위 1.0, 마지막 순위도 0보다 크게)
+    
+    Args:
+        rank: 0부터 시작하는 검색 결과 순위
+        total: 해당 키워드의 검색 결과 수
+    """
+    return 1.0 - rank / (max(total, 1) + 1)
+
+
+def upsert_search_keywords(cur, video_db_id, keyword_scores: Dict[str, float]) -> int:
+    """
+    영상을 찾아낸 검색 키워드 저장 (source='search')
+    
+    이전 수집에서 다른 키워드로 찾은 기록은 유지하고,
+    같은 키워드는 더 높은 점수로 갱신합니다.
+    
+    Args:
+        cur: DB 커서
+        video_db_id: yt.videos.id
+        keyword_scores: {검색 키워드: 순위 점수}
+        
+    Returns:
+        int: 저장된 키워드 수
+    """
+    if not keyword_scores:
+        return 0
+    cur.execute("""
+      INSERT INTO yt.video_keywords (keyword, video_id, score, source)
+      SELECT k.keyword, %s, k.score, %s
+      FROM unnest(%s::text[], %s::real[]) AS k(keyword, score)
+      ON CONFLICT (keyword, video_id, source)
+      DO UPDATE SET score = GREATEST(yt.video_keywords.score, EXCLUDED.score), created_at = now()
+    """, (video_db_id, SEARCH_SOURCE, list(keyword_scores), list(keyword_scores.values())))
+    return len(keyword_scores)
+
+
+def backfill_title_keywords(db_config: Optional[Dict] = None, batch_size: int = 1000,
+                            only_missing: bool = True) -> Dict[str, int]:
+    """
+    영상 제목 기반 키워드 매핑 재계산
+    
+    기본으로 아직 매핑하지 않았거나 이후 제목이 바뀐 영상(yt.video_keywords_state가 없거나
+    기록된 제목 해시가 현재 제목과 다른 영상)만 다시 계산하고, 키워드 목록이 바뀌었으면 only_missing=False로 전체를 다시 계산합니다.
+    영상은 서버 사이드 커서로 나눠 읽고, 배치마다 기존 title 매핑을 지운 뒤
+    한 번에 다시 넣습니다. (source='search' 매핑은 건드리지 않음)
+    
+    Args:
+        db_config: DB 접속 정보 (기본: 환경변수)
+        batch_size: 한 번에 처리할 영상 수
+        only_missing: True면 매핑 기록이 없거나 제목이 바뀐 영상만, False면 전체
+        
+    Returns:
+        Dict[str, int]: 처리한 영상 수와 저장한 매핑 수
+    """
+    import psycopg2
+    import psycopg2.extras
+    
+    if db_config is None:
+        db_config = {
+            'host': os.getenv("DB_HOST", "localhost"),
+            'port': int(os.getenv("DB_PORT", "5432")),
+            'dbname': os.getenv("DB_NAME", "yt"),
+            'user': os.getenv("DB_USER", "app"),
+            'password': os.getenv("DB_PASSWORD", "app1234"),
+        }
+    query = "SELECT v.id, v.title FROM yt.videos v"
+    if only_missing:
+        query += """
+          LEFT JOIN yt.video_keywords_state s ON s.video_id = v.id
+          WHERE s.video_id IS NULL OR s.title_md5 IS DISTINCT FROM md5(v.title)
+        """
+    stats = {'videos': 0, 'mappings': 0}
+    
+    with psycopg2.connect(**db_config) as read_conn, psycopg2.connect(**db_config) as write_conn:
+        with read_conn.cursor(name="video_keywords_backfill") as read_cur:
+            read_cur.itersize = batch_size
+            read_cur.execute(query)
+            while True:
+                rows = read_cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                values = [
+                    (keyword, video_id, score, TITLE_SOURCE)
+                    for video_id, title in rows
+                    for keyword, score in title_keyword_scores(title)
+                ]
+                video_ids = [str(video_id) for video_id, _ in rows]
+                with write_conn.cursor() as cur:
+                    cur.execute(
+                        "DELETE FROM yt.video_keywords WHERE source = %s AND video_id = ANY(%s::uuid[])",
+                        (TITLE_SOURCE, video_ids),
+                    )
+                    psycopg2.extras.execute_values(cur, """
+                      INSERT INTO yt.video_keywords_state (video_id, title_md5, mapped_at)
+                      VALUES %s
+                      ON CONFLICT (video_id)
+                      DO UPDATE SET title_md5 = EXCLUDED.title_md5, mapped_at = EXCLUDED.mapped_at
+                    """, [(video_id, title) for video_id, title in rows],
+                        template="(%s::uuid, md5(%s), now())")
+                    if values:
+                        psycopg2.extras.execute_values(cur, """
+                          INSERT INTO yt.video_keywords (keyword, video_id, score, source)
+                          VALUES %s
+                          ON CONFLICT (keyword, video_id, source)
+                          DO UPDATE SET score = EXCLUDED.score, created_at = now()
+                        """, values)
+                write_conn.commit()
+                stats['videos'] += len(rows)
+                stats['mappings'] += len(values)
+    
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='영상-키워드 매핑 재계산')
+    parser.add_argument('--all', action='store_true', help='키워드 목록을 바꾼 뒤 전체 영상 다시 계산')
+    args = parser.parse_args()
+    
+    result = backfill_title_keywords(only_missing=not args.all)
+    print(f"키워드 매핑 재계산 완료: 영상 {result['videos']}개, 매핑 {result['mappings']}개")
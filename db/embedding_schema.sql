@@ -9,10 +9,39 @@ CREATE TABLE IF NOT EXISTS yt.video_embeddings (
     embedding_vector FLOAT[] NOT NULL,
     embedding_dim INTEGER NOT NULL,
     model_name TEXT NOT NULL,
-    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    text_hash TEXT,                     -- 정제된 입력 텍스트의 SHA-1 (변경 감지/중복 제거)
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),  -- 벡터를 마지막으로 인코딩한 시각
+    checked_at TIMESTAMPTZ,             -- 입력 변경 여부를 마지막으로 확인한 시각 (재인코딩 없이 갱신)
     UNIQUE(video_id, embedding_type, model_name)
 );
 
+-- 기존 테이블 마이그레이션
+ALTER TABLE yt.video_embeddings ADD COLUMN IF NOT EXISTS text_hash TEXT;
+ALTER TABLE yt.video_embeddings ADD COLUMN IF NOT EXISTS checked_at TIMESTAMPTZ;
+
+-- 임베딩 입력(제목/설명/태그)이 바뀐 시각 (재임베딩 대상 조회용)
+-- yt.videos에 ACCESS EXCLUSIVE 잠금이 필요하므로 파이프라인 실행 시가 아니라 이 파일로 한 번만 적용
+-- updated_at은 재수집/백필 UPDATE마다 바뀌므로 입력 컬럼이 실제로 바뀔 때만 트리거로 갱신
+-- 기존 행은 NULL (마이그레이션 직후 전체 재조회 방지), 새 영상은 now()
+ALTER TABLE yt.videos ADD COLUMN IF NOT EXISTS content_updated_at TIMESTAMPTZ;
+ALTER TABLE yt.videos ALTER COLUMN content_updated_at SET DEFAULT now();
+
+CREATE OR REPLACE FUNCTION yt.videos_touch_content() RETURNS trigger AS $$
+BEGIN
+    IF NEW.title IS DISTINCT FROM OLD.title
+       OR NEW.description IS DISTINCT FROM OLD.description
+       OR NEW.tags IS DISTINCT FROM OLD.tags THEN
+        NEW.content_updated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_videos_content_updated_at ON yt.videos;
+CREATE TRIGGER trg_videos_content_updated_at
+BEFORE UPDATE OF title, description, tags ON yt.videos
+FOR EACH ROW EXECUTE FUNCTION yt.videos_touch_content();
+
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_video_embeddings_video_id 
 ON yt.video_embeddings(video_id);
@@ -23,6 +52,10 @@ ON yt.video_embeddings(embedding_type);
 CREATE INDEX IF NOT EXISTS idx_video_embeddings_model 
 ON yt.video_embeddings(model_name);
 
+-- 동일 텍스트 벡터 재사용 조회용
+CREATE INDEX IF NOT EXISTS idx_video_embeddings_text_hash 
+ON yt.video_embeddings(model_name, text_hash);
+
 -- 벡터 유사도 검색을 위한 인덱스 (pgvector 확장 필요)
 -- pgvector가 설치된 경우에만 실행
 -- CREATE INDEX IF NOT EXISTS idx_video_embeddings_vector_cosine 
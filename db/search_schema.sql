@@ -0,0 +1,159 @@
+-- 검색 보조 테이블 스키마 확장
+-- 기존 yt_schema.sql에 추가할 내용
+
+-- 키워드 → 영상 매핑 (수집 시점에 계산, 검색 시 인덱스 범위 조회)
+CREATE TABLE IF NOT EXISTS yt.video_keywords (
+    keyword TEXT NOT NULL,
+    video_id UUID NOT NULL REFERENCES yt.videos(id) ON DELETE CASCADE,
+    score REAL NOT NULL,                -- 키워드가 영상 제목에서 차지하는 비중 등 (0~1)
+    source TEXT NOT NULL DEFAULT 'title',  -- 매핑 근거 (title: 제목 매칭, search: 해당 키워드 YouTube 검색 결과)
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (keyword, video_id, source)
+);
+
+-- 키워드별 점수순 조회용
+CREATE INDEX IF NOT EXISTS idx_video_keywords_keyword_score
+ON yt.video_keywords(keyword, score DESC);
+
+-- 영상 삭제/재계산용
+CREATE INDEX IF NOT EXISTS idx_video_keywords_video_id
+ON yt.video_keywords(video_id);
+
+-- 제목 키워드 매핑을 마지막으로 계산한 시각과 그때의 제목 해시 (영상당 한 행)
+-- yt.videos를 UPDATE하면 updated_at 트리거가 돌아 추천 인덱스 data_signature가 바뀌므로 별도 테이블에 둠
+-- 행이 없거나 title_md5가 현재 md5(title)와 다르면 아직 매핑하지 않았거나 이후 제목이 바뀐 영상
+CREATE TABLE IF NOT EXISTS yt.video_keywords_state (
+    video_id UUID PRIMARY KEY REFERENCES yt.videos(id) ON DELETE CASCADE,
+    title_md5 TEXT,
+    mapped_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 이전 버전 스키마의 yt.videos 매핑 시각 컬럼/트리거 (더 이상 사용하지 않음, 첫 재계산에서 전체가 한 번 다시 매핑됨)
+DROP TRIGGER IF EXISTS trg_videos_reset_keywords_mapped ON yt.videos;
+DROP FUNCTION IF EXISTS yt.videos_reset_keywords_mapped();
+ALTER TABLE yt.videos DROP COLUMN IF EXISTS keywords_mapped_at;
+
+-- 태그 어휘 (yt.videos.tags의 고유 태그와 사용 영상 수, 트리거로 증분 갱신)
+CREATE TABLE IF NOT EXISTS yt.tag_vocab (
+    tag TEXT PRIMARY KEY,
+    video_count INTEGER NOT NULL DEFAULT 0,
+    last_seen TIMESTAMPTZ NOT NULL DEFAULT now()   -- 태그가 마지막으로 영상에 추가된 시각
+);
+
+-- 행 단위 변경 시각: 증감/추가 때마다 갱신, API는 (행 수, video_count 합, MAX(updated_at))이 바뀌면 메모리 인덱스를 다시 로드
+-- 모든 수집 트랜잭션이 잠그는 단일 행 카운터 대신 바뀐 태그 행만 잠그므로 서로 다른 태그를 바꾸는 트랜잭션끼리 직렬화되지 않음
+ALTER TABLE yt.tag_vocab ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- 이전 버전 스키마의 단일 행 버전 카운터 (더 이상 사용하지 않음)
+DROP TABLE IF EXISTS yt.tag_vocab_state;
+
+CREATE OR REPLACE FUNCTION yt.tag_vocab_apply() RETURNS trigger AS $$
+DECLARE
+    old_tags TEXT[] := '{}';
+    new_tags TEXT[] := '{}';
+    added TEXT[];
+    removed TEXT[];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_tags := COALESCE(OLD.tags, '{}');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_tags := COALESCE(NEW.tags, '{}');
+    END IF;
+
+    SELECT array_agg(t) INTO added
+    FROM (SELECT unnest(new_tags) EXCEPT SELECT unnest(old_tags)) s(t)
+    WHERE t IS NOT NULL AND t <> '';
+
+    SELECT array_agg(t) INTO removed
+    FROM (SELECT unnest(old_tags) EXCEPT SELECT unnest(new_tags)) s(t)
+    WHERE t IS NOT NULL AND t <> '';
+
+    IF added IS NOT NULL THEN
+        INSERT INTO yt.tag_vocab (tag, video_count, last_seen, updated_at)
+        SELECT unnest(added), 1, now(), clock_timestamp()
+        ON CONFLICT (tag)
+        DO UPDATE SET video_count = yt.tag_vocab.video_count + 1, last_seen = now(),
+                      updated_at = clock_timestamp();
+    END IF;
+
+    IF removed IS NOT NULL THEN
+        UPDATE yt.tag_vocab SET video_count = video_count - 1, updated_at = clock_timestamp()
+        WHERE tag = ANY(removed);
+        DELETE FROM yt.tag_vocab WHERE tag = ANY(removed) AND video_count <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_videos_tag_vocab ON yt.videos;
+CREATE TRIGGER trg_videos_tag_vocab
+AFTER INSERT OR DELETE OR UPDATE OF tags ON yt.videos
+FOR EACH ROW EXECUTE FUNCTION yt.tag_vocab_apply();
+
+-- 전체 재계산 (초기 적재/불일치 복구용), 태그 수 반환
+CREATE OR REPLACE FUNCTION yt.rebuild_tag_vocab() RETURNS BIGINT AS $$
+DECLARE
+    tag_count BIGINT;
+BEGIN
+    LOCK TABLE yt.tag_vocab IN EXCLUSIVE MODE;
+    DELETE FROM yt.tag_vocab;
+    INSERT INTO yt.tag_vocab (tag, video_count, last_seen)
+    SELECT t, COUNT(DISTINCT v.id), MAX(v.updated_at)
+    FROM yt.videos v, unnest(v.tags) AS t
+    WHERE t IS NOT NULL AND t <> ''
+    GROUP BY t;
+    GET DIAGNOSTICS tag_count = ROW_COUNT;
+    RETURN tag_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 이전 버전 스키마의 버전 시퀀스 (더 이상 사용하지 않음)
+DROP SEQUENCE IF EXISTS yt.tag_vocab_version;
+
+SELECT yt.rebuild_tag_vocab() WHERE NOT EXISTS (SELECT 1 FROM yt.tag_vocab);
+
+-- 영상 제목 형태소 토큰 (수집 시 crawler/korean_tokenizer.py로 한 번 계산, 유사도 계산에서 재사용)
+ALTER TABLE yt.videos ADD COLUMN IF NOT EXISTS title_tokens TEXT[];
+
+-- 토큰 포함 조회용 (title_tokens @> ARRAY['경복궁'])
+CREATE INDEX IF NOT EXISTS idx_videos_title_tokens
+ON yt.videos USING GIN (title_tokens);
+
+-- 제목만 바뀌고 토큰이 함께 갱신되지 않으면 비워서 토큰 백필(korean_tokenizer.py --backfill)이 다시 계산하게 함
+CREATE OR REPLACE FUNCTION yt.videos_reset_title_tokens() RETURNS trigger AS $$
+BEGIN
+    IF NEW.title IS DISTINCT FROM OLD.title AND NEW.title_tokens IS NOT DISTINCT FROM OLD.title_tokens THEN
+        NEW.title_tokens := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_videos_reset_title_tokens ON yt.videos;
+CREATE TRIGGER trg_videos_reset_title_tokens
+BEFORE UPDATE OF title ON yt.videos
+FOR EACH ROW EXECUTE FUNCTION yt.videos_reset_title_tokens();
+
+-- 정제 제목/설명 (crawler/text_utils.clean_text 결과, 수집 시 또는 crawler/text_cleaning.py로 한 번 계산)
+-- 댓글 정제 텍스트는 yt.comments.text_clean에 저장
+ALTER TABLE yt.videos ADD COLUMN IF NOT EXISTS title_clean TEXT;
+ALTER TABLE yt.videos ADD COLUMN IF NOT EXISTS description_clean TEXT;
+
+-- 원문만 바뀌고 정제 텍스트가 함께 갱신되지 않으면 비워서 다음 정제 단계(또는 사용하는 쪽)가 다시 계산하게 함
+CREATE OR REPLACE FUNCTION yt.videos_reset_clean_text() RETURNS trigger AS $$
+BEGIN
+    IF NEW.title IS DISTINCT FROM OLD.title AND NEW.title_clean IS NOT DISTINCT FROM OLD.title_clean THEN
+        NEW.title_clean := NULL;
+    END IF;
+    IF NEW.description IS DISTINCT FROM OLD.description AND NEW.description_clean IS NOT DISTINCT FROM OLD.description_clean THEN
+        NEW.description_clean := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_videos_reset_clean_text ON yt.videos;
+CREATE TRIGGER trg_videos_reset_clean_text
+BEFORE UPDATE OF title, description ON yt.videos
+FOR EACH ROW EXECUTE FUNCTION yt.videos_reset_clean_text();
@@ -67,6 +67,14 @@ CREATE INDEX IF NOT EXISTS idx_videos_topic_labels ON videos USING GIN (topic_la
 CREATE INDEX IF NOT EXISTS idx_videos_metadata ON videos USING GIN (metadata);
 CREATE INDEX IF NOT EXISTS idx_videos_stats ON videos USING GIN (stats);
 
+-- Migration: columns the crawler writes on every upsert (crawl_videos.upsert_video)
+-- and the embedding pipeline reads (generate_embeddings).
+-- Also declared in search_schema.sql; repeated here so the core schema alone is enough to crawl.
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS title_tokens TEXT[];               -- 제목 형태소 토큰 (korean_tokenizer)
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS title_clean TEXT;                  -- clean_text(title)
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS description_clean TEXT;            -- clean_text(description)
+CREATE INDEX IF NOT EXISTS idx_videos_title_tokens ON videos USING GIN (title_tokens);
+
 -- Trigger to maintain updated_at
 CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
 BEGIN
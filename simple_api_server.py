@@ -6,10 +6,14 @@
 import os
 import sys
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+from contextlib import contextmanager
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+import psycopg2.pool
 
 # 환경 설정
 os.environ["DB_PORT"] = "55432"
@@ -23,41 +27,212 @@ DB_CONFIG = {
     'password': os.getenv("DB_PASSWORD", "app1234"),
 }
 
+class APIError(Exception):
+    """HTTP 오류 응답으로 변환되는 예외"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# 요청 스레드가 공유하는 DB 커넥션 풀 (첫 사용 시 생성)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+_db_pool = None
+_db_pool_lock = threading.Lock()
+# ThreadedConnectionPool은 커넥션이 모자라면 기다리지 않고 PoolError를 내므로 빌리는 수를 세마포어로 제한
+_db_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+def get_db_pool():
+    """스레드 안전 커넥션 풀 싱글톤"""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = psycopg2.pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **DB_CONFIG)
+    return _db_pool
+
+@contextmanager
+def db_connection():
+    """
+    풀에서 커넥션을 빌려 트랜잭션 단위로 사용 (성공 시 commit, 실패 시 rollback)
+    
+    모든 커넥션이 사용 중이면 DB_POOL_TIMEOUT초까지 반납을 기다리고, 그래도 없으면 503
+    """
+    pool = get_db_pool()
+    if not _db_pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise APIError(503, "데이터베이스 연결이 모두 사용 중입니다. 잠시 후 다시 시도해주세요")
+    try:
+        conn = pool.getconn()
+    except Exception:
+        _db_pool_slots.release()
+        raise
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+        raise
+    finally:
+        pool.putconn(conn, close=broken or conn.closed != 0)
+        _db_pool_slots.release()
+
+def int_param(params, name, default):
+    """정수 쿼리 파라미터 (숫자가 아니면 400)"""
+    value = params.get(name, [str(default)])[0]
+    try:
+        return int(value)
+    except ValueError:
+        raise APIError(400, f"{name}은(는) 정수여야 합니다: {value}")
+
+# 태그 어휘 메모리 인덱스 (yt.tag_vocab 버전이 바뀌면 다시 로드)
+_tag_vocab_index = None
+_tag_vocab_lock = threading.Lock()
+
+def get_tag_vocab():
+    """태그 어휘 인덱스 (사용 불가 시 None)"""
+    global _tag_vocab_index
+    try:
+        if _tag_vocab_index is None:
+            with _tag_vocab_lock:
+                if _tag_vocab_index is None:
+                    from tag_vocab import TagVocabIndex
+                    _tag_vocab_index = TagVocabIndex(float(os.getenv("TAG_VOCAB_CHECK_SECONDS", "10")))
+        # refresh는 커넥션을 직접 닫으므로 풀 컨텍스트 매니저 대신 새 커넥션 팩토리를 넘김 (자동완성과 동일)
+        return _tag_vocab_index.refresh(lambda: psycopg2.connect(**DB_CONFIG))
+    except Exception as e:
+        print(f"태그 어휘 인덱스 사용 불가 (태그 스캔으로 대체): {e}")
+        return None
+
+# 자동완성 인덱스 (main()에서 백그라운드 빌드 시작)
+_suggest_service = None
+_suggest_service_lock = threading.Lock()
+
+def get_suggest_service():
+    global _suggest_service
+    if _suggest_service is None:
+        with _suggest_service_lock:
+            if _suggest_service is None:
+                from suggest_index import SuggestService
+                _suggest_service = SuggestService()
+    return _suggest_service
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawler'))
+
+# 검색어 → 행궁 키워드 라우팅 (embedding: 키워드 벡터 라우터 + 문자열 매칭, lexical: 문자열 매칭만)
+KEYWORD_ROUTER = os.getenv("KEYWORD_ROUTER", "embedding")
+KEYWORD_ROUTER_THRESHOLD = float(os.getenv("KEYWORD_ROUTER_THRESHOLD", "0.5"))
+_keyword_router = None
+_keyword_router_failed = False
+_keyword_router_lock = threading.Lock()
+
+def get_keyword_router():
+    """키워드 벡터 라우터 싱글톤 (사용할 수 없으면 None)"""
+    global _keyword_router, _keyword_router_failed
+    if KEYWORD_ROUTER != "embedding" or _keyword_router_failed:
+        return None
+    if _keyword_router is None:
+        with _keyword_router_lock:
+            if _keyword_router_failed:
+                return None
+            if _keyword_router is None:
+                try:
+                    from keyword_router import KeywordRouter, DEFAULT_MODEL, DEFAULT_VECTORS_PATH
+                    _keyword_router = KeywordRouter(
+                        os.getenv("KEYWORD_VECTORS_PATH", DEFAULT_VECTORS_PATH),
+                        os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL),
+                    )
+                except Exception as e:
+                    _keyword_router_failed = True
+                    print(f"키워드 벡터 라우터 사용 불가 (문자열 매칭만 사용): {e}")
+                    return None
+    return _keyword_router
+
+def route_keywords(q, top_k=3):
+    """
+    검색어와 가까운 행궁 키워드
+    
+    문자열 매칭 점수와 임베딩 코사인 유사도 중 큰 값을 키워드 점수로 사용합니다.
+    완전 일치/포함은 문자열 매칭이, 표현이 다른 질의는 임베딩이 잡습니다.
+    """
+    from palace_keywords import find_most_similar_keywords
+    scores = dict(find_most_similar_keywords(q, top_k=top_k))
+    router = get_keyword_router()
+    if router is not None:
+        for keyword, score in router.route(q, top_k=top_k, threshold=KEYWORD_ROUTER_THRESHOLD):
+            scores[keyword] = max(scores.get(keyword, 0.0), score)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
 class APIHandler(BaseHTTPRequestHandler):
+    # keep-alive: 한 커넥션으로 여러 요청 처리 (응답마다 Content-Length 지정)
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문이 따로 전송될 때 Nagle + delayed ACK로 요청마다 ~40ms 지연되는 것 방지
+    disable_nagle_algorithm = True
+    
     def do_GET(self):
         """GET 요청 처리"""
         parsed_path = urlparse(self.path)
         path = parsed_path.path
         query_params = parse_qs(parsed_path.query)
         
-        # CORS 헤더 설정
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
+        routes = {
+            '/health': lambda: self.handle_health(),
+            '/search_methods': lambda: self.handle_search_methods(),
+            '/embedding_stats': lambda: self.handle_embedding_stats(),
+            '/similar_search': lambda: self.handle_similar_search(query_params),
+            '/similar_keywords': lambda: self.handle_similar_keywords(query_params),
+            '/suggest': lambda: self.handle_suggest(query_params),
+        }
+        
+        # 응답 본문을 먼저 만든 뒤 상태 코드와 헤더를 보냄 (처리 중 오류도 올바른 상태 코드로 응답)
+        try:
+            handler = routes.get(path)
+            if handler is None:
+                raise APIError(404, "Not Found")
+            status, payload = 200, handler()
+        except APIError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": f"Internal Server Error: {str(e)}"}
+        
+        self.send_json(status, payload)
+    
+    def do_OPTIONS(self):
+        """CORS preflight"""
+        self.send_response(204)
+        self.send_cors_headers()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def send_cors_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+    
+    def send_json(self, status, payload):
+        """JSON 응답 전송"""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_cors_headers()
         self.end_headers()
-        
-        try:
-            if path == '/health':
-                self.handle_health()
-            elif path == '/search_methods':
-                self.handle_search_methods()
-            elif path == '/embedding_stats':
-                self.handle_embedding_stats()
-            elif path == '/similar_search':
-                self.handle_similar_search(query_params)
-            elif path == '/similar_keywords':
-                self.handle_similar_keywords(query_params)
-            else:
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            self.send_error(500, f"Internal Server Error: {str(e)}")
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # 부하 테스트 시 요청마다 stderr 출력이 병목이 되지 않도록 QUIET_ACCESS_LOG로 끌 수 있음
+        if os.getenv("QUIET_ACCESS_LOG") != "1":
+            super().log_message(format, *args)
     
     def handle_health(self):
         """헬스 체크"""
         try:
-            with psycopg2.connect(**DB_CONFIG) as conn:
+            with db_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("SELECT 1")
                     _ = cur.fetchone()
@@ -65,7 +240,7 @@ class APIHandler(BaseHTTPRequestHandler):
         except Exception as e:
             response = {"ok": False, "error": str(e)}
         
-        self.wfile.write(json.dumps(response).encode())
+        return response
     
     def handle_search_methods(self):
         """검색 방법 목록"""
@@ -109,11 +284,11 @@ class APIHandler(BaseHTTPRequestHandler):
                 "full_text"
             ]
         }
-        self.wfile.write(json.dumps(response).encode())
+        return response
     
     def handle_embedding_stats(self):
         """임베딩 통계"""
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with db_connection() as conn:
             with conn.cursor() as cur:
                 # 전체 통계
                 cur.execute("SELECT * FROM yt.get_embedding_progress()")
@@ -142,41 +317,36 @@ class APIHandler(BaseHTTPRequestHandler):
                     ]
                 }
         
-        self.wfile.write(json.dumps(response).encode())
+        return response
     
     def handle_similar_search(self, params):
         """행궁 관련 유사 검색"""
         q = params.get('q', [''])[0]
         method = params.get('method', ['jaccard'])[0]
-        limit = int(params.get('limit', ['10'])[0])
+        limit = int_param(params, 'limit', 10)
         
         # 입력 검증 및 정제
         if not q or not q.strip():
-            self.send_error(400, "검색어를 입력해주세요")
-            return
+            raise APIError(400, "검색어를 입력해주세요")
             
         # 검색어 길이 제한 (XSS 방어)
         if len(q) > 100:
-            self.send_error(400, "검색어는 100자 이하로 입력해주세요")
-            return
+            raise APIError(400, "검색어는 100자 이하로 입력해주세요")
             
         # 특수문자 필터링 (기본적인 XSS 방어)
         dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')', 'script', 'javascript', 'onload', 'onerror']
         q_lower = q.lower()
         for char in dangerous_chars:
             if char in q_lower:
-                self.send_error(400, "Invalid characters detected")
-                return
+                raise APIError(400, "Invalid characters detected")
         
         # 행궁 관련 키워드와의 유사도 계산
         try:
-            from palace_keywords import find_most_similar_keywords
-            similar_keywords = find_most_similar_keywords(q, top_k=3)
+            similar_keywords = route_keywords(q, top_k=3)
             
             if not similar_keywords or similar_keywords[0][1] < 0.05:
                 # 행궁과 관련성이 낮은 경우 빈 결과 반환 (임계값 0.1 → 0.05로 낮춤)
-                self.wfile.write(json.dumps([]).encode())
-                return
+                return []
                 
             # 가장 유사한 키워드로 검색
             best_keyword = similar_keywords[0][0]
@@ -185,21 +355,80 @@ class APIHandler(BaseHTTPRequestHandler):
         except ImportError:
             # palace_keywords 모듈이 없는 경우 기본 검색
             best_keyword = q
+            similar_keywords = []
             print(f"기본 검색 사용: '{q}'")
         
-        # 간단한 텍스트 기반 검색 (임베딩 없이)
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        if not similar_keywords:
+            # 라우터 없이 입력을 그대로 쓰는 경우 매핑 테이블의 키워드와 맞지 않으므로 제목 ILIKE 검색
+            return self.ilike_search(q, best_keyword, [best_keyword], limit)
+        
+        # 검색 키워드와 가중치 (상위 3개 키워드, 라우팅 유사도를 가중치로 사용)
+        search_terms = {best_keyword: 1.0}
+        for keyword, score in similar_keywords[:3]:
+            search_terms.setdefault(keyword, score)
+        
+        try:
+            results = self.keyword_mapping_search(search_terms, limit)
+        except psycopg2.errors.UndefinedTable:
+            # yt.video_keywords 미생성 환경: 제목 ILIKE 검색으로 대체
+            results = self.ilike_search(q, best_keyword, list(search_terms), limit)
+        
+        return results
+    
+    def keyword_mapping_search(self, search_terms, limit):
+        """
+        yt.video_keywords 매핑 테이블로 다중 키워드 OR 검색
+        
+        키워드마다 (keyword, score DESC) 인덱스에서 상위 후보만 읽고,
+        키워드 가중치 × 매핑 점수를 한 번의 집계로 합산합니다.
+        영상 테이블 크기와 무관하게 키워드당 읽는 행 수가 제한됩니다.
+        
+        Args:
+            search_terms: {키워드: 가중치}
+            limit: 반환할 결과 수
+        """
+        per_keyword = max(limit * 5, 50)
+        with db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT v.id, v.video_yid, v.title, v.description, v.published_at, v.tags,
+                           m.similarity_score, m.matched_keyword
+                    FROM (
+                        SELECT vk.video_id,
+                               SUM(w.weight * vk.score) AS similarity_score,
+                               (array_agg(w.keyword ORDER BY w.weight * vk.score DESC))[1] AS matched_keyword
+                        FROM unnest(%s::text[], %s::real[]) AS w(keyword, weight)
+                        CROSS JOIN LATERAL (
+                            SELECT video_id, score
+                            FROM yt.video_keywords
+                            WHERE keyword = w.keyword
+                            ORDER BY score DESC
+                            LIMIT %s
+                        ) vk
+                        GROUP BY vk.video_id
+                    ) m
+                    JOIN yt.videos v ON v.id = m.video_id
+                    ORDER BY m.similarity_score DESC, v.published_at DESC
+                    LIMIT %s
+                """, (list(search_terms), list(search_terms.values()), per_keyword, limit))
+                videos = cur.fetchall()
+        
+        return [{
+            'id': str(video['id']),
+            'video_yid': video['video_yid'],
+            'title': video['title'],
+            'description': video['description'],
+            'published_at': video['published_at'].isoformat() if video['published_at'] else None,
+            'tags': video['tags'],
+            'similarity_score': float(video['similarity_score']),
+            'matched_keyword': video['matched_keyword']
+        } for video in videos]
+    
+    def ilike_search(self, q, best_keyword, search_terms, limit):
+        """제목 ILIKE OR 검색 (매핑 테이블이 없을 때의 대체 경로)"""
+        with db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 # SQL Injection 방어: 파라미터화된 쿼리 사용
-                # 더 유연한 검색을 위해 여러 키워드로 검색
-                search_terms = [best_keyword]
-                if similar_keywords:
-                    # 상위 3개 키워드 모두 사용
-                    for keyword, score in similar_keywords[:3]:
-                        if keyword not in search_terms:
-                            search_terms.append(keyword)
-                
-                # OR 조건으로 여러 키워드 검색
                 where_conditions = " OR ".join(["title ILIKE %s"] * len(search_terms))
                 search_params = [f"%{term}%" for term in search_terms] + [limit]
                 
@@ -210,73 +439,72 @@ class APIHandler(BaseHTTPRequestHandler):
                     ORDER BY published_at DESC
                     LIMIT %s
                 """, search_params)
-                
                 videos = cur.fetchall()
-                
-                # 간단한 유사도 계산 (제목에 행궁 키워드가 포함된 정도)
-                results = []
-                for video in videos:
-                    title = video['title'].lower()
-                    original_query = q.lower()
-                    matched_keyword = best_keyword.lower()
-                    
-                    # 원본 쿼리와 매칭된 키워드 모두 고려한 유사도 계산
-                    similarity = 0.0
-                    
-                    # 1. 원본 쿼리가 제목에 포함된 경우
-                    if original_query in title:
-                        similarity += 0.7 * (len(original_query) / len(title))
-                    
-                    # 2. 매칭된 행궁 키워드가 제목에 포함된 경우
-                    if matched_keyword in title:
-                        similarity += 0.3 * (len(matched_keyword) / len(title))
-                    
-                    # 3. 공통 단어 개수 기반
-                    if similarity == 0:
-                        query_words = set(original_query.split())
-                        title_words = set(title.split())
-                        common_words = query_words.intersection(title_words)
-                        similarity = len(common_words) / max(len(query_words), 1)
-                    
-                    results.append({
-                        'id': str(video['id']),
-                        'video_yid': video['video_yid'],
-                        'title': video['title'],
-                        'description': video['description'],
-                        'published_at': video['published_at'].isoformat() if video['published_at'] else None,
-                        'tags': video['tags'],
-                        'similarity_score': similarity,
-                        'matched_keyword': best_keyword  # 어떤 키워드로 매칭되었는지 표시
-                    })
-                
-                # 유사도 순으로 정렬
-                results.sort(key=lambda x: x['similarity_score'], reverse=True)
         
-        self.wfile.write(json.dumps(results).encode())
+        original_query = q.lower()
+        matched_keyword = best_keyword.lower()
+        results = []
+        for video in videos:
+            title = video['title'].lower()
+            similarity = 0.0
+            if original_query in title:
+                similarity += 0.7 * (len(original_query) / len(title))
+            if matched_keyword in title:
+                similarity += 0.3 * (len(matched_keyword) / len(title))
+            if similarity == 0:
+                query_words = set(original_query.split())
+                common_words = query_words.intersection(set(title.split()))
+                similarity = len(common_words) / max(len(query_words), 1)
+            
+            results.append({
+                'id': str(video['id']),
+                'video_yid': video['video_yid'],
+                'title': video['title'],
+                'description': video['description'],
+                'published_at': video['published_at'].isoformat() if video['published_at'] else None,
+                'tags': video['tags'],
+                'similarity_score': similarity,
+                'matched_keyword': best_keyword
+            })
+        
+        results.sort(key=lambda x: x['similarity_score'], reverse=True)
+        return results
+    
+    def handle_suggest(self, params):
+        """검색어 자동완성"""
+        q = params.get('q', [''])[0]
+        limit = min(max(int_param(params, 'limit', 10), 0), 50)
+        suggestions = get_suggest_service().suggest(q, limit)
+        if suggestions is None:
+            raise APIError(503, "자동완성 인덱스를 준비 중입니다")
+        return suggestions
     
     def handle_similar_keywords(self, params):
         """유사 키워드"""
         q = params.get('q', [''])[0]
         method = params.get('method', ['jaccard'])[0]
-        limit = int(params.get('limit', ['10'])[0])
+        limit = int_param(params, 'limit', 10)
         
         if not q.strip():
-            self.send_error(400, "검색어를 입력해주세요")
-            return
+            raise APIError(400, "검색어를 입력해주세요")
         
-        # 모든 태그에서 키워드 추출
-        with psycopg2.connect(**DB_CONFIG) as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT DISTINCT unnest(tags) as keyword
-                    FROM yt.videos
-                    WHERE tags IS NOT NULL AND array_length(tags, 1) > 0
-                """)
-                keywords = [row[0] for row in cur.fetchall()]
+        vocab = get_tag_vocab()
+        if vocab is not None:
+            # 질의와 문자를 하나라도 공유하는 태그만 점수가 0보다 큼
+            keywords = vocab.char_candidates(q)
+        else:
+            # 모든 태그에서 키워드 추출
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT DISTINCT unnest(tags) as keyword
+                        FROM yt.videos
+                        WHERE tags IS NOT NULL AND array_length(tags, 1) > 0
+                    """)
+                    keywords = [row[0] for row in cur.fetchall()]
         
         if not keywords:
-            self.wfile.write(json.dumps([]).encode())
-            return
+            return []
         
         # 간단한 유사도 계산
         results = []
@@ -297,19 +525,55 @@ class APIHandler(BaseHTTPRequestHandler):
         results.sort(key=lambda x: x['similarity_score'], reverse=True)
         results = results[:limit]
         
-        self.wfile.write(json.dumps(results).encode())
+        return results
+
+class SingleAPIHandler(APIHandler):
+    """단일 스레드 모드용: keep-alive 커넥션 하나가 서버를 점유하지 않도록 요청마다 연결 종료"""
+    protocol_version = "HTTP/1.0"
+
+def create_server(host: str, port: int, mode: str = "threaded"):
+    """
+    HTTP 서버 생성
+    
+    Args:
+        host: 바인드 주소
+        port: 포트
+        mode: single (요청을 하나씩 처리) 또는 threaded (요청마다 스레드)
+    """
+    if mode == "single":
+        return HTTPServer((host, port), SingleAPIHandler)
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    return server
 
 def main():
     """메인 함수"""
-    port = 8000
-    server = HTTPServer(('localhost', port), APIHandler)
-    print(f"API 서버가 http://localhost:{port} 에서 실행 중입니다.")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='간단한 API 서버')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--mode', choices=['single', 'threaded'], default='threaded',
+                        help='single: 단일 스레드 (기존 방식), threaded: 동시 요청 처리')
+    args = parser.parse_args()
+    
+    server = create_server(args.host, args.port, args.mode)
+    # 키워드 벡터는 시작할 때 한 번 로드 (첫 요청 지연 방지)
+    get_keyword_router()
+    # 자동완성 인덱스는 백그라운드에서 빌드, 수집으로 데이터가 바뀌면 재빌드
+    get_suggest_service().start(lambda: psycopg2.connect(**DB_CONFIG),
+                                interval=float(os.getenv("SUGGEST_CHECK_SECONDS", "60")))
+    print(f"API 서버가 http://{args.host}:{args.port} 에서 실행 중입니다. (mode={args.mode})")
     
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n서버를 종료합니다.")
         server.shutdown()
+    finally:
+        server.server_close()
+        if _db_pool is not None:
+            _db_pool.closeall()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# crawler/app 모듈은 패키지가 아니라 각 디렉터리를 경로에 두고 임포트함 (실행 스크립트와 동일)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "app"), os.path.join(ROOT, "crawler")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,81 @@
+"""BatchTextScorer 일괄 점수와 SimilarityCalculator 쌍별 점수 일치 테스트"""
+
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("nltk")
+
+from batch_similarity import BATCH_METHODS, BatchTextScorer, top_k_indices  # noqa: E402
+from korean_tokenizer import SimpleTokenizer  # noqa: E402
+from similarity_utils import SimilarityCalculator  # noqa: E402
+
+WORDS = ["경복궁", "창덕궁", "덕수궁", "야경", "데이트", "한복", "카페", "맛집", "산책", "궁궐", "a", "궁", "Seoul"]
+# 빈 문자열, 공백, n보다 짧은 텍스트 등 경계 사례 포함
+EDGE_TEXTS = ["", " ", "궁", "a b", "경복궁", "경복궁 경복궁", "궁궐 궁궐 궁궐"]
+QUERIES = ["경복궁 야경", "궁", "", " ", "한복 데이트 코스", "없는말", "경복궁에서 야경"]
+
+
+def _texts(n=300, seed=0):
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))) for _ in range(n)]
+    return EDGE_TEXTS + texts
+
+
+@pytest.mark.parametrize("method", BATCH_METHODS)
+def test_batch_scores_match_pairwise(method):
+    calculator = SimilarityCalculator()
+    texts = _texts()
+    scorer = BatchTextScorer(texts)
+
+    for query in QUERIES:
+        expected = np.array([calculator.calculate_similarity(query, text, method) for text in texts])
+        np.testing.assert_allclose(scorer.scores(query, method), expected, rtol=0, atol=1e-12)
+
+
+def test_word_overlap_with_tokenizer_matches_pairwise():
+    calculator = SimilarityCalculator(tokenizer=SimpleTokenizer())
+    texts = _texts(100, seed=1) + ["경복궁에서 한복을 입고", "창덕궁의 야경"]
+    scorer = calculator.batch_scorer(texts)
+
+    for query in QUERIES:
+        expected = np.array([calculator.word_overlap_similarity(query, text) for text in texts])
+        np.testing.assert_allclose(scorer.scores(query, "word_overlap"), expected, rtol=0, atol=1e-12)
+
+
+def test_stored_tokens_are_used_and_part_of_the_cache_key():
+    calculator = SimilarityCalculator(tokenizer=SimpleTokenizer())
+    texts = ["경복궁 야경", "창덕궁 후원"]
+
+    stored = calculator.batch_scorer(texts, candidate_tokens=[["경복궁", "야경"], None])
+    assert calculator.batch_scorer(texts, candidate_tokens=[["경복궁", "야경"], None]) is stored
+    assert stored.scores("경복궁", "word_overlap")[0] == pytest.approx(0.5)
+
+    # 같은 제목이라도 저장된 토큰이 다르면 다른 행렬
+    retokenized = calculator.batch_scorer(texts, candidate_tokens=[["경복궁"], None])
+    assert retokenized is not stored
+    assert retokenized.scores("경복궁", "word_overlap")[0] == pytest.approx(1.0)
+
+
+def test_batch_scorer_cache_is_bounded_lru():
+    calculator = SimilarityCalculator()
+    first = calculator.batch_scorer(["a"])
+    for i in range(calculator._batch_cache_size - 1):
+        calculator.batch_scorer([f"t{i}"])
+    assert calculator.batch_scorer(["a"]) is first  # 최근 사용으로 갱신
+    calculator.batch_scorer(["new"])
+    assert calculator.batch_scorer(["a"]) is first
+    assert len(calculator._batch_scorers) == calculator._batch_cache_size
+
+
+def test_top_k_indices_orders_by_score_then_position():
+    scores = np.array([0.2, 0.9, 0.2, 0.5, 0.9])
+
+    assert top_k_indices(scores, 3).tolist() == [1, 4, 3]
+    assert top_k_indices(scores, 10).tolist() == [1, 4, 3, 0, 2]
+
+
+def test_empty_candidates():
+    assert BatchTextScorer([]).scores("경복궁", "jaccard").shape == (0,)
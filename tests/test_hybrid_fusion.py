@@ -0,0 +1,72 @@
+"""하이브리드 검색 순위 융합(_fuse_results) 테스트"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("opensearchpy")
+
+from main import _fuse_results  # noqa: E402
+
+
+def _legs():
+    return {
+        "lexical": [
+            {"video_yid": "a", "title": "경복궁 야경", "score": 9.0},
+            {"video_yid": "b", "title": "창덕궁 후원", "score": 5.0},
+            {"video_yid": "c", "title": "덕수궁 돌담길", "score": 1.0},
+        ],
+        "vector": [
+            {"video_yid": "b", "title": None, "channel_id": "ch1", "score": 0.9},
+            {"video_yid": "d", "title": "궁궐 카페", "score": 0.4},
+        ],
+    }
+
+
+def test_rrf_sums_reciprocal_ranks():
+    fused = _fuse_results(_legs(), {"lexical": 1.0, "vector": 1.0}, "rrf", rrf_k=60)
+
+    assert [row["video_yid"] for row in fused] == ["b", "a", "d", "c"]
+    scores = {row["video_yid"]: row["hybrid_score"] for row in fused}
+    assert scores["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert scores["d"] == pytest.approx(1 / 62)
+    assert scores["c"] == pytest.approx(1 / 63)
+
+
+def test_rrf_records_leg_ranks_and_merges_fields():
+    fused = {row["video_yid"]: row for row in
+             _fuse_results(_legs(), {"lexical": 1.0, "vector": 1.0}, "rrf", rrf_k=60)}
+
+    assert fused["b"]["lexical_rank"] == 2 and fused["b"]["vector_rank"] == 1
+    assert fused["b"]["lexical_score"] == 5.0 and fused["b"]["vector_score"] == 0.9
+    # 먼저 나온 경로의 값을 유지하고 비어 있는 필드만 다른 경로에서 채움
+    assert fused["b"]["title"] == "창덕궁 후원"
+    assert fused["b"]["channel_id"] == "ch1"
+    assert "vector_rank" not in fused["a"]
+    assert "score" not in fused["a"]
+
+
+def test_rrf_weights_change_order():
+    fused = _fuse_results(_legs(), {"lexical": 1.0, "vector": 3.0}, "rrf", rrf_k=60)
+
+    assert [row["video_yid"] for row in fused][:2] == ["b", "d"]
+
+
+def test_rrf_skips_empty_legs_and_rows_without_id():
+    legs = {"lexical": [], "vector": [{"video_yid": None, "score": 1.0}, {"video_yid": "x", "score": 0.5}]}
+    fused = _fuse_results(legs, {}, "rrf", rrf_k=10)
+
+    assert [row["video_yid"] for row in fused] == ["x"]
+    # 첫 행은 건너뛰어도 순위는 원래 위치 기준
+    assert fused[0]["vector_rank"] == 2
+    assert fused[0]["hybrid_score"] == pytest.approx(1 / 12)
+
+
+def test_weighted_fusion_min_max_normalizes_each_leg():
+    fused = {row["video_yid"]: row["hybrid_score"] for row in
+             _fuse_results(_legs(), {"lexical": 1.0, "vector": 1.0}, "weighted", rrf_k=60)}
+
+    assert fused["a"] == pytest.approx(1.0)
+    assert fused["b"] == pytest.approx(0.5 + 1.0)
+    assert fused["c"] == pytest.approx(0.0)
+    assert fused["d"] == pytest.approx(0.0)
@@ -0,0 +1,72 @@
+"""SimpleTokenizer(형태소 분석기 없는 환경의 폴백) 테스트"""
+
+import pytest
+
+import korean_tokenizer
+from korean_tokenizer import SimpleTokenizer, get_tokenizer, tokenize_title
+
+
+@pytest.fixture
+def tokenizer():
+    return SimpleTokenizer()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("경복궁에서 한복 입고 야경 데이트", ("경복궁", "한복", "입고", "야경", "데이트")),
+    ("창덕궁의 후원을 걸어요", ("창덕궁", "후원", "걸어요")),
+    ("서울로 가는 궁궐 여행", ("서울", "가는", "궁궐", "여행")),
+    ("Seoul Palace 2024 브이로그!!", ("seoul", "palace", "2024", "브이로그")),
+])
+def test_tokenize_strips_josa_and_lowercases(tokenizer, text, expected):
+    assert tokenizer.tokenize(text) == expected
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("경복궁에서부터", "경복궁"),
+    ("궁궐까지", "궁궐"),
+    ("궁은", "궁은"),     # 한 글자 조사는 어간이 두 글자 이상일 때만 제거
+    ("궁궐은", "궁궐"),
+    ("에서", "에서"),     # 떼면 어간이 남지 않음
+    ("경복궁", "경복궁"),
+])
+def test_strip_josa(word, stem):
+    assert SimpleTokenizer.strip_josa(word) == stem
+
+
+def test_empty_and_none(tokenizer):
+    assert tokenizer.tokenize("") == ()
+    assert tokenizer.tokenize(None) == ()
+    assert tokenizer.tokenize("!!! ~~") == ()
+
+
+def test_tokenize_title_returns_list_for_storage(tokenizer):
+    assert tokenize_title("경복궁에서 야경", tokenizer) == ["경복궁", "야경"]
+    assert tokenize_title(None, tokenizer) == []
+
+
+def test_auto_falls_back_to_simple_when_analyzers_are_missing(monkeypatch):
+    def unavailable():
+        raise ImportError("not installed")
+
+    monkeypatch.setitem(korean_tokenizer._BACKENDS, "kiwi", unavailable)
+    monkeypatch.setitem(korean_tokenizer._BACKENDS, "okt", unavailable)
+    monkeypatch.setattr(korean_tokenizer, "_instances", {})
+
+    tokenizer = get_tokenizer("auto")
+
+    assert isinstance(tokenizer, SimpleTokenizer)
+    assert tokenizer.name == "simple"
+    assert get_tokenizer("auto") is tokenizer
+
+
+def test_explicit_backend_errors_are_not_swallowed(monkeypatch):
+    def unavailable():
+        raise ImportError("not installed")
+
+    monkeypatch.setitem(korean_tokenizer._BACKENDS, "kiwi", unavailable)
+    monkeypatch.setattr(korean_tokenizer, "_instances", {})
+
+    with pytest.raises(ImportError):
+        get_tokenizer("kiwi")
+    with pytest.raises(ValueError):
+        get_tokenizer("mecab")
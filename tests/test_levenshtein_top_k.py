@@ -0,0 +1,63 @@
+"""levenshtein_top_k 가지치기 결과와 전체 계산(brute force) 비교 테스트"""
+
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("nltk")
+
+from similarity_utils import SimilarityCalculator  # noqa: E402
+
+ALPHABET = "경복궁창덕야경한ab "
+
+
+def _brute_force(calculator, query, candidates, k):
+    scores = [calculator.levenshtein_similarity(query, text) for text in candidates]
+    # 유사도 내림차순, 동점은 후보 순서
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))[:k]
+    return order, [scores[i] for i in order]
+
+
+def _random_texts(rng, n):
+    return ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    calculator = SimilarityCalculator()
+    candidates = _random_texts(rng, 500)
+
+    for query in _random_texts(rng, 10) + ["", "경복궁"]:
+        for k in (1, 5, 50):
+            indices, scores = calculator.levenshtein_top_k(query, candidates, k)
+            expected_indices, expected_scores = _brute_force(calculator, query, candidates, k)
+            assert indices.tolist() == expected_indices
+            np.testing.assert_allclose(scores, expected_scores, rtol=0, atol=1e-12)
+
+
+def test_without_score_cutoff_support_matches():
+    # 구버전 python-Levenshtein처럼 score_cutoff가 없어도 같은 결과
+    calculator = SimilarityCalculator()
+    calculator._distance_supports_cutoff = False
+    candidates = _random_texts(random.Random(7), 200)
+
+    indices, _ = calculator.levenshtein_top_k("경복궁 야경", candidates, 10)
+
+    assert indices.tolist() == _brute_force(calculator, "경복궁 야경", candidates, 10)[0]
+
+
+def test_k_larger_than_candidates_and_empty_inputs():
+    calculator = SimilarityCalculator()
+
+    indices, scores = calculator.levenshtein_top_k("궁", ["궁", "경복궁"], 10)
+    assert indices.tolist() == [0, 1]
+    assert scores.tolist() == pytest.approx([1.0, 1 / 3])
+
+    indices, scores = calculator.levenshtein_top_k("궁", [], 5)
+    assert indices.shape == (0,) and scores.shape == (0,)
+
+    indices, _ = calculator.levenshtein_top_k("궁", ["a"], 0)
+    assert indices.shape == (0,)
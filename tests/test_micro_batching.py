@@ -0,0 +1,117 @@
+"""MicroBatchEncoder 순서 보존 / 배치 크기 / 오류 전파 테스트"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from micro_batching import MicroBatchEncoder
+
+
+class FakeEncoder:
+    """텍스트 끝 숫자를 1차원 벡터로 돌려주는 인코더 (호출별 배치 크기 기록)"""
+
+    def __init__(self, delay: float = 0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, normalize=True):
+        with self._lock:
+            self.batch_sizes.append(len(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_on is not None and self.fail_on in texts:
+            raise ValueError(f"encode failed: {self.fail_on}")
+        sign = 1.0 if normalize else -1.0
+        return np.array([[sign * float(text.rsplit(" ", 1)[-1])] for text in texts], dtype=np.float32)
+
+
+def test_results_keep_request_and_text_order():
+    encoder = FakeEncoder(delay=0.01)
+    batcher = MicroBatchEncoder(encoder, max_batch=64, max_wait_ms=20)
+
+    futures = [batcher.submit([f"q {i}", f"q {i + 100}"]) for i in range(20)]
+
+    for i, future in enumerate(futures):
+        assert future.result(timeout=5)[:, 0].tolist() == [i, i + 100]
+    # 동시에 들어온 요청이 한 번의 호출로 묶였는지
+    assert len(encoder.batch_sizes) < len(futures)
+
+
+def test_concurrent_threads_get_their_own_rows():
+    batcher = MicroBatchEncoder(FakeEncoder(delay=0.005), max_batch=8, max_wait_ms=5)
+    results = {}
+
+    def user(n):
+        results[n] = batcher.encode(f"user {n}")[0, 0]
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {n: float(n) for n in range(32)}
+
+
+def test_batches_never_exceed_max_batch():
+    encoder = FakeEncoder(delay=0.01)
+    batcher = MicroBatchEncoder(encoder, max_batch=4, max_wait_ms=20)
+
+    futures = [batcher.submit([f"t {i}", f"t {i}", f"t {i}"]) for i in range(6)]
+    for i, future in enumerate(futures):
+        assert future.result(timeout=5)[:, 0].tolist() == [i, i, i]
+
+    assert max(encoder.batch_sizes) <= 4
+
+
+def test_single_request_larger_than_max_batch_runs_alone():
+    encoder = FakeEncoder()
+    batcher = MicroBatchEncoder(encoder, max_batch=2, max_wait_ms=0)
+
+    result = batcher.encode([f"x {i}" for i in range(5)])
+
+    assert result[:, 0].tolist() == [0, 1, 2, 3, 4]
+    assert encoder.batch_sizes == [5]
+
+
+def test_normalize_groups_are_encoded_separately():
+    encoder = FakeEncoder(delay=0.01)
+    batcher = MicroBatchEncoder(encoder, max_batch=64, max_wait_ms=20)
+
+    normalized = batcher.submit("a 1", normalize=True)
+    raw = batcher.submit("b 2", normalize=False)
+
+    assert normalized.result(timeout=5)[0, 0] == 1.0
+    assert raw.result(timeout=5)[0, 0] == -2.0
+
+
+def test_encode_error_is_set_on_every_request_in_the_batch():
+    encoder = FakeEncoder(delay=0.01, fail_on="bad 0")
+    batcher = MicroBatchEncoder(encoder, max_batch=64, max_wait_ms=50)
+
+    futures = [batcher.submit("bad 0"), batcher.submit("ok 1")]
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    assert batcher.stats()["errors"] == 2
+    # 워커 스레드는 계속 동작
+    assert batcher.encode("ok 3")[0, 0] == 3.0
+
+
+def test_short_result_fails_futures_instead_of_hanging():
+    batcher = MicroBatchEncoder(lambda texts, normalize=True: np.zeros((len(texts) - 1, 1)),
+                                max_batch=8, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(["a", "b"]).result(timeout=5)
+
+
+def test_empty_request_returns_empty_array():
+    batcher = MicroBatchEncoder(FakeEncoder(), max_batch=8, max_wait_ms=0)
+
+    assert batcher.encode([]).shape == (0, 0)
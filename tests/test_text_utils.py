@@ -0,0 +1,56 @@
+"""clean_text 정제 규칙 테스트"""
+
+import html
+import random
+import re
+
+import pytest
+
+from text_utils import clean_text
+
+_EMOJI_RE = re.compile(
+    r"[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]+",
+    flags=re.UNICODE,
+)
+
+
+def _reference_clean_text(raw):
+    """엔티티 해제 → 이모지 치환 → 공백 치환을 차례로 하는 이전 구현"""
+    if not raw:
+        return ""
+    text = html.unescape(raw)
+    text = _EMOJI_RE.sub(" ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("", ""),
+    (None, ""),
+    ("   ", ""),
+    ("경복궁 야경", "경복궁 야경"),
+    ("  경복궁\n\t야경  ", "경복궁 야경"),
+    ("경복궁😀😀야경", "경복궁 야경"),
+    ("경복궁 😀 야경 🚀", "경복궁 야경"),
+    ("한복&amp;야경 &lt;추천&gt;", "한복&야경 <추천>"),
+    ("&nbsp;경복궁&nbsp;", "경복궁"),
+    ("태극기 🇰🇷 최고", "태극기 최고"),
+    ("ㅋㅋㅋ 좋아요!!", "ㅋㅋㅋ 좋아요!!"),
+])
+def test_clean_text(raw, expected):
+    assert clean_text(raw) == expected
+
+
+def test_matches_multi_pass_reference_on_random_text():
+    rng = random.Random(0)
+    pieces = ["경복궁", "야경", " ", "  ", "\n", "\t", "　", "😀", "🚀", "🇰🇷", "&amp;", "&lt;", "&#128512;",
+              "&nbsp;", "a", "!", "&", "&unknown;"]
+    for _ in range(2000):
+        raw = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert clean_text(raw) == _reference_clean_text(raw), repr(raw)
+
+
+def test_idempotent():
+    raw = " 경복궁&amp;창덕궁 😀\n 야경 "
+    once = clean_text(raw)
+    assert clean_text(once) == once